@@ -5,7 +5,9 @@ from pathlib import Path
 # Add src to path
 sys.path.append(str(Path(__file__).parent))
 
-from src.translator import Translator
+from src.registry import load_translator as build_translator
+from src.reloader import ModelReloader
+from src.config import config
 from src.utils import logger
 
 st.set_page_config(page_title="ZimLingua", layout="wide")
@@ -16,7 +18,11 @@ st.markdown("Offline translation for English, Shona, and Ndebele.")
 # Initialize backend (cache resource to avoid reloading model)
 @st.cache_resource
 def load_translator():
-    return Translator()
+    # One model, or the models.registry router when several are configured
+    translator = build_translator()
+    # Picks up re-converted models (model.reload.watch) without restarting the app
+    ModelReloader.from_config(translator, config).start()
+    return translator
 
 try:
     translator = load_translator()
@@ -37,6 +43,10 @@ with col2:
     st.subheader("Target")
     tgt_lang = st.selectbox("Target Language", ["English (en)", "Shona (sn)", "Ndebele (nd)"], index=1)
     
+    # Interactive use defaults to the low-latency profile when it exists
+    profiles = list(translator.profiles)
+    profile = st.selectbox("Decoding profile", profiles, index=profiles.index("fast") if "fast" in profiles else 0)
+    
     translate_btn = st.button("Translate", type="primary")
     
     if translate_btn and source_text:
@@ -48,12 +58,21 @@ with col2:
         src_flores = translator.get_language_code(src_code)
         tgt_flores = translator.get_language_code(tgt_code)
         
-        with st.spinner("Translating..."):
-            try:
-                results = translator.translate_batch([source_text], source_lang=src_flores, target_lang=tgt_flores)
-                st.text_area("Translation:", value=results[0], height=200)
-            except Exception as e:
-                st.error(f"Translation error: {e}")
+        output = st.empty()
+        try:
+            if translator.decoding_profile(profile).beam_size == 1:
+                # Render tokens as they are decoded instead of waiting for the whole translation
+                result = ""
+                for piece in translator.translate_stream(source_text, source_lang=src_flores, target_lang=tgt_flores, profile=profile):
+                    result += piece
+                    output.text(result)
+            else:
+                # Streaming decodes greedily; beam search profiles translate the whole text at once
+                with st.spinner("Translating..."):
+                    result = translator.translate_document(source_text, source_lang=src_flores, target_lang=tgt_flores, profile=profile)
+            output.text_area("Translation:", value=result, height=200)
+        except Exception as e:
+            st.error(f"Translation error: {e}")
 
 st.markdown("---")
 st.caption("Powered by NLLB-200 & CTranslate2 | Built with Streamlit")
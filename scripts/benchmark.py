@@ -0,0 +1,220 @@
+import argparse
+import io
+import itertools
+import json
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from src.utils import logger
+from src.registry import current_rss
+from scripts.convert_model import convert_model
+
+# Vocabulary for the synthetic corpus; mixes the three project languages
+WORDS = (
+    "hello world good morning thank you please the people are coming home today "
+    "mhoro nyika mangwanani ndinoda kuti uye vanhu vari kuuya kumba nhasi maita basa "
+    "sawubona umhlaba abantu kakhulu ngiyabonga ekhaya lamuhla siyabonga yebo"
+).split()
+MB = 1024 * 1024
+
+
+def synthetic_corpus(n: int, seed: int = 0, min_words: int = 3, max_words: int = 40):
+    """
+    Builds sentences of mixed lengths so length bucketing has something to do.
+    """
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))) for _ in range(n)]
+
+
+def build_tiny_model(out_dir: Path, d_model: int = 64, layers: int = 2, seed: int = 0) -> Path:
+    """
+    Builds a randomly initialized NLLB-shaped (M2M100) model with a locally trained
+    SentencePiece tokenizer, then converts it with scripts/convert_model.py. No network needed.
+    Returns the CTranslate2 model directory, tokenizer bundled (the HF model is saved next to it under hf/).
+    """
+    import sentencepiece as spm
+    import torch
+    import transformers
+
+    torch.manual_seed(seed)
+    hf_dir = out_dir / "hf"
+    ct2_dir = out_dir / "ct2"
+    hf_dir.mkdir(parents=True, exist_ok=True)
+
+    sp_model = io.BytesIO()
+    spm.SentencePieceTrainer.train(
+        sentence_iterator=iter(synthetic_corpus(2000, seed)), model_writer=sp_model, vocab_size=128,
+        model_type="bpe", character_coverage=1.0, bos_id=0, pad_id=1, eos_id=2, unk_id=3, minloglevel=2
+    )
+    sp_path = hf_dir / "sentencepiece.bpe.model"
+    sp_path.write_bytes(sp_model.getvalue())
+    tokenizer = transformers.NllbTokenizerFast(
+        vocab_file=str(sp_path), __slow_tokenizer=transformers.NllbTokenizer(vocab_file=str(sp_path))
+    )
+
+    model_config = transformers.M2M100Config(
+        # Headroom: the converter pads the vocabulary with made-up words up to vocab_size
+        vocab_size=len(tokenizer) + 8,
+        d_model=d_model, encoder_layers=layers, decoder_layers=layers,
+        encoder_attention_heads=4, decoder_attention_heads=4,
+        encoder_ffn_dim=d_model * 4, decoder_ffn_dim=d_model * 4,
+        max_position_embeddings=1024, scale_embedding=True,
+        pad_token_id=tokenizer.pad_token_id, bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id, decoder_start_token_id=tokenizer.eos_token_id,
+    )
+    transformers.M2M100ForConditionalGeneration(model_config).save_pretrained(hf_dir)
+    tokenizer.save_pretrained(hf_dir)
+
+    convert_model(str(hf_dir), str(ct2_dir), quantization="float32")
+    return ct2_dir
+
+
+def peak_rss_mb() -> float:
+    # Lifetime peak of the process, so it only ever grows across cases; ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / MB if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def run_case(translator, corpus, source_lang: str, target_lang: str, beam_size: int, batch_size: int, repeat: int):
+    """
+    Translates the corpus in client batches of batch_size sentences; latency is per client batch.
+    Memory is the resident set after the case and its growth during the case.
+    """
+    rss_before = current_rss()
+    latencies = []
+    sentences = 0
+    target_tokens = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for i in range(0, len(corpus), batch_size):
+            batch = corpus[i:i + batch_size]
+            t0 = time.perf_counter()
+            tokens = translator.tokenize(batch, source_lang)
+            hypotheses = translator.infer(tokens, target_lang, beam_size)
+            translator.detokenize(hypotheses)
+            latencies.append(time.perf_counter() - t0)
+            sentences += len(batch)
+            # Exclude the forced target language prefix
+            target_tokens += sum(max(len(h) - 1, 0) for h in hypotheses)
+    elapsed = time.perf_counter() - started
+    rss_after = current_rss()
+
+    return {
+        "sentences_per_sec": sentences / elapsed,
+        "target_tokens_per_sec": target_tokens / elapsed,
+        "latency_p50_ms": percentile(latencies, 50) * 1000,
+        "latency_p95_ms": percentile(latencies, 95) * 1000,
+        "latency_p99_ms": percentile(latencies, 99) * 1000,
+        "rss_mb": rss_after / MB,
+        "rss_delta_mb": (rss_after - rss_before) / MB,
+        "peak_rss_mb": peak_rss_mb(),
+        "elapsed_sec": elapsed,
+    }
+
+
+def run_benchmark(args) -> dict:
+    from src.translator import Translator
+
+    workdir = None
+    if args.model_dir:
+        model_dir, tokenizer_name = args.model_dir, args.tokenizer
+    else:
+        workdir = tempfile.TemporaryDirectory(prefix="zimlingua-bench-")
+        logger.info("Building tiny random model for benchmarking...")
+        ct2_dir = build_tiny_model(Path(workdir.name), d_model=args.tiny_d_model, layers=args.tiny_layers)
+        model_dir, tokenizer_name = str(ct2_dir), None
+
+    if args.corpus:
+        with open(args.corpus, "r", encoding="utf-8") as f:
+            corpus = [line.strip() for line in itertools.islice(f, args.sentences) if line.strip()]
+    else:
+        corpus = synthetic_corpus(args.sentences)
+
+    rss_before = current_rss()
+    load_started = time.perf_counter()
+    translator = Translator(model_path=model_dir, tokenizer_name=tokenizer_name)
+    load_time = time.perf_counter() - load_started
+    # The first load includes the tokenizer
+    load_rss = (current_rss() - rss_before) / MB
+    # Measure the model, not the translation memory
+    translator.cache = None
+
+    results = []
+    for compute_type, threads in itertools.product(args.compute_types, args.threads):
+        inter, intra = (int(x) for x in threads.split(":"))
+        # Compute type and threads are fixed when the engine is created; the tokenizer never changes
+        if (compute_type, inter, intra) != (translator.compute_type, translator.inter_threads, translator.intra_threads):
+            translator.compute_type = compute_type
+            translator.inter_threads, translator.intra_threads = inter, intra
+            # Free the previous engine first so the two are never resident together
+            translator.translator.unload_model()
+            rss_before = current_rss()
+            load_started = time.perf_counter()
+            translator.translator = translator.create_engine()
+            load_time = time.perf_counter() - load_started
+            load_rss = (current_rss() - rss_before) / MB
+
+        for beam_size, batch_size, batch_type in itertools.product(args.beam_sizes, args.batch_sizes, args.batch_types):
+            translator.batch_type = batch_type
+            translator.max_batch_size = args.max_batch_size if batch_type == "tokens" else batch_size
+            case = {
+                "compute_type": compute_type, "inter_threads": inter, "intra_threads": intra,
+                "beam_size": beam_size, "batch_size": batch_size, "batch_type": batch_type,
+                "max_batch_size": translator.max_batch_size, "model_load_sec": load_time,
+                "model_load_rss_delta_mb": load_rss,
+            }
+            # Warm-up pass so one-time allocations do not skew the first case
+            translator.infer(translator.tokenize(corpus[:batch_size], args.src), args.tgt, beam_size)
+            case.update(run_case(translator, corpus, args.src, args.tgt, beam_size, batch_size, args.repeat))
+            logger.info(
+                f"{compute_type} {inter}:{intra} beam={beam_size} batch={batch_size}/{batch_type}: "
+                f"{case['sentences_per_sec']:.1f} sent/s, p99 {case['latency_p99_ms']:.1f} ms"
+            )
+            results.append(case)
+
+    if workdir is not None:
+        workdir.cleanup()
+    return {
+        "model": "tiny-random" if not args.model_dir else args.model_dir,
+        "sentences": len(corpus),
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Translator throughput and latency")
+    parser.add_argument("--model-dir", type=str, default=None, help="CTranslate2 model to benchmark (default: build a tiny random model offline)")
+    parser.add_argument("--tokenizer", type=str, default=None, help="Tokenizer name or path for --model-dir (default: model.name)")
+    parser.add_argument("--corpus", type=str, default=None, help="Text file with one sentence per line (default: synthetic)")
+    parser.add_argument("--sentences", type=int, default=256, help="Number of sentences")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the corpus per case")
+    parser.add_argument("--src", type=str, default="eng_Latn", help="Source language code")
+    parser.add_argument("--tgt", type=str, default="sna_Latn", help="Target language code")
+    parser.add_argument("--compute-types", nargs="+", default=["int8", "float32"], help="CTranslate2 compute types")
+    parser.add_argument("--beam-sizes", nargs="+", type=int, default=[1, 5], help="Beam sizes")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 32], help="Sentences per client call")
+    parser.add_argument("--batch-types", nargs="+", default=["tokens", "examples"], help="Engine batch types")
+    parser.add_argument("--max-batch-size", type=int, default=1024, help="Token budget when batch_type is tokens")
+    parser.add_argument("--threads", nargs="+", default=["1:0"], help="inter_threads:intra_threads pairs, e.g. 1:4 2:2")
+    parser.add_argument("--tiny-d-model", type=int, default=64, help="Hidden size of the tiny model")
+    parser.add_argument("--tiny-layers", type=int, default=2, help="Encoder/decoder layers of the tiny model")
+    parser.add_argument("--output", type=str, default=None, help="Write the JSON report here (default: stdout)")
+
+    args = parser.parse_args()
+    report = json.dumps(run_benchmark(args), indent=2)
+    if args.output:
+        Path(args.output).write_text(report, encoding="utf-8")
+        logger.info(f"Benchmark report written to {args.output}")
+    else:
+        print(report)
@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from src.utils import logger
+from src.data_loader import DataLoader, NORMALIZE_CHUNK, normalize_pool
+from scripts.benchmark import synthetic_corpus
+
+# Decorations that give every normalize_text step some work: case, spacing, punctuation, emoji, compatibility forms
+NOISE = ["  ", "!", "?!", " 🙂", " ﬁ", "…", "\t", " #tag", " (ok)"]
+
+
+def noisy_corpus(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    sentences = synthetic_corpus(min(n, 100_000), seed=seed)
+    return [
+        sentences[i % len(sentences)].capitalize() + rng.choice(NOISE) + rng.choice(NOISE)
+        for i in range(n)
+    ]
+
+
+def run_benchmark(args) -> dict:
+    corpus = noisy_corpus(args.sentences)
+    logger.info(f"Normalizing {len(corpus)} sentences")
+    results = []
+    expected = None
+    for workers in args.workers:
+        if workers == 1:
+            started = time.perf_counter()
+            output = DataLoader.normalize_batch(corpus, workers=1)
+            seconds = time.perf_counter() - started
+        else:
+            # Pool start-up is excluded: a pipeline keeps one pool for the whole run
+            with normalize_pool(workers) as pool:
+                DataLoader.normalize_batch(corpus[:workers * 10], chunk_size=10, executor=pool)
+                started = time.perf_counter()
+                output = DataLoader.normalize_batch(corpus, chunk_size=args.chunk_size, executor=pool)
+                seconds = time.perf_counter() - started
+        if expected is None:
+            expected = [DataLoader.normalize_text(text) for text in corpus[:args.check]]
+        results.append({
+            "workers": workers,
+            "seconds": round(seconds, 3),
+            "sentences_per_second": round(len(corpus) / seconds),
+            "identical": output[:args.check] == expected,
+        })
+        logger.info(f"{workers} workers: {results[-1]['sentences_per_second']:,} sentences/s")
+    base = results[0]["sentences_per_second"]
+    for result in results:
+        result["speedup"] = round(result["sentences_per_second"] / base, 2)
+    return {"sentences": len(corpus), "cpu_count": os.cpu_count(), "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark DataLoader.normalize_batch across worker counts")
+    parser.add_argument("--sentences", type=int, default=10_000_000, help="Number of sentences")
+    parser.add_argument("--workers", nargs="+", type=int, default=sorted({1, os.cpu_count() or 1}), help="Worker counts to compare")
+    parser.add_argument("--chunk-size", type=int, default=NORMALIZE_CHUNK, help="Sentences per task")
+    parser.add_argument("--check", type=int, default=100_000, help="Sentences compared against normalize_text")
+    parser.add_argument("--output", type=str, default=None, help="Write the JSON report here (default: stdout)")
+
+    args = parser.parse_args()
+    report = json.dumps(run_benchmark(args), indent=2)
+    if args.output:
+        Path(args.output).write_text(report, encoding="utf-8")
+        logger.info(f"Benchmark report written to {args.output}")
+    else:
+        print(report)
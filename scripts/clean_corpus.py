@@ -0,0 +1,82 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from src.config import config
+from src.corpus_pipeline import CorpusPipeline
+from src.dedup import Deduplicator
+from src.length_filter import LengthFilter, TokenCounter
+from src.data_loader import DataLoader, DEFAULT_BATCH_ROWS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean a parallel corpus into train/val/test Parquet shards")
+    parser.add_argument("--data", type=str, help="CSV, Parquet, Arrow or JSONL file relative to --data_dir")
+    parser.add_argument("--source_file", type=str, help="Source side of a line-aligned TXT pair (instead of --data)")
+    parser.add_argument("--target_file", type=str, help="Target side of a line-aligned TXT pair")
+    parser.add_argument("--source_col", type=str, default="source")
+    parser.add_argument("--target_col", type=str, default="target")
+    parser.add_argument("--data_dir", type=str, default="data")
+    parser.add_argument("--output_dir", type=str, default="data/clean")
+    parser.add_argument("--train_ratio", type=float, default=0.8)
+    parser.add_argument("--val_ratio", type=float, default=0.1)
+    parser.add_argument("--test_ratio", type=float, default=0.1)
+    parser.add_argument("--ratio_threshold", type=float, default=config.get("length_filter.ratio", 1.5), help="Maximum source/target length ratio")
+    parser.add_argument("--length_unit", choices=["words", "tokens"], default=config.get("length_filter.unit", "words"),
+                        help="Measure lengths in whitespace words or NLLB subword tokens")
+    parser.add_argument("--min_length", type=int, default=config.get("length_filter.min_length", 1), help="Minimum length per side")
+    parser.add_argument("--max_length", type=int, default=config.get("length_filter.max_length", None), help="Maximum length per side")
+    parser.add_argument("--drop_truncated", action="store_true", help="Drop pairs longer than data.max_length tokens")
+    parser.add_argument("--batch_rows", type=int, default=DEFAULT_BATCH_ROWS, help="Rows per chunk held in memory")
+    parser.add_argument("--shard_rows", type=int, default=1_000_000, help="Rows per output Parquet shard")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes for text normalization")
+    parser.add_argument("--no_dedup", action="store_true", help="Skip deduplication")
+    parser.add_argument("--near_dup", action="store_true", help="Also drop near-duplicates (MinHash/LSH)")
+    parser.add_argument("--near_threshold", type=float, default=config.get("dedup.threshold", 0.8), help="Near-duplicate Jaccard similarity")
+    parser.add_argument("--dedup_memory_mb", type=float, default=config.get("dedup.memory_budget_mb", 1024), help="Dedup index memory before spilling to disk")
+    parser.add_argument("--spill_dir", type=str, default=config.get("dedup.spill_dir", None), help="Directory for the spilled dedup index")
+    args = parser.parse_args()
+
+    loader = DataLoader(args.data_dir)
+    if args.data:
+        batches = loader.iter_batches(args.data, args.source_col, args.target_col, batch_rows=args.batch_rows)
+    elif args.source_file and args.target_file:
+        batches = loader.iter_txt_batches(args.source_file, args.target_file, batch_rows=args.batch_rows)
+    else:
+        parser.error("Pass --data or both --source_file and --target_file")
+
+    max_tokens = config.get("data.max_length", 128) if args.drop_truncated or config.get("length_filter.drop_truncated", False) else None
+    length_filter = LengthFilter(
+        ratio=args.ratio_threshold,
+        min_length=args.min_length,
+        max_length=args.max_length,
+        unit=args.length_unit,
+        max_tokens=max_tokens,
+        token_counter=TokenCounter.from_config(config) if args.length_unit == "tokens" or max_tokens else None,
+    )
+    pipeline = CorpusPipeline(
+        loader,
+        length_filter=length_filter,
+        train_ratio=args.train_ratio,
+        val_ratio=args.val_ratio,
+        test_ratio=args.test_ratio,
+        deduplicate=not args.no_dedup,
+        workers=args.workers,
+        deduplicator=Deduplicator(
+            memory_budget_mb=args.dedup_memory_mb,
+            spill_dir=args.spill_dir,
+            near_duplicates=args.near_dup or config.get("dedup.near_duplicates", False),
+            threshold=args.near_threshold,
+            num_perm=config.get("dedup.num_perm", 64),
+        ),
+    )
+    shards = pipeline.run(batches, args.output_dir, shard_rows=args.shard_rows)
+    print(pipeline.report())
+    for split, paths in shards.paths.items():
+        print(f"{split}: {shards.rows[split]} pairs in {len(paths)} shards")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,17 @@ import ctranslate2
 from pathlib import Path
 import sys
 import shutil
+import time
 
 sys.path.append(str(Path(__file__).parent.parent))
 from src.utils import logger
+from src.config import config
+from src.artifact import TOKENIZER_DIR, language_tags, write_manifest
+from src.evaluation import corpus_bleu
+from src.vocab_map import build_vocabulary_map, read_corpus, read_source_side, vocabulary_map_report, write_vocabulary_map
 
-def convert_model(model_name_or_path: str, output_dir: str, quantization: str = "int8"):
+def convert_model(model_name_or_path: str, output_dir: str, quantization: str = "int8",
+                  vmap_corpus=None, vmap_min_count: int = 1, eval_sentences: int = 200, bleu_tolerance: float = 1.0):
     logger.info(f"Converting {model_name_or_path} to CTranslate2 format with quantization={quantization}...")
     
     # Clean output directory if it exists
@@ -22,16 +28,103 @@ def convert_model(model_name_or_path: str, output_dir: str, quantization: str =
             low_cpu_mem_usage=True
         )
         converter.convert(output_dir, quantization=quantization, force=True)
+        tokenizer, languages, tags = bundle_tokenizer(model_name_or_path, out_path)
+        vmap = None
+        if vmap_corpus:
+            vmap = build_vmap(out_path, tokenizer, languages, vmap_corpus, vmap_min_count, eval_sentences, bleu_tolerance)
+        manifest = write_manifest(out_path, model_name_or_path, quantization, languages, tags, vmap=vmap)
+        logger.info(f"Wrote manifest (model sha256 {manifest['model_sha256'][:12]}...)")
         logger.info(f"Conversion complete. Model saved to {output_dir}")
     except Exception as e:
         logger.error(f"Conversion failed: {e}")
         sys.exit(1)
 
+def bundle_tokenizer(model_name_or_path: str, out_path: Path):
+    """
+    Saves the tokenizer (SentencePiece model included) into the converted directory,
+    so the Translator can start from this directory alone.
+    Returns the tokenizer, the configured languages it supports and all its language tags.
+    """
+    import transformers
+
+    tokenizer = transformers.AutoTokenizer.from_pretrained(model_name_or_path)
+    tokenizer.save_pretrained(out_path / TOKENIZER_DIR)
+    if not list((out_path / TOKENIZER_DIR).glob("*.model")):
+        logger.warning("Tokenizer has no SentencePiece model to bundle; only tokenizer.json will be available")
+
+    tags = language_tags(tokenizer.get_vocab())
+    languages = {short: code for short, code in config.get("languages", {}).items() if code in tags}
+    missing = set(config.get("languages", {}).values()) - set(languages.values())
+    if missing:
+        logger.warning(f"Tokenizer has no tags for configured languages: {sorted(missing)}")
+    return tokenizer, languages, tags
+
+def build_vmap(out_path: Path, tokenizer, languages, corpus, min_count: int, eval_sentences: int, bleu_tolerance: float):
+    """
+    Restricts decoding to the target tokens our languages use, as seen in a reference corpus.
+    The vocabulary map is checked against the full vocabulary on a sample of the corpus and
+    dropped if BLEU (full-vocabulary output as reference) falls by more than bleu_tolerance.
+    """
+    texts = list(read_corpus(corpus))
+    candidates = build_vocabulary_map(tokenizer, texts, languages.values(), min_count)
+    write_vocabulary_map(out_path, candidates)
+    report = vocabulary_map_report(candidates, len(tokenizer))
+    logger.info(f"Vocabulary map keeps {report['tokens']} of {report['vocab_size']} tokens ({report['fraction']:.1%})")
+
+    # Only source-language text: the check translates source_lang -> target_lang
+    sample = list(dict.fromkeys(read_source_side(corpus)))[:eval_sentences]
+    if sample:
+        report.update(evaluate_vmap(out_path, sample, bleu_tolerance))
+        logger.info(
+            f"Vocabulary map BLEU vs full vocabulary: {report['bleu_vs_full']:.2f} "
+            f"(tolerance {bleu_tolerance}), decoding speedup x{report['speedup']:.2f}"
+        )
+        if report["bleu_drop"] > bleu_tolerance:
+            logger.warning("Vocabulary map exceeds the BLEU tolerance; removing it. Use a larger corpus or --vmap-min-count 1.")
+            (out_path / report["file"]).unlink()
+            report["enabled"] = False
+            return report
+    report["enabled"] = True
+    return report
+
+def evaluate_vmap(out_path: Path, sample, bleu_tolerance: float):
+    from src.translator import Translator
+
+    translator = Translator(model_path=str(out_path), tokenizer_name=str(out_path / TOKENIZER_DIR))
+    translator.cache = None
+    source_lang = config.get("data.source_lang", "eng_Latn")
+    target_lang = config.get("data.target_lang", "sna_Latn")
+
+    timings, outputs = {}, {}
+    for use_vmap in (False, True):
+        translator.use_vmap = use_vmap
+        started = time.perf_counter()
+        outputs[use_vmap] = translator.translate_batch(sample, source_lang, target_lang)
+        timings[use_vmap] = time.perf_counter() - started
+    translator.close()
+
+    # Smoothed, so a sample of short segments that match exactly is not scored 0
+    bleu = corpus_bleu(outputs[True], outputs[False], smooth=True)
+    return {
+        "eval_sentences": len(sample),
+        "eval_direction": f"{source_lang}->{target_lang}",
+        "bleu_vs_full": bleu,
+        "bleu_drop": 100.0 - bleu,
+        "bleu_tolerance": bleu_tolerance,
+        "speedup": timings[False] / max(timings[True], 1e-9),
+    }
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Convert HuggingFace model to CTranslate2 format")
     parser.add_argument("--model", type=str, default="facebook/nllb-200-distilled-600M", help="HF Model ID or path")
     parser.add_argument("--output", type=str, default="models/ctranslate2_int8", help="Output directory")
     parser.add_argument("--quantization", type=str, default="int8", help="Quantization type (int8, int8_float16, float16)")
+    parser.add_argument("--vmap-corpus", nargs="+", default=None, help="Reference corpus in data/ (.txt/.tsv lines or .csv) to build a vocabulary map from")
+    parser.add_argument("--vmap-min-count", type=int, default=1, help="Keep corpus tokens seen at least this often")
+    parser.add_argument("--vmap-eval-sentences", type=int, default=200, help="Corpus sentences used to check BLEU against the full vocabulary")
+    parser.add_argument("--bleu-tolerance", type=float, default=1.0, help="Largest acceptable BLEU drop before the vocabulary map is discarded")
     
     args = parser.parse_args()
-    convert_model(args.model, args.output, args.quantization)
+    convert_model(args.model, args.output, args.quantization, vmap_corpus=args.vmap_corpus,
+                  vmap_min_count=args.vmap_min_count, eval_sentences=args.vmap_eval_sentences,
+                  bleu_tolerance=args.bleu_tolerance)
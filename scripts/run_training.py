@@ -1,38 +1,27 @@
 import argparse
+import os
 from src.trainer import ZimTrainer
 from src.data_loader import DataLoader
-from src.split_utils import split_data
+from src.corpus_pipeline import CorpusPipeline
 from src.utils import logger
-from datasets import Dataset
+from datasets import load_dataset
 
 def main(data_file: str, source_lang: str, target_lang: str, epochs: int, batch_size: int, output_dir: str):
     logger.info(f"Starting training run on {data_file}")
     
-    # 1. Load Data
+    # 1. Load and clean in bounded chunks: normalize -> length-ratio filter -> dedup -> split,
+    # written as Parquet shards so the corpus never has to fit in memory
     loader = DataLoader() # Assuming default data dir
-    # Basic detection of file type
-    if data_file.endswith(".csv"):
-        raw_data = loader.load_csv(data_file, source_col="source", target_col="target")
-    else:
-        # Assuming parallel text files? For now just support CSV in this entry point or fail
-        logger.error("Only CSV supported for this script currently. Use custom loading for TXT.")
+    if not data_file.endswith((".csv", ".parquet", ".arrow", ".feather", ".jsonl")):
+        logger.error("Only CSV, Parquet, Arrow and JSONL are supported by this script. Use scripts/clean_corpus.py for TXT.")
+        return
+
+    pipeline = CorpusPipeline(loader, train_ratio=0.9, val_ratio=0.1, test_ratio=0.0, workers=os.cpu_count())
+    shards = pipeline.run(loader.iter_batches(data_file), os.path.join(output_dir, "corpus"))
+    if not shards.paths["train"]:
+        logger.error(f"No training pairs left in {data_file} after cleaning")
         return
 
-    # 2. Preprocessing
-    # Normalize
-    processed_data = []
-    for item in raw_data:
-        processed_data.append({
-            "source": loader.normalize_text(item["source"]),
-            "target": loader.normalize_text(item["target"])
-        })
-    
-    # Deduplicate
-    processed_data = loader.deduplicate(processed_data)
-    
-    # Split
-    train_data, val_data, _ = split_data(processed_data, train_ratio=0.9, val_ratio=0.1, test_ratio=0.0)
-    
     # Convert to HF Datasets
     # NLLB expects specific input format, usually handled by tokenization in collator or map.
     # Here we typically need to tokenize before passing to trainer or use a map function.
@@ -54,11 +43,14 @@ def main(data_file: str, source_lang: str, target_lang: str, epochs: int, batch_
         model_inputs["labels"] = labels["input_ids"]
         return model_inputs
 
-    hf_train = Dataset.from_list(train_data)
-    hf_val = Dataset.from_list(val_data)
-    
+    # Parquet-backed datasets are memory-mapped from the Arrow cache rather than held as Python lists
+    hf_train = load_dataset("parquet", data_files=[str(p) for p in shards.paths["train"]], split="train")
     tokenized_train = hf_train.map(tokenize_function, batched=True)
-    tokenized_val = hf_val.map(tokenize_function, batched=True)
+    # A small corpus can hash every pair into train; then train without evaluation
+    tokenized_val = None
+    if shards.paths["val"]:
+        hf_val = load_dataset("parquet", data_files=[str(p) for p in shards.paths["val"]], split="train")
+        tokenized_val = hf_val.map(tokenize_function, batched=True)
     
     # 3. Train
     trainer.train(tokenized_train, tokenized_val, batch_size=batch_size, epochs=epochs)
@@ -68,7 +60,7 @@ def main(data_file: str, source_lang: str, target_lang: str, epochs: int, batch_
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Fine-tune NLLB on custom data")
-    parser.add_argument("--data", type=str, required=True, help="Path to data file (CSV) relative to data/")
+    parser.add_argument("--data", type=str, required=True, help="Path to data file (CSV, Parquet, Arrow or JSONL) relative to data/")
     parser.add_argument("--src_lang", type=str, default="eng_Latn", help="Source language code")
     parser.add_argument("--tgt_lang", type=str, default="sna_Latn", help="Target language code")
     parser.add_argument("--epochs", type=int, default=3, help="Number of epochs")
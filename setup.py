@@ -12,6 +12,8 @@ setup(
         "sentencepiece>=0.1.99",
         "transformers>=4.30.0",
         "datasets>=2.14.0",
+        "pyarrow>=12.0.0",
+        "numpy>=1.22",
         "pyyaml",
         "pandas",
         "peft",
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from src.utils import logger
+
+# Written by scripts/convert_model.py next to the CTranslate2 weights
+MANIFEST_NAME = "zimlingua_manifest.json"
+TOKENIZER_DIR = "tokenizer"
+MANIFEST_VERSION = 1
+
+# FLORES-200 language tags as used by NLLB, e.g. sna_Latn
+_LANGUAGE_TAG = re.compile(r"^[a-z]{3}_[A-Z][a-z]{3}$")
+
+
+def file_sha256(path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def language_tags(tokens: Iterable[str]) -> List[str]:
+    """
+    Returns the sorted FLORES-200 language tags among the given tokens.
+    """
+    return sorted({token for token in tokens if _LANGUAGE_TAG.match(token)})
+
+
+def write_manifest(model_dir, source_model: str, quantization: str, languages: Dict[str, str],
+                   tags: Iterable[str], vmap: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Records what the artifact contains: checksums of every weight/vocabulary file
+    (model.bin's doubling as the model hash), the bundled tokenizer, language tags
+    and, if one was built, the vocabulary map with its quality report.
+    """
+    model_dir = Path(model_dir)
+    files = {
+        path.relative_to(model_dir).as_posix(): file_sha256(path)
+        for path in sorted(model_dir.rglob("*"))
+        if path.is_file() and path.name != MANIFEST_NAME
+    }
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "source_model": source_model,
+        "quantization": quantization,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "model_sha256": files.get("model.bin"),
+        "files": files,
+        "tokenizer": TOKENIZER_DIR,
+        "languages": languages,
+        "language_tags": sorted(tags),
+        "vmap": vmap,
+    }
+    with open(model_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(model_dir) -> Optional[Dict[str, Any]]:
+    """
+    Loads the artifact manifest, or returns None for a plain CTranslate2 directory.
+    """
+    try:
+        with open(Path(model_dir) / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def verify_manifest(model_dir, manifest: Dict[str, Any]):
+    """
+    Re-hashes the artifact files. Raises ValueError on a missing or modified file.
+    """
+    model_dir = Path(model_dir)
+    for name, expected in manifest.get("files", {}).items():
+        path = model_dir / name
+        if not path.is_file():
+            raise ValueError(f"Model artifact {model_dir} is missing {name}")
+        if file_sha256(path) != expected:
+            raise ValueError(f"Checksum mismatch for {path}; the artifact was modified or is corrupt")
+    logger.info(f"Verified {len(manifest.get('files', {}))} artifact files in {model_dir}")
@@ -0,0 +1,38 @@
+from typing import List, Sequence
+
+BATCH_TYPES = ("tokens", "examples")
+
+def length_sorted_batches(lengths: Sequence[int], max_batch_size: int, batch_type: str = "tokens") -> List[List[int]]:
+    """
+    Groups item indices into sub-batches of similar length to minimize padding.
+
+    Items are sorted by length and cut into consecutive chunks. With batch_type "tokens"
+    a chunk is capped so that its padded size (items x longest item) stays within
+    max_batch_size; with "examples" a chunk holds at most max_batch_size items.
+    An item longer than the budget still gets a batch of its own.
+    """
+    if batch_type not in BATCH_TYPES:
+        raise ValueError(f"Unknown batch_type '{batch_type}', expected one of {BATCH_TYPES}")
+    if max_batch_size <= 0:
+        raise ValueError("max_batch_size must be positive")
+
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches = []
+    current: List[int] = []
+
+    for index in order:
+        if current:
+            if batch_type == "tokens":
+                # Sorted ascending, so this item is the longest in the candidate batch
+                padded_size = (len(current) + 1) * max(lengths[index], 1)
+                full = padded_size > max_batch_size
+            else:
+                full = len(current) >= max_batch_size
+            if full:
+                batches.append(current)
+                current = []
+        current.append(index)
+
+    if current:
+        batches.append(current)
+    return batches
@@ -0,0 +1,182 @@
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+from src.utils import logger
+
+
+def normalize_key_text(text: str) -> str:
+    """
+    Normalizes text for translation-memory lookups (NFKC, trimmed, collapsed whitespace).
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def make_cache_key(source_lang: str, target_lang: str, decoding: Union[int, str], model_id: str, text: str) -> str:
+    """
+    Builds a fixed-size translation-memory key from the translation settings and normalized text.
+    decoding identifies the decoding options (a beam size or a profile signature).
+    """
+    raw = "\x1f".join([model_id, source_lang, target_lang, str(decoding), normalize_key_text(text)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SQLiteCacheStore:
+    """
+    Persistent translation memory backed by SQLite, shareable between worker processes.
+    """
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        # WAL mode lets several processes read while one writes
+        conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        conn.commit()
+        return conn
+
+    def reopen(self):
+        """
+        Replaces the connection with a new one. A forked child must call this before
+        using the store: SQLite connections cannot be shared across fork().
+        """
+        # The inherited lock may have been held by a thread that does not exist in the child
+        self._lock = threading.Lock()
+        try:
+            self._conn.close()
+        except sqlite3.Error:
+            pass
+        self._conn = self._connect()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM translations WHERE key IN ({placeholders})", chunk
+                )
+                found.update(rows.fetchall())
+        return found
+
+    def put_many(self, items: Dict[str, str]):
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (key, value) VALUES (?, ?)", items.items()
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TranslationCache:
+    """
+    Bounded in-memory LRU translation memory with an optional persistent store behind it.
+    """
+    def __init__(self, max_entries: int = 10000, store: Optional[SQLiteCacheStore] = None):
+        self.max_entries = max_entries
+        self.store = store
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.store_hits = 0
+
+    @classmethod
+    def from_config(cls, config) -> Optional["TranslationCache"]:
+        """
+        Builds the cache from the `cache` section of config.yaml, or returns None if disabled.
+        """
+        if not config.get("cache.enabled", False):
+            return None
+        path = config.get("cache.path")
+        store = SQLiteCacheStore(path) if path else None
+        logger.info(f"Translation memory enabled (max_entries={config.get('cache.max_entries', 10000)}, store={path})")
+        return cls(max_entries=config.get("cache.max_entries", 10000), store=store)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Looks up keys in memory, then in the persistent store. Returns only the keys found.
+        """
+        found = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+                else:
+                    missing.append(key)
+
+        if missing and self.store is not None:
+            stored = self.store.get_many(missing)
+            if stored:
+                self._remember(stored)
+                found.update(stored)
+                missing = [key for key in missing if key not in stored]
+                self.store_hits += len(stored)
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found
+
+    def put_many(self, items: Dict[str, str]):
+        """
+        Stores new translations in memory and in the persistent store.
+        """
+        self._remember(items)
+        if self.store is not None:
+            self.store.put_many(items)
+
+    def _remember(self, items: Dict[str, str]):
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def reopen(self):
+        """
+        Makes the cache safe to use in a forked child: new locks and a new store connection.
+        """
+        self._lock = threading.Lock()
+        if self.store is not None:
+            self.store.reopen()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.store_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "store_hits": self.store_hits,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -1,13 +1,21 @@
 import argparse
+import asyncio
 from pathlib import Path
 import sys
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.translator import Translator
+from src.registry import ModelRegistry, domain_options, load_translator
 from src.utils import logger
 from src.config import config
+from src.streaming import StreamingFileTranslator, default_output_path
+from src.journal import JobJournal
+from src.server import TranslationServer
+from src.daemon import TranslationDaemon, DaemonClient, default_socket_path
+from src.reloader import ModelReloader
+from src.prefork import PreforkServer
+from src.translator import Translator
 
 def main():
     parser = argparse.ArgumentParser(description="ZimLingua CLI: NLLB-200 Neural Machine Translation")
@@ -18,6 +26,10 @@ def main():
     translate_parser.add_argument("text", type=str, help="Text to translate")
     translate_parser.add_argument("--src", type=str, default="en", help="Source language code (en, sn, nd)")
     translate_parser.add_argument("--tgt", type=str, default="sn", help="Target language code (en, sn, nd)")
+    translate_parser.add_argument("--profile", type=str, default=None, help="Decoding profile: fast, balanced, quality (default: decoding.default_profile)")
+    translate_parser.add_argument("--domain", type=str, default=None, help="Route to the models.registry model for this domain, e.g. health")
+    translate_parser.add_argument("--socket", type=str, default=None, help="Daemon socket to use if one is running (default: daemon.socket)")
+    translate_parser.add_argument("--no-daemon", action="store_true", help="Always load the model in this process")
     
     # File Command
     file_parser = subparsers.add_parser("file", help="Translate a file")
@@ -25,6 +37,23 @@ def main():
     file_parser.add_argument("--out", type=str, default=None, help="Path to output file (default: input_translated.txt)")
     file_parser.add_argument("--src", type=str, default="en", help="Source language code")
     file_parser.add_argument("--tgt", type=str, default="sn", help="Target language code")
+    file_parser.add_argument("--profile", type=str, default=None, help="Decoding profile: fast, balanced, quality (default: decoding.default_profile)")
+    file_parser.add_argument("--domain", type=str, default=None, help="Route to the models.registry model for this domain, e.g. health")
+    file_parser.add_argument("--chunk-lines", type=int, default=256, help="Lines read per pipeline chunk")
+    file_parser.add_argument("--queue-size", type=int, default=4, help="Chunks buffered between pipeline stages")
+    file_parser.add_argument("--resume", action="store_true", help="Journal progress and resume an interrupted job (uncompressed output only)")
+    
+    # Serve Command
+    serve_parser = subparsers.add_parser("serve", help="Run an HTTP translation server with micro-batching")
+    serve_parser.add_argument("--host", type=str, default=None, help="Bind address (default: server.host)")
+    serve_parser.add_argument("--port", type=int, default=None, help="Port (default: server.port)")
+    serve_parser.add_argument("--max-wait-ms", type=float, default=None, help="Longest a request waits for its batch to fill")
+    serve_parser.add_argument("--max-batch-tokens", type=int, default=None, help="Source token budget per micro-batch")
+    serve_parser.add_argument("--workers", type=int, default=None, help="Pre-forked worker processes sharing one model (default: server.workers)")
+    
+    # Daemon Command
+    daemon_parser = subparsers.add_parser("daemon", help="Keep the model loaded and answer `translate` calls over a Unix socket")
+    daemon_parser.add_argument("--socket", type=str, default=None, help="Socket path (default: daemon.socket)")
     
     args = parser.parse_args()
     
@@ -33,56 +62,130 @@ def main():
         sys.exit(1)
 
     try:
-        # Initialize Translator (will load model)
-        translator = Translator()
+        # A warm daemon answers in milliseconds; fall back to loading the model here
+        if args.command == "translate" and not args.no_daemon and _try_daemon_translate(args):
+            return
+
+        if args.command == "serve" and (args.workers or config.get("server.workers", 1)) > 1:
+            _handle_prefork_serve(args)
+            return
+
+        # A single Translator, or the models.registry router that loads models on first use
+        translator = load_translator()
+
+        if args.command == "serve":
+            _handle_serve(translator, args)
+            return
+        if args.command == "daemon":
+            _handle_daemon(translator, args)
+            return
         
         src_code = translator.get_language_code(args.src)
         tgt_code = translator.get_language_code(args.tgt)
         
         if args.command == "translate":
-            _handle_single_translate(translator, args.text, src_code, tgt_code)
+            _handle_single_translate(translator, args.text, src_code, tgt_code, profile=args.profile, domain=args.domain)
         elif args.command == "file":
-            _handle_file_translate(translator, args.path, args.out, src_code, tgt_code)
+            file_options = dict(chunk_lines=args.chunk_lines, queue_size=args.queue_size, resume=args.resume, profile=args.profile)
+            if isinstance(translator, ModelRegistry):
+                # The file pipeline drives one model's stages directly; keep it loaded for the whole job
+                with translator.acquire(src_code, tgt_code, args.domain) as model:
+                    _handle_file_translate(model, args.path, args.out, src_code, tgt_code, **file_options)
+            else:
+                domain_options(translator, args.domain)
+                _handle_file_translate(translator, args.path, args.out, src_code, tgt_code, **file_options)
             
     except Exception as e:
         logger.error(f"Error: {e}")
         sys.exit(1)
 
-def _handle_single_translate(translator, text, src, tgt):
-    # Note: translate_batch expects source_lang, target_lang arguments
-    results = translator.translate_batch([text], source_lang=src, target_lang=tgt)
-    print(f"\n[{src} -> {tgt}]: {results[0]}\n")
+def _handle_single_translate(translator, text, src, tgt, profile=None, domain=None):
+    # Document mode splits multi-sentence input instead of sending one long sequence
+    result = translator.translate_document(text, source_lang=src, target_lang=tgt, profile=profile,
+                                           **domain_options(translator, domain))
+    print(f"\n[{src} -> {tgt}]: {result}\n")
+
+def _try_daemon_translate(args) -> bool:
+    client = DaemonClient(args.socket or default_socket_path())
+    try:
+        response = client.translate(args.text, args.src, args.tgt, profile=args.profile, domain=args.domain)
+    except OSError:
+        return False
+    print(f"\n[{response['src']} -> {response['tgt']}]: {response['translation']}\n")
+    return True
 
-def _handle_file_translate(translator, path, out_path, src, tgt):
+def _handle_file_translate(translator, path, out_path, src, tgt, chunk_lines=256, queue_size=4, resume=False, profile=None):
     input_path = Path(path)
     if not input_path.exists():
         logger.error(f"Input file not found: {path}")
         return
 
     if out_path is None:
-        out_path = input_path.with_name(f"{input_path.stem}_translated{input_path.suffix}")
+        out_path = default_output_path(input_path)
     
     logger.info(f"Translating {path} to {out_path} ({src}->{tgt})...")
-    
-    with open(input_path, 'r', encoding='utf-8') as f_in, \
-         open(out_path, 'w', encoding='utf-8') as f_out:
-        
-        lines = f_in.readlines()
-        # Batch processing could be optimized here (chunking)
-        # For simplicity, we process in chunks of 32
-        batch_size = 32
-        
-        for i in range(0, len(lines), batch_size):
-            batch_lines = [line.strip() for line in lines[i:i+batch_size] if line.strip()]
-            if not batch_lines:
-                continue
-                
-            translated_batch = translator.translate_batch(batch_lines, source_lang=src, target_lang=tgt)
-            
-            for trans_line in translated_batch:
-                f_out.write(trans_line + "\n")
+
+    journal = None
+    if resume:
+        job = {
+            "input": str(input_path.resolve()),
+            "input_size": input_path.stat().st_size,
+            "output": str(Path(out_path).resolve()),
+            "src": src,
+            "tgt": tgt,
+            # Resuming with other decoding options would mix outputs
+            "decoding": translator.decoding_profile(profile).signature,
+        }
+        journal = JobJournal.open(JobJournal.default_path(out_path), job)
+
+    # Streams the file through tokenize -> infer -> write stages; .gz/.zst handled transparently
+    pipeline = StreamingFileTranslator(
+        translator, source_lang=src, target_lang=tgt, chunk_lines=chunk_lines, queue_size=queue_size,
+        journal=journal, profile=profile
+    )
+    pipeline.translate_file(input_path, out_path)
                 
     logger.info("File translation complete.")
 
+def _start_reloader(translator) -> ModelReloader:
+    # `kill -HUP <pid>` (or a new artifact, with model.reload.watch) swaps models without a restart
+    reloader = ModelReloader.from_config(translator, config).start()
+    reloader.install_signal_handler()
+    return reloader
+
+def _handle_serve(translator, args):
+    server = TranslationServer.from_config(
+        translator, host=args.host, port=args.port,
+        max_wait_ms=args.max_wait_ms, max_batch_tokens=args.max_batch_tokens
+    )
+    reloader = _start_reloader(translator)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("Server stopped.")
+    finally:
+        reloader.stop()
+
+def _handle_prefork_serve(args):
+    if config.get("models.registry"):
+        raise ValueError("Pre-fork workers serve a single model; leave models.registry empty or use --workers 1")
+    # The parent loads everything but the engine before forking; see src/prefork.py
+    translator = Translator(load_engine=False)
+    server = PreforkServer.from_config(
+        translator, args.workers or config.get("server.workers", 1), host=args.host, port=args.port,
+        max_wait_ms=args.max_wait_ms, max_batch_tokens=args.max_batch_tokens
+    )
+    server.serve_forever()
+
+def _handle_daemon(translator, args):
+    daemon = TranslationDaemon(translator, socket_path=args.socket)
+    reloader = _start_reloader(translator)
+    try:
+        asyncio.run(daemon.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("Daemon stopped.")
+    finally:
+        reloader.stop()
+
 if __name__ == "__main__":
     main()
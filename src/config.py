@@ -1,16 +1,16 @@
 import yaml
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from src.utils import logger
 
 class Config:
     _instance = None
-    _config: Dict[str, Any] = {}
+    _config: Optional[Dict[str, Any]] = None
 
     def __new__(cls):
+        # config.yaml is read on first use, so importing modules (or `--help`) stays cheap
         if cls._instance is None:
             cls._instance = super(Config, cls).__new__(cls)
-            cls._instance._load_config()
         return cls._instance
 
     def _load_config(self):
@@ -35,7 +35,7 @@ class Config:
         Retrieves a configuration value by key (supports nested keys with dot notation).
         """
         keys = key.split(".")
-        value = self._config
+        value = self.all
         try:
             for k in keys:
                 value = value[k]
@@ -45,6 +45,8 @@ class Config:
 
     @property
     def all(self) -> Dict[str, Any]:
+        if self._config is None:
+            self._load_config()
         return self._config
 
 # Global instance
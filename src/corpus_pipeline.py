@@ -0,0 +1,244 @@
+import hashlib
+import time
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+import pyarrow as pa
+from src.utils import logger
+from src.config import config
+from src.dedup import Deduplicator
+from src.length_filter import LengthFilter
+from src.data_loader import DataLoader, PAIR_SCHEMA, SOURCE, TARGET, normalize_pool
+
+SPLITS = ("train", "val", "test")
+
+
+class StageStats:
+    """
+    Rows in and out of one pipeline stage and the time spent in it (upstream stages excluded).
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.rows_in = 0
+        self.rows_out = 0
+        self.seconds = 0.0
+
+    @property
+    def dropped(self) -> int:
+        return self.rows_in - self.rows_out
+
+    def summary(self) -> str:
+        rate = self.rows_in / self.seconds if self.seconds else float("inf")
+        return (f"{self.name:<12} in {self.rows_in:>10} | out {self.rows_out:>10} | dropped {self.dropped:>9} | "
+                f"{self.seconds:7.2f}s | {rate:,.0f} rows/s")
+
+
+class Stage:
+    """
+    A pipeline step applied to one pair batch at a time; fn returns the transformed
+    batch (fewer rows for filters). Subclasses keep state across batches where needed.
+    """
+    def __init__(self, name: str, fn: Optional[Callable[[pa.RecordBatch], pa.RecordBatch]] = None):
+        self.stats = StageStats(name)
+        self.fn = fn
+
+    def process(self, batch: pa.RecordBatch) -> pa.RecordBatch:
+        return self.fn(batch)
+
+    def __call__(self, batches: Iterable[pa.RecordBatch]) -> Iterator[pa.RecordBatch]:
+        for batch in batches:
+            started = time.perf_counter()
+            out = self.process(batch)
+            self.stats.seconds += time.perf_counter() - started
+            self.stats.rows_in += batch.num_rows
+            self.stats.rows_out += out.num_rows
+            if out.num_rows:
+                yield out
+
+
+def _with_columns(sources: Sequence[str], targets: Sequence[str]) -> pa.RecordBatch:
+    return pa.RecordBatch.from_arrays([pa.array(sources, pa.string()), pa.array(targets, pa.string())], schema=PAIR_SCHEMA)
+
+
+def _filtered(batch: pa.RecordBatch, keep: List[bool]) -> pa.RecordBatch:
+    return batch if all(keep) else batch.filter(pa.array(keep, pa.bool_()))
+
+
+class NormalizeStage(Stage):
+    """
+    DataLoader.normalize_batch over both columns; uses the executor's process pool when one is set.
+    """
+    def __init__(self, loader: DataLoader):
+        super().__init__("normalize")
+        self.loader = loader
+        self.executor: Optional[Executor] = None
+
+    def process(self, batch: pa.RecordBatch) -> pa.RecordBatch:
+        texts = batch.column(SOURCE).to_pylist() + batch.column(TARGET).to_pylist()
+        normalized = self.loader.normalize_batch(texts, executor=self.executor)
+        return _with_columns(normalized[:batch.num_rows], normalized[batch.num_rows:])
+
+
+def length_stage(length_filter: LengthFilter) -> Stage:
+    def length(batch: pa.RecordBatch) -> pa.RecordBatch:
+        keep = length_filter.mask(batch.column(SOURCE), batch.column(TARGET))
+        return batch if keep.all() else batch.filter(pa.array(keep))
+    return Stage("length", length)
+
+
+def dedup_stage(deduplicator: Deduplicator) -> Stage:
+    def dedup(batch: pa.RecordBatch) -> pa.RecordBatch:
+        keep = deduplicator.mask(batch.column(SOURCE).to_pylist(), batch.column(TARGET).to_pylist())
+        return _filtered(batch, keep)
+    return Stage("dedup", dedup)
+
+
+def split_of(source: str, target: str, train_ratio: float, val_ratio: float) -> str:
+    """
+    Assigns a pair to train/val/test from a hash of its text: stable across runs and
+    chunk sizes without shuffling the corpus in memory.
+    """
+    digest = hashlib.blake2b(f"{source}\t{target}".encode("utf-8"), digest_size=8).digest()
+    position = int.from_bytes(digest, "big") / 2 ** 64
+    if position < train_ratio:
+        return "train"
+    return "val" if position < train_ratio + val_ratio else "test"
+
+
+class ShardWriter:
+    """
+    Writes each split as numbered Parquet shards of at most shard_rows rows,
+    e.g. train-00000.parquet, so no shard has to fit the whole corpus.
+    Shards left in output_dir by an earlier run are deleted first, so a glob over
+    the directory never mixes two runs. A split without pairs has no shards.
+    """
+    def __init__(self, output_dir, shard_rows: int = 1_000_000):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for split in SPLITS:
+            for stale in self.output_dir.glob(f"{split}-*.parquet"):
+                stale.unlink()
+        self.shard_rows = shard_rows
+        self.rows = {split: 0 for split in SPLITS}
+        self.paths: Dict[str, List[Path]] = {split: [] for split in SPLITS}
+        self._writers = {}
+        self._shard_rows = {}
+
+    def write(self, split: str, batch: pa.RecordBatch):
+        import pyarrow.parquet as pq
+        offset = 0
+        while offset < batch.num_rows:
+            if split not in self._writers:
+                path = self.output_dir / f"{split}-{len(self.paths[split]):05d}.parquet"
+                self._writers[split] = pq.ParquetWriter(path, PAIR_SCHEMA)
+                self._shard_rows[split] = 0
+                self.paths[split].append(path)
+            room = self.shard_rows - self._shard_rows[split]
+            part = batch.slice(offset, room)
+            self._writers[split].write_batch(part)
+            self._shard_rows[split] += part.num_rows
+            self.rows[split] += part.num_rows
+            offset += part.num_rows
+            if self._shard_rows[split] >= self.shard_rows:
+                self._writers.pop(split).close()
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+
+class CorpusPipeline:
+    """
+    Streams a parallel corpus through load -> normalize -> length filter ->
+    dedup -> split -> write shards, one bounded batch at a time, so peak memory
+    depends on the batch size rather than the corpus size (plus the dedup index).
+    Each stage reports its throughput and drop count. With workers > 1, normalization
+    runs in a process pool of that size. length_filter and deduplicator default to the
+    length_filter and dedup sections of the config; the deduplicator is closed at the end of run().
+    """
+    def __init__(self, loader: Optional[DataLoader] = None, ratio_threshold: Optional[float] = None,
+                 train_ratio: float = 0.8, val_ratio: float = 0.1, test_ratio: float = 0.1,
+                 normalize: bool = True, deduplicate: bool = True, workers: int = 1,
+                 deduplicator: Optional[Deduplicator] = None, length_filter: Optional[LengthFilter] = None):
+        if not (0.99 <= train_ratio + val_ratio + test_ratio <= 1.01):
+            raise ValueError("Ratios must sum to 1.0")
+        self.loader = loader or DataLoader()
+        self.train_ratio = train_ratio
+        self.val_ratio = val_ratio
+        self.workers = workers
+        self.stages: List[Stage] = []
+        if normalize:
+            self.stages.append(NormalizeStage(self.loader))
+        self.length_filter = length_filter or LengthFilter.from_config(config, ratio=ratio_threshold)
+        self.stages.append(length_stage(self.length_filter))
+        self.deduplicator = (deduplicator or Deduplicator.from_config(config)) if deduplicate else None
+        if self.deduplicator is not None:
+            self.stages.append(dedup_stage(self.deduplicator))
+        self.load_stats = StageStats("load")
+        self.write_stats = StageStats("split+write")
+
+    def clean(self, batches: Iterable[pa.RecordBatch]) -> Iterator[pa.RecordBatch]:
+        """
+        Lazily applies the cleaning stages; nothing runs until the result is iterated.
+        """
+        batches = self._count_load(batches)
+        for stage in self.stages:
+            batches = stage(batches)
+        return batches
+
+    def _count_load(self, batches: Iterable[pa.RecordBatch]) -> Iterator[pa.RecordBatch]:
+        iterator = iter(batches)
+        while True:
+            started = time.perf_counter()
+            batch = next(iterator, None)
+            self.load_stats.seconds += time.perf_counter() - started
+            if batch is None:
+                return
+            self.load_stats.rows_in += batch.num_rows
+            self.load_stats.rows_out += batch.num_rows
+            yield batch
+
+    def run(self, batches: Iterable[pa.RecordBatch], output_dir, shard_rows: int = 1_000_000) -> ShardWriter:
+        """
+        Cleans the batches and writes train/val/test Parquet shards to output_dir.
+        """
+        writer = ShardWriter(output_dir, shard_rows)
+        normalizer = next((stage for stage in self.stages if isinstance(stage, NormalizeStage)), None)
+        pool = normalize_pool(self.workers) if normalizer is not None and self.workers > 1 else None
+        if pool is not None:
+            normalizer.executor = pool
+        try:
+            for batch in self.clean(batches):
+                started = time.perf_counter()
+                self._write_splits(writer, batch)
+                self.write_stats.seconds += time.perf_counter() - started
+                self.write_stats.rows_in += batch.num_rows
+                self.write_stats.rows_out += batch.num_rows
+        finally:
+            writer.close()
+            if pool is not None:
+                normalizer.executor = None
+                pool.shutdown()
+            if self.deduplicator is not None:
+                self.deduplicator.close()
+        logger.info("Corpus cleaning finished:\n" + self.report() + "\n" +
+                    " ".join(f"{split}={rows}" for split, rows in writer.rows.items()) + f" -> {output_dir}")
+        return writer
+
+    def _write_splits(self, writer: ShardWriter, batch: pa.RecordBatch):
+        splits = [
+            split_of(source, target, self.train_ratio, self.val_ratio)
+            for source, target in zip(batch.column(SOURCE).to_pylist(), batch.column(TARGET).to_pylist())
+        ]
+        for split in SPLITS:
+            keep = [assigned == split for assigned in splits]
+            if any(keep):
+                writer.write(split, _filtered(batch, keep))
+
+    def report(self) -> str:
+        lines = [stats.summary() for stats in [self.load_stats, *(stage.stats for stage in self.stages), self.write_stats]]
+        lines.append(self.length_filter.report())
+        if self.deduplicator is not None:
+            lines.append(self.deduplicator.report())
+        return "\n".join(lines)
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+from src.utils import logger
+from src.config import config
+from src.registry import domain_options
+
+
+def default_socket_path() -> str:
+    """
+    daemon.socket from config.yaml, else a per-user socket in the runtime directory.
+    """
+    configured = config.get("daemon.socket")
+    if configured:
+        return str(Path(configured).expanduser())
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"zimlingua-{os.getuid()}.sock")
+
+
+class TranslationDaemon:
+    """
+    Keeps a loaded Translator warm behind a Unix socket.
+
+    Protocol: one JSON object per line in each direction.
+        {"text": str | "texts": [str], "src": "en", "tgt": "sn", "profile": "fast" (optional)}
+        -> {"translation": str | "translations": [str], "src": "eng_Latn", "tgt": "sna_Latn"}
+        -> {"error": str} on failure
+    """
+    def __init__(self, translator, socket_path: Optional[str] = None):
+        self.translator = translator
+        self.socket_path = socket_path or default_socket_path()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, getattr(translator, "inter_threads", 1)), thread_name_prefix="daemon"
+        )
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        path = Path(self.socket_path)
+        if path.exists():
+            if is_daemon_running(self.socket_path):
+                raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+            # Left behind by a daemon that did not shut down cleanly
+            path.unlink()
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._server = await asyncio.start_unix_server(self._handle_connection, path=self.socket_path)
+        # The socket gives access to the model; keep it to the current user
+        os.chmod(self.socket_path, 0o600)
+        logger.info(f"Translation daemon listening on {self.socket_path}")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._executor.shutdown(wait=True)
+
+    async def serve_forever(self):
+        """
+        Serves until SIGTERM or SIGINT, then removes the socket.
+        """
+        await self.start()
+        loop = asyncio.get_running_loop()
+        stopped = asyncio.Event()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stopped.set)
+        try:
+            await stopped.wait()
+        finally:
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                loop.remove_signal_handler(sig)
+            await self.stop()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    response = await loop.run_in_executor(self._executor, self._translate, request)
+                except Exception as e:
+                    response = {"error": str(e)}
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _translate(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        source_lang = self.translator.get_language_code(request.get("src", "en"))
+        target_lang = self.translator.get_language_code(request.get("tgt", "sn"))
+        profile = request.get("profile")
+        options = domain_options(self.translator, request.get("domain"))
+        response = {"src": source_lang, "tgt": target_lang}
+        if "text" in request:
+            response["translation"] = self.translator.translate_document(request["text"], source_lang, target_lang,
+                                                                         profile=profile, **options)
+        else:
+            texts = request["texts"]
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ValueError("texts must be a list of strings")
+            response["translations"] = self.translator.translate_batch(texts, source_lang, target_lang, profile=profile, **options)
+        return response
+
+
+class DaemonClient:
+    """
+    Blocking client for TranslationDaemon. Uses only the standard library so that
+    the CLI does not import the model stack when a daemon is available.
+    """
+    def __init__(self, socket_path: Optional[str] = None, timeout: Optional[float] = 60.0):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+
+    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Sends one request and returns the response.
+        Raises OSError if no daemon is listening and RuntimeError if it reports an error.
+        """
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            sock.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as f:
+                line = f.readline()
+        if not line:
+            raise ConnectionError("Daemon closed the connection without a response")
+        response = json.loads(line)
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return response
+
+    def translate(self, text: str, source_lang: str, target_lang: str, profile: Optional[str] = None,
+                  domain: Optional[str] = None) -> Dict[str, Any]:
+        return self.request({"text": text, "src": source_lang, "tgt": target_lang, "profile": profile, "domain": domain})
+
+
+def is_daemon_running(socket_path: Optional[str] = None) -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1.0)
+            sock.connect(socket_path or default_socket_path())
+        return True
+    except OSError:
+        return False
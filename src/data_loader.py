@@ -1,8 +1,69 @@
-import pandas as pd
+import os
+import re
+import unicodedata
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import get_context
 from pathlib import Path
-from typing import List, Dict, Optional, Union
+from typing import Iterator, List, Dict, Optional, Sequence, Union
+import pyarrow as pa
+import pyarrow.compute as pc
 from src.utils import logger
 from src.config import config
+from src.dedup import Deduplicator
+from src.length_filter import LengthFilter
+
+# Column names of the pair tables returned by the columnar loaders
+SOURCE, TARGET = "source", "target"
+PAIR_SCHEMA = pa.schema([(SOURCE, pa.string()), (TARGET, pa.string())])
+DEFAULT_BATCH_ROWS = 100_000
+# Text formats are read in blocks of this many bytes
+_BLOCK_SIZE = 16 << 20
+
+_FORMATS = {
+    ".csv": "csv", ".tsv": "csv",
+    ".parquet": "parquet", ".pq": "parquet",
+    ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow",
+    ".jsonl": "jsonl", ".json": "jsonl",
+}
+
+# normalize_text patterns, compiled once: characters outside words, whitespace and basic punctuation, and whitespace runs
+_STRIP_CHARS = re.compile(r'[^\w\s\.,!?\'"-]')
+_WHITESPACE = re.compile(r'\s+')
+# Texts per task sent to a normalize_batch worker; large enough to amortize pickling
+NORMALIZE_CHUNK = 20_000
+
+
+def pairs_from_table(table: Union[pa.Table, pa.RecordBatch]) -> List[Dict[str, str]]:
+    """
+    Converts a pair table to the list-of-dicts form the rest of the code used to take.
+    """
+    return [
+        {"source": source, "target": target}
+        for source, target in zip(table.column(SOURCE).to_pylist(), table.column(TARGET).to_pylist())
+    ]
+
+
+def _pair_batch(batch: pa.RecordBatch, source_col: str, target_col: str) -> pa.RecordBatch:
+    """
+    Selects and renames the two text columns (no copy for string data) and drops rows missing either side.
+    """
+    columns = []
+    for name in (source_col, target_col):
+        column = batch.column(batch.schema.get_field_index(name))
+        if not pa.types.is_string(column.type):
+            column = column.cast(pa.string())
+        columns.append(column)
+    pairs = pa.RecordBatch.from_arrays(columns, schema=PAIR_SCHEMA)
+    if pairs.column(0).null_count or pairs.column(1).null_count:
+        pairs = pairs.filter(pc.and_(pc.is_valid(pairs.column(0)), pc.is_valid(pairs.column(1))))
+    return pairs
+
+
+def _check_columns(names: Sequence[str], columns: Sequence[str], path: Path):
+    if not set(columns) <= set(names):
+        raise ValueError(f"Columns {columns[0]} and/or {columns[1]} missing in {path.name}")
+
 
 class DataLoader:
     def __init__(self, data_dir: str = "data"):
@@ -10,39 +71,94 @@ class DataLoader:
         if not self.data_dir.exists():
             self.data_dir.mkdir(parents=True)
 
-    def load_csv(self, filename: str, source_col: str, target_col: str) -> List[Dict[str, str]]:
-        """
-        Loads a CSV dataset and returns a list of source-target pairs.
-        """
+    def _path(self, filename: str) -> Path:
         file_path = self.data_dir / filename
         if not file_path.exists():
             logger.error(f"File not found: {file_path}")
             raise FileNotFoundError(f"{file_path} does not exist")
+        return file_path
+
+    def iter_batches(self, filename: str, source_col: str = SOURCE, target_col: str = TARGET,
+                     batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[pa.RecordBatch]:
+        """
+        Streams a dataset as Arrow record batches with string "source" and "target"
+        columns, dropping rows that miss either side. The format follows the suffix:
+        .csv/.tsv, .parquet, .arrow/.feather (Arrow IPC, memory-mapped) or .jsonl.
+        Parquet and Arrow batches have at most batch_rows rows; CSV and JSONL are read
+        in blocks of about 16 MB. Only the two columns are decoded.
+        """
+        path = self._path(filename)
+        fmt = _FORMATS.get(path.suffix.lower())
+        if fmt is None:
+            raise ValueError(f"Unsupported dataset format {path.suffix}; expected one of {', '.join(sorted(_FORMATS))}")
+        columns = [source_col, target_col]
+        reader = getattr(self, f"_read_{fmt}")
+        for batch in reader(path, columns, batch_rows):
+            yield _pair_batch(batch, source_col, target_col)
 
+    def _read_csv(self, path: Path, columns: List[str], batch_rows: int) -> Iterator[pa.RecordBatch]:
+        import pyarrow.csv as pacsv
         try:
-            df = pd.read_csv(file_path)
-            if source_col not in df.columns or target_col not in df.columns:
-                raise ValueError(f"Columns {source_col} and/or {target_col} missing in CSV")
-            
-            # Drop NaN values
-            df = df.dropna(subset=[source_col, target_col])
-            
-            data = []
-            for _, row in df.iterrows():
-                data.append({
-                    "source": str(row[source_col]),
-                    "target": str(row[target_col])
-                })
-            
-            logger.info(f"Loaded {len(data)} pairs from {filename}")
-            return data
-        except Exception as e:
-            logger.error(f"Error loading CSV {filename}: {e}")
-            raise
+            reader = pacsv.open_csv(
+                path,
+                read_options=pacsv.ReadOptions(block_size=_BLOCK_SIZE),
+                parse_options=pacsv.ParseOptions(delimiter="\t" if path.suffix.lower() == ".tsv" else ",",
+                                                 newlines_in_values=True),
+                # Empty cells count as missing, as they did with pandas
+                convert_options=pacsv.ConvertOptions(include_columns=columns, strings_can_be_null=True,
+                                                     column_types={name: pa.string() for name in columns}),
+            )
+        except (pa.ArrowInvalid, pa.ArrowKeyError) as e:
+            # ArrowKeyError: a column named in include_columns is not in the header
+            raise ValueError(f"Columns {columns[0]} and/or {columns[1]} missing in {path.name}: {e}") from e
+        yield from reader
 
-    def load_txt(self, source_file: str, target_file: str) -> List[Dict[str, str]]:
+    def _read_parquet(self, path: Path, columns: List[str], batch_rows: int) -> Iterator[pa.RecordBatch]:
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path)
+        _check_columns(parquet.schema_arrow.names, columns, path)
+        yield from parquet.iter_batches(batch_size=batch_rows, columns=columns)
+
+    def _read_arrow(self, path: Path, columns: List[str], batch_rows: int) -> Iterator[pa.RecordBatch]:
+        import pyarrow.ipc as ipc
+        # Memory-mapped: batches point into the page cache instead of being copied into the heap
+        with pa.memory_map(str(path), "r") as source:
+            try:
+                reader = ipc.open_file(source)
+                batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            except pa.ArrowInvalid:
+                source.seek(0)
+                reader = ipc.open_stream(source)
+                batches = iter(reader)
+            _check_columns(reader.schema.names, columns, path)
+            for batch in batches:
+                for offset in range(0, batch.num_rows, batch_rows):
+                    yield batch.slice(offset, batch_rows)
+
+    def _read_jsonl(self, path: Path, columns: List[str], batch_rows: int) -> Iterator[pa.RecordBatch]:
+        import pyarrow.json as pajson
+        read_options = pajson.ReadOptions(block_size=_BLOCK_SIZE)
+        if hasattr(pajson, "open_json"):
+            reader = pajson.open_json(path, read_options=read_options)
+        else:
+            # pyarrow < 19 has no incremental JSON reader
+            reader = pajson.read_json(path, read_options=read_options).to_batches()
+        for batch in reader:
+            _check_columns(batch.schema.names, columns, path)
+            yield batch
+
+    def load_table(self, filename: str, source_col: str = SOURCE, target_col: str = TARGET) -> pa.Table:
         """
-        Loads parallel TXT files (line-by-line alignment).
+        Loads a whole dataset as an Arrow table of "source"/"target" columns; see iter_batches for formats.
+        """
+        table = pa.Table.from_batches(list(self.iter_batches(filename, source_col, target_col)), schema=PAIR_SCHEMA)
+        logger.info(f"Loaded {table.num_rows} pairs from {filename}")
+        return table
+
+    def iter_txt_batches(self, source_file: str, target_file: str,
+                         batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[pa.RecordBatch]:
+        """
+        Streams parallel TXT files (line-by-line alignment) as pair batches.
         """
         src_path = self.data_dir / source_file
         tgt_path = self.data_dir / target_file
@@ -52,35 +168,51 @@ class DataLoader:
 
         with open(src_path, 'r', encoding='utf-8') as f_src, \
              open(tgt_path, 'r', encoding='utf-8') as f_tgt:
-            
-            src_lines = f_src.readlines()
-            tgt_lines = f_tgt.readlines()
-
-        if len(src_lines) != len(tgt_lines):
-            logger.warning(f"Line count mismatch: Source={len(src_lines)}, Target={len(tgt_lines)}")
-            # Truncate to minimum length
-            min_len = min(len(src_lines), len(tgt_lines))
-            src_lines = src_lines[:min_len]
-            tgt_lines = tgt_lines[:min_len]
-
-        data = []
-        for s, t in zip(src_lines, tgt_lines):
-            data.append({
-                "source": s.strip(),
-                "target": t.strip()
-            })
-            
-        logger.info(f"Loaded {len(data)} pairs from parallel TXT files")
-        return data
+            count = 0
+            while True:
+                src_lines = [line.strip() for line in islice(f_src, batch_rows)]
+                tgt_lines = [line.strip() for line in islice(f_tgt, batch_rows)]
+                if len(src_lines) != len(tgt_lines):
+                    # Truncate to the shorter file
+                    src_extra, tgt_extra = sum(1 for _ in f_src), sum(1 for _ in f_tgt)
+                    logger.warning(f"Line count mismatch: Source={count + len(src_lines) + src_extra}, "
+                                   f"Target={count + len(tgt_lines) + tgt_extra}")
+                    n = min(len(src_lines), len(tgt_lines))
+                    src_lines, tgt_lines = src_lines[:n], tgt_lines[:n]
+                if not src_lines:
+                    return
+                count += len(src_lines)
+                yield pa.RecordBatch.from_arrays([pa.array(src_lines, pa.string()), pa.array(tgt_lines, pa.string())],
+                                                 schema=PAIR_SCHEMA)
+
+    def load_txt_table(self, source_file: str, target_file: str) -> pa.Table:
+        table = pa.Table.from_batches(list(self.iter_txt_batches(source_file, target_file)), schema=PAIR_SCHEMA)
+        logger.info(f"Loaded {table.num_rows} pairs from parallel TXT files")
+        return table
+
+    def load_csv(self, filename: str, source_col: str, target_col: str) -> List[Dict[str, str]]:
+        """
+        Loads a CSV dataset and returns a list of source-target pairs.
+        Compatibility wrapper around load_table, which large corpora should use instead.
+        """
+        try:
+            return pairs_from_table(self.load_table(filename, source_col, target_col))
+        except Exception as e:
+            logger.error(f"Error loading CSV {filename}: {e}")
+            raise
+
+    def load_txt(self, source_file: str, target_file: str) -> List[Dict[str, str]]:
+        """
+        Loads parallel TXT files (line-by-line alignment).
+        Compatibility wrapper around load_txt_table.
+        """
+        return pairs_from_table(self.load_txt_table(source_file, target_file))
 
     @staticmethod
     def normalize_text(text: str) -> str:
         """
         Normalizes text: lowercasing, stripping whitespace, removing emojis/special chars if needed.
         """
-        import re
-        import unicodedata
-
         if not isinstance(text, str):
             return ""
 
@@ -92,25 +224,42 @@ class DataLoader:
 
         # Remove emojis (simple regex range for common emojis)
         # This is valid for many emoji ranges but not exhaustive
-        text = re.sub(r'[^\w\s\.,!?\'"-]', '', text)
+        text = _STRIP_CHARS.sub('', text)
 
         # Collapse multiple spaces
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE.sub(' ', text)
 
         return text.strip()
 
-    def deduplicate(self, data: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    @staticmethod
+    def normalize_batch(texts: Sequence[str], workers: Optional[int] = None, chunk_size: int = NORMALIZE_CHUNK,
+                        executor: Optional[Executor] = None) -> List[str]:
         """
-        Removes duplicate source-target pairs from the dataset.
+        normalize_text over a list, split into chunk_size pieces spread over a process pool
+        (all cores by default). Output is identical to calling normalize_text on each text.
+        Pass an executor from normalize_pool() to reuse workers across calls; inputs of a
+        single chunk, or workers=1, run in this process.
         """
-        unique_pairs = set()
-        deduplicated_data = []
-        
-        for item in data:
-            pair = (item['source'], item['target'])
-            if pair not in unique_pairs:
-                unique_pairs.add(pair)
-                deduplicated_data.append(item)
+        if executor is None and (workers == 1 or len(texts) <= chunk_size):
+            return _normalize_chunk(texts)
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        if executor is not None:
+            return [text for chunk in executor.map(_normalize_chunk, chunks) for text in chunk]
+        with normalize_pool(min(workers or os.cpu_count() or 1, len(chunks))) as pool:
+            return [text for chunk in pool.map(_normalize_chunk, chunks) for text in chunk]
+
+    def deduplicate(self, data: List[Dict[str, str]], deduplicator: Optional[Deduplicator] = None) -> List[Dict[str, str]]:
+        """
+        Removes duplicate source-target pairs from the dataset. Pass a Deduplicator to
+        control the memory budget or enable near-duplicate detection.
+        """
+        dedup = deduplicator or Deduplicator()
+        try:
+            keep = dedup.mask([item['source'] for item in data], [item['target'] for item in data])
+        finally:
+            if deduplicator is None:
+                dedup.close()
+        deduplicated_data = [item for item, kept in zip(data, keep) if kept]
         
         logger.info(f"Deduplication: Removed {len(data) - len(deduplicated_data)} duplicates. Remaining: {len(deduplicated_data)}")
         return deduplicated_data
@@ -127,28 +276,40 @@ class DataLoader:
             logger.error(f"Failed to load tokenizer for {model_name}: {e}")
             raise
 
-    def filter_by_length_ratio(self, data: List[Dict[str, str]], threshold: float = 1.5) -> List[Dict[str, str]]:
+    def filter_by_length_ratio(self, data: List[Dict[str, str]], threshold: float = 1.5,
+                               length_filter: Optional[LengthFilter] = None) -> List[Dict[str, str]]:
         """
         Filters out pairs where the length ratio between source and target deviates significantly.
-        This often indicates misalignment or bad translations.
+        This often indicates misalignment or bad translations. Pass a LengthFilter to count
+        subword tokens or apply min/max length limits as well.
         """
-        filtered_data = []
-        dropped_count = 0
-        
-        for item in data:
-            src_len = len(item['source'].split())
-            tgt_len = len(item['target'].split())
-            
-            if src_len == 0 or tgt_len == 0:
-                dropped_count += 1
-                continue
-                
-            ratio = src_len / tgt_len
-            if ratio < (1/threshold) or ratio > threshold:
-                dropped_count += 1
-                continue
-                
-            filtered_data.append(item)
+        sources, targets = [item['source'] for item in data], [item['target'] for item in data]
+        if length_filter is not None:
+            keep = length_filter.mask(sources, targets).tolist()
+        else:
+            keep = self.length_ratio_mask(sources, targets, threshold)
+        filtered_data = [item for item, kept in zip(data, keep) if kept]
+        dropped_count = len(data) - len(filtered_data)
             
         logger.info(f"Alignment Check: Dropped {dropped_count} pairs based on length ratio threshold {threshold}")
         return filtered_data
+
+    @staticmethod
+    def length_ratio_mask(sources: Sequence[str], targets: Sequence[str], threshold: float = 1.5) -> List[bool]:
+        """
+        Marks the pairs whose word-count ratio is within [1/threshold, threshold]; empty sides fail.
+        """
+        return LengthFilter(ratio=threshold, min_length=0).mask(sources, targets).tolist()
+
+
+def _normalize_chunk(texts: Sequence[str]) -> List[str]:
+    normalize = DataLoader.normalize_text
+    return [normalize(text) for text in texts]
+
+
+def normalize_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Process pool for DataLoader.normalize_batch. Workers are spawned rather than forked
+    so they do not inherit locks held by Arrow's or the server's threads.
+    """
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, mp_context=get_context("spawn"))
@@ -0,0 +1,309 @@
+import hashlib
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from src.utils import logger
+
+MB = 1 << 20
+# Bytes per exact-duplicate digest: collisions stay negligible well past billions of pairs
+DIGEST_SIZE = 16
+# Near-duplicate comparison ignores case, punctuation and spacing
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def pair_digest(source: str, target: str) -> bytes:
+    """
+    Fixed-size fingerprint of a pair. The source length is included so that
+    ("ab", "c") and ("a", "bc") differ.
+    """
+    return hashlib.blake2b(f"{len(source)}:{source}{target}".encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+
+class DigestIndex:
+    """
+    Set of fixed-size digests kept in memory up to memory_budget_mb, then spilled to a
+    temporary SQLite table under spill_dir, so the index can outgrow RAM. Lookups go
+    to memory first and to disk only for digests not found there.
+    """
+    def __init__(self, memory_budget_mb: float = 1024, spill_dir: Optional[str] = None, digest_size: int = DIGEST_SIZE):
+        self.memory_budget = int(memory_budget_mb * MB)
+        self.spill_dir = spill_dir
+        self._memory: Set[bytes] = set()
+        # Size of one digest object; the set's own table is measured separately
+        self._digest_bytes = sys.getsizeof(bytes(digest_size))
+        self._tmpdir: Optional[str] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self.spilled = 0
+        self.spills = 0
+
+    def __len__(self) -> int:
+        return len(self._memory) + self.spilled
+
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._memory) + len(self._memory) * self._digest_bytes
+
+    def disk_bytes(self) -> int:
+        if self._tmpdir is None:
+            return 0
+        return sum(path.stat().st_size for path in Path(self._tmpdir).iterdir())
+
+    def contains(self, digests: Sequence[bytes]) -> List[bool]:
+        found = [digest in self._memory for digest in digests]
+        if self._conn is not None:
+            missing = {digest for digest, hit in zip(digests, found) if not hit}
+            on_disk = self._lookup(missing)
+            found = [hit or digest in on_disk for digest, hit in zip(digests, found)]
+        return found
+
+    def add(self, digests: Iterable[bytes]):
+        self._memory.update(digests)
+        if self.memory_bytes() > self.memory_budget:
+            self._spill()
+
+    def add_new(self, digests: Sequence[bytes]) -> List[bool]:
+        """
+        Adds the digests and marks which were not already present (first occurrence within the batch counts).
+        """
+        present = self.contains(digests)
+        batch: Set[bytes] = set()
+        new = []
+        for digest, hit in zip(digests, present):
+            if hit or digest in batch:
+                new.append(False)
+            else:
+                batch.add(digest)
+                new.append(True)
+        self.add(batch)
+        return new
+
+    def _lookup(self, digests: Set[bytes]) -> Set[bytes]:
+        digests = list(digests)
+        found = set()
+        # Stay well below SQLite's bound-parameter limit
+        for i in range(0, len(digests), 500):
+            chunk = digests[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(f"SELECT digest FROM digests WHERE digest IN ({placeholders})", chunk)
+            found.update(row[0] for row in rows)
+        return found
+
+    def _spill(self):
+        if self._conn is None:
+            self._tmpdir = tempfile.mkdtemp(prefix="zimlingua-dedup-", dir=self.spill_dir)
+            self._conn = sqlite3.connect(str(Path(self._tmpdir) / "digests.sqlite"))
+            # A scratch index: durability does not matter, speed does
+            self._conn.execute("PRAGMA journal_mode=OFF")
+            self._conn.execute("PRAGMA synchronous=OFF")
+            self._conn.execute(f"PRAGMA cache_size=-{max(2048, self.memory_budget // 4 // 1024)}")
+            self._conn.execute("CREATE TABLE digests (digest BLOB PRIMARY KEY) WITHOUT ROWID")
+            logger.info(f"Dedup index exceeded {self.memory_budget // MB} MB, spilling to {self._tmpdir}")
+        # Sorted inserts keep the B-tree appends cheap
+        self._conn.executemany("INSERT OR IGNORE INTO digests (digest) VALUES (?)", ((d,) for d in sorted(self._memory)))
+        self._conn.commit()
+        self.spilled += len(self._memory)
+        self.spills += 1
+        self._memory = set()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+
+def lsh_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Picks (bands, rows) for num_perm MinHash values whose LSH threshold (1/bands)^(1/rows)
+    is closest to the requested Jaccard similarity.
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHashLSH:
+    """
+    MinHash signatures over byte shingles of a pair (source and target joined, with
+    case, punctuation and spacing removed), hashed into LSH band keys. Pairs sharing
+    a band key with an earlier pair are near-duplicates, i.e. their estimated
+    Jaccard similarity is around threshold or above.
+
+    Signatures use one-permutation hashing: each shingle is hashed once and the
+    minimum is kept per hash bucket, with empty buckets filled from their
+    neighbours (rotation densification). That costs one hash per shingle instead of
+    one per shingle and permutation, and whole batches are hashed at once with NumPy.
+    """
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, shingle_size: int = 5, seed: int = 1):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+        self.num_perm = self.bands * self.rows
+        rng = np.random.default_rng(seed)
+        self._seed = rng.integers(0, 1 << 63, dtype=np.uint64)
+        # Odd multipliers that fold each band's rows into one 64-bit key, different per band
+        self._fold = rng.integers(0, 1 << 63, size=(self.bands, self.rows), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+    @staticmethod
+    def _text(source: str, target: str) -> str:
+        return " ".join(_NON_WORD.sub(" ", side.lower()).strip() for side in (source, target)).strip()
+
+    def hashable(self, source: str, target: str) -> bool:
+        """
+        False for pairs with nothing left once punctuation and spacing are removed:
+        they would all share one signature, so only exact dedup applies to them.
+        """
+        return bool(self._text(source, target))
+
+    def _document(self, source: str, target: str) -> bytes:
+        return self._text(source, target).encode("utf-8").ljust(self.shingle_size)
+
+    def _mix(self, x: np.ndarray) -> np.ndarray:
+        # splitmix64 finalizer; uint64 arithmetic wraps
+        x = x ^ self._seed
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+    def signatures(self, sources: Sequence[str], targets: Sequence[str]) -> np.ndarray:
+        """
+        Returns a (pairs, num_perm) array of MinHash values.
+        """
+        n, k = self.shingle_size, self.num_perm
+        documents = [self._document(source, target) for source, target in zip(sources, targets)]
+        data = np.frombuffer(b"".join(documents), dtype=np.uint8).astype(np.uint64)
+        lengths = np.fromiter((len(d) for d in documents), dtype=np.int64, count=len(documents))
+        # Every n-byte window, packed base 256 (wrapping beyond 8 bytes)
+        windows = np.zeros(len(data) - n + 1, dtype=np.uint64)
+        for i in range(n):
+            windows = (windows << np.uint64(8)) | data[i:len(data) - n + 1 + i]
+        # Keep windows inside one document; each document has at least one
+        owner = np.repeat(np.arange(len(documents)), lengths)[:len(windows)]
+        inside = np.arange(len(windows)) + n <= np.cumsum(lengths)[owner]
+        hashes, owner = self._mix(windows[inside]), owner[inside]
+
+        empty = np.iinfo(np.uint64).max
+        signatures = np.full(len(documents) * k, empty, dtype=np.uint64)
+        np.minimum.at(signatures, owner * k + (hashes % np.uint64(k)).astype(np.int64), hashes)
+        signatures = signatures.reshape(len(documents), k)
+        filled = signatures.copy()
+        for step in range(1, k):
+            missing = filled == empty
+            if not missing.any():
+                break
+            # Borrow from the bucket step places to the right, offset so borrowed values differ by distance
+            donor = np.roll(signatures, -step, axis=1)
+            usable = missing & (donor != empty)
+            filled[usable] = donor[usable] + np.uint64(step * 0x9E3779B97F4A7C15 % (1 << 64))
+        return filled
+
+    def band_keys(self, sources: Sequence[str], targets: Sequence[str]) -> List[List[bytes]]:
+        """
+        Returns the bands 8-byte LSH keys of each pair.
+        """
+        if not len(sources):
+            return []
+        bands = self.signatures(sources, targets).reshape(len(sources), self.bands, self.rows)
+        keys = (bands * self._fold).sum(axis=2, dtype=np.uint64).tobytes()
+        width = 8 * self.bands
+        return [[keys[i + j:i + j + 8] for j in range(0, width, 8)] for i in range(0, len(keys), width)]
+
+
+class Deduplicator:
+    """
+    Drops repeated pairs across a whole corpus, one batch at a time.
+
+    Exact duplicates are found by 16-byte digests in a DigestIndex instead of the
+    pair strings. With near_duplicates, pairs that survive that check also go
+    through MinHash/LSH, which catches pairs that differ only in punctuation,
+    spacing or a few characters. Both indexes share the memory budget and spill
+    to disk beyond it. Removals per mode and memory per million pairs are
+    available from stats() and report().
+    """
+    def __init__(self, memory_budget_mb: float = 1024, spill_dir: Optional[str] = None,
+                 near_duplicates: bool = False, threshold: float = 0.8, num_perm: int = 64, shingle_size: int = 5):
+        share = 2 if near_duplicates else 1
+        self.exact = DigestIndex(memory_budget_mb / share, spill_dir)
+        self.lsh = MinHashLSH(threshold, num_perm, shingle_size) if near_duplicates else None
+        self.near = DigestIndex(memory_budget_mb / share, spill_dir, digest_size=8) if near_duplicates else None
+        self.seen = 0
+        self.removed_exact = 0
+        self.removed_near = 0
+
+    @classmethod
+    def from_config(cls, config) -> "Deduplicator":
+        return cls(
+            memory_budget_mb=config.get("dedup.memory_budget_mb", 1024),
+            spill_dir=config.get("dedup.spill_dir", None),
+            near_duplicates=config.get("dedup.near_duplicates", False),
+            threshold=config.get("dedup.threshold", 0.8),
+            num_perm=config.get("dedup.num_perm", 64),
+        )
+
+    def mask(self, sources: Sequence[str], targets: Sequence[str]) -> List[bool]:
+        """
+        Marks the pairs to keep: the first occurrence of each (near-)duplicate group.
+        """
+        keep = self.exact.add_new([pair_digest(source, target) for source, target in zip(sources, targets)])
+        self.seen += len(keep)
+        self.removed_exact += keep.count(False)
+        if self.lsh is not None:
+            self._mark_near(sources, targets, keep)
+        return keep
+
+    def _mark_near(self, sources: Sequence[str], targets: Sequence[str], keep: List[bool]):
+        candidates = [i for i, kept in enumerate(keep) if kept and self.lsh.hashable(sources[i], targets[i])]
+        keys = self.lsh.band_keys([sources[i] for i in candidates], [targets[i] for i in candidates])
+        flat = [key for pair_keys in keys for key in pair_keys]
+        present = iter(self.near.contains(flat))
+        batch: Set[bytes] = set()
+        for i, pair_keys in zip(candidates, keys):
+            hits = [next(present) for _ in pair_keys]
+            if any(hits) or any(key in batch for key in pair_keys):
+                keep[i] = False
+                self.removed_near += 1
+            else:
+                batch.update(pair_keys)
+        self.near.add(batch)
+
+    def memory_bytes(self) -> int:
+        return self.exact.memory_bytes() + (self.near.memory_bytes() if self.near is not None else 0)
+
+    def disk_bytes(self) -> int:
+        return self.exact.disk_bytes() + (self.near.disk_bytes() if self.near is not None else 0)
+
+    def stats(self) -> dict:
+        kept = self.seen - self.removed_exact - self.removed_near
+        return {
+            "pairs": self.seen,
+            "kept": kept,
+            "removed_exact": self.removed_exact,
+            "removed_near": self.removed_near,
+            "memory_mb": self.memory_bytes() / MB,
+            "disk_mb": self.disk_bytes() / MB,
+            # Index size per million kept pairs, in memory and spilled
+            "mb_per_million_pairs": (self.memory_bytes() + self.disk_bytes()) / MB / kept * 1e6 if kept else 0.0,
+        }
+
+    def report(self) -> str:
+        stats = self.stats()
+        line = f"dedup: {stats['pairs']} pairs, removed {stats['removed_exact']} exact"
+        if self.lsh is not None:
+            line += f" + {stats['removed_near']} near-duplicates (threshold {self.lsh.threshold}, {self.lsh.bands}x{self.lsh.rows} LSH bands)"
+        return (line + f"; index {stats['memory_mb']:.1f} MB in memory + {stats['disk_mb']:.1f} MB on disk "
+                f"= {stats['mb_per_million_pairs']:.1f} MB per million pairs")
+
+    def close(self):
+        self.exact.close()
+        if self.near is not None:
+            self.near.close()
@@ -0,0 +1,52 @@
+import math
+import re
+from collections import Counter
+from typing import List, Sequence
+
+# Splits punctuation off words, roughly like sacreBLEU's 13a tokenizer
+_PUNCTUATION = re.compile(r"([^\w\s])")
+
+
+def bleu_tokenize(text: str) -> List[str]:
+    return _PUNCTUATION.sub(r" \1 ", text).split()
+
+
+def corpus_bleu(hypotheses: Sequence[str], references: Sequence[str], max_order: int = 4, smooth: bool = False) -> float:
+    """
+    Corpus-level BLEU (0-100) with one reference per sentence and the standard brevity penalty.
+    Dependency-free so it also runs on air-gapped build nodes. N-gram orders longer than
+    every hypothesis are left out (effective order), so short segments such as UI strings
+    still score. With smooth, an order with no matches gets precision 1 / (2^k * total)
+    (sacreBLEU's "exp" smoothing) instead of zeroing the score.
+    """
+    matches = [0] * max_order
+    totals = [0] * max_order
+    hyp_length = ref_length = 0
+
+    for hypothesis, reference in zip(hypotheses, references):
+        hyp_tokens, ref_tokens = bleu_tokenize(hypothesis), bleu_tokenize(reference)
+        hyp_length += len(hyp_tokens)
+        ref_length += len(ref_tokens)
+        for n in range(1, max_order + 1):
+            hyp_ngrams = Counter(tuple(hyp_tokens[i:i + n]) for i in range(len(hyp_tokens) - n + 1))
+            ref_ngrams = Counter(tuple(ref_tokens[i:i + n]) for i in range(len(ref_tokens) - n + 1))
+            matches[n - 1] += sum((hyp_ngrams & ref_ngrams).values())
+            totals[n - 1] += max(len(hyp_tokens) - n + 1, 0)
+
+    if hyp_length == 0:
+        return 100.0 if ref_length == 0 else 0.0
+    precisions = []
+    zero_matches = 0
+    for m, t in zip(matches, totals):
+        if t == 0:
+            continue
+        if m == 0:
+            if not smooth:
+                return 0.0
+            zero_matches += 1
+            precisions.append(1 / (2 ** zero_matches * t))
+        else:
+            precisions.append(m / t)
+    log_precision = sum(math.log(p) for p in precisions) / len(precisions)
+    brevity_penalty = 1.0 if hyp_length > ref_length else math.exp(1 - ref_length / hyp_length)
+    return 100.0 * brevity_penalty * math.exp(log_precision)
@@ -0,0 +1,105 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+from src.utils import logger
+
+
+class JobJournal:
+    """
+    Progress journal for a resumable file translation.
+
+    Records how far the input has been consumed and how many output bytes are known
+    to be durable. Each commit is written to a temporary file, fsynced and renamed
+    over the previous journal, so a crash leaves either the old or the new record.
+    """
+    def __init__(self, path, job: Dict[str, Any]):
+        self.path = Path(path)
+        self.job = job
+        self.input_offset = 0
+        self.output_offset = 0
+        self.lines_done = 0
+
+    @classmethod
+    def default_path(cls, output_path) -> Path:
+        output_path = Path(output_path)
+        return output_path.with_name(f"{output_path.name}.journal.json")
+
+    @classmethod
+    def open(cls, path, job: Dict[str, Any]) -> "JobJournal":
+        """
+        Loads an existing journal for the same job, or starts a fresh one.
+        Raises ValueError if the journal on disk belongs to a different job.
+        """
+        journal = cls(path, job)
+        state = journal._read()
+        if state is None:
+            return journal
+
+        if state.get("job") != job:
+            raise ValueError(
+                f"Journal {path} was written for a different job ({state.get('job')}). "
+                "Remove it or choose another output path."
+            )
+        journal.input_offset = state["input_offset"]
+        journal.output_offset = state["output_offset"]
+        journal.lines_done = state["lines_done"]
+        logger.info(f"Resuming job from line {journal.lines_done} (input byte {journal.input_offset})")
+        return journal
+
+    @property
+    def resuming(self) -> bool:
+        return self.lines_done > 0
+
+    def check_output(self, output_path):
+        """
+        Starts over from a clean journal if output_path no longer holds the committed
+        output, i.e. it was deleted or is shorter than output_offset.
+        """
+        if not self.resuming:
+            return
+        output_path = Path(output_path)
+        size = output_path.stat().st_size if output_path.exists() else None
+        if size is not None and size >= self.output_offset:
+            return
+        found = "is missing" if size is None else f"has {size} bytes, {self.output_offset} committed"
+        logger.warning(f"Output {output_path} {found}; restarting the job from the beginning")
+        self.input_offset = 0
+        self.output_offset = 0
+        self.lines_done = 0
+        if self.path.exists():
+            self.path.unlink()
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        if not self.path.exists():
+            return None
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def commit(self, input_offset: int, output_offset: int, lines_done: int):
+        """
+        Durably records progress. The output file must already be flushed and fsynced.
+        """
+        self.input_offset = input_offset
+        self.output_offset = output_offset
+        self.lines_done = lines_done
+
+        state = {
+            "job": self.job,
+            "input_offset": input_offset,
+            "output_offset": output_offset,
+            "lines_done": lines_done,
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def finish(self):
+        """
+        Removes the journal once the job has completed.
+        """
+        if self.path.exists():
+            self.path.unlink()
@@ -0,0 +1,203 @@
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union
+import numpy as np
+import pyarrow as pa
+
+# Non-ASCII whitespace str.split() splits on, UTF-8 encoded
+_SPACE_SEQUENCES = [chr(c).encode("utf-8") for c in (0x85, 0xA0, 0x1680, *range(0x2000, 0x200B), 0x2028, 0x2029, 0x202F, 0x205F, 0x3000)]
+_SPACE_LEADS = sorted({sequence[0] for sequence in _SPACE_SEQUENCES})
+# Texts per tokenizer call when counting subword tokens
+TOKENIZE_BATCH = 10_000
+# Rows per word-counting slice
+WORD_COUNT_ROWS = 1 << 16
+
+Texts = Union[pa.Array, pa.ChunkedArray, Sequence[str]]
+
+
+def _as_array(texts: Texts) -> Union[pa.Array, pa.ChunkedArray]:
+    return texts if isinstance(texts, (pa.Array, pa.ChunkedArray)) else pa.array(texts, pa.string())
+
+
+def _string_chunks(texts: Texts):
+    # Bounded slices keep the per-byte scratch arrays small
+    array = _as_array(texts)
+    chunks = array.chunks if isinstance(array, pa.ChunkedArray) else [array]
+    for chunk in chunks:
+        chunk = chunk if pa.types.is_large_string(chunk.type) else chunk.cast(pa.large_string())
+        for start in range(0, len(chunk), WORD_COUNT_ROWS):
+            yield chunk.slice(start, WORD_COUNT_ROWS)
+
+
+def _space_mask(data: np.ndarray) -> np.ndarray:
+    # ASCII whitespace: space, \t-\r and \x1c-\x1f (uint8 subtraction wraps, so each is one range check)
+    space = (data == 0x20) | ((data - np.uint8(0x09)) <= 4) | ((data - np.uint8(0x1C)) <= 3)
+    if not len(data) or data.max() < _SPACE_LEADS[0]:
+        return space
+    # Multi-byte whitespace is rare: only look at positions holding one of its lead bytes.
+    # UTF-8 is self-synchronizing, so a byte-level match is always a whole character
+    leads = np.flatnonzero(np.isin(data, _SPACE_LEADS))
+    for sequence in _SPACE_SEQUENCES:
+        n = len(sequence)
+        positions = leads[leads + n <= len(data)]
+        match = np.ones(len(positions), dtype=bool)
+        for k in range(n):
+            match &= data[positions + k] == sequence[k]
+        for k in range(n):
+            space[positions[match] + k] = True
+    return space
+
+
+def word_counts(texts: Texts) -> np.ndarray:
+    """
+    len(text.split()) for a whole column at once, counted on Arrow's UTF-8 buffer with
+    NumPy: a word starts at each non-space byte that follows a space or a string start.
+    Nulls count as 0.
+    """
+    counts = []
+    for chunk in _string_chunks(texts):
+        _, offsets, data = chunk.buffers()
+        offsets = np.frombuffer(offsets, dtype=np.int64)[chunk.offset:chunk.offset + len(chunk) + 1]
+        data = np.frombuffer(data, dtype=np.uint8) if data is not None else np.zeros(0, dtype=np.uint8)
+        data = data[offsets[0]:offsets[-1]]
+        offsets = offsets - offsets[0]
+        space = _space_mask(data)
+        starts = ~space
+        starts[1:] &= space[:-1]
+        # The first byte of every string starts a word unless it is a space
+        firsts = offsets[:-1][offsets[:-1] < offsets[1:]]
+        starts[firsts] = ~space[firsts]
+        chunk_counts = np.diff(np.searchsorted(np.flatnonzero(starts), offsets))
+        if chunk.null_count:
+            chunk_counts[~chunk.is_valid().to_numpy(zero_copy_only=False)] = 0
+        counts.append(chunk_counts)
+    return np.concatenate(counts) if counts else np.zeros(0, dtype=np.int64)
+
+
+class TokenCounter:
+    """
+    Counts subword tokens (no special tokens) with a Hugging Face tokenizer, TOKENIZE_BATCH
+    texts per call. With cache_dir, the counts for each column batch are stored under
+    a hash of its text and tokenizer, so re-cleaning the same corpus skips tokenization.
+    """
+    def __init__(self, tokenizer, cache_dir: Optional[str] = None, name: Optional[str] = None):
+        self.tokenizer = tokenizer
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.name = name or getattr(tokenizer, "name_or_path", type(tokenizer).__name__)
+        self.hits = 0
+        self.misses = 0
+        self._special_tokens: Optional[int] = None
+
+    @property
+    def special_tokens(self) -> int:
+        """
+        Tokens the tokenizer adds to every sequence when add_special_tokens=True (NLLB: language tag and </s>).
+        """
+        if self._special_tokens is None:
+            count = getattr(self.tokenizer, "num_special_tokens_to_add", None)
+            if count is not None:
+                self._special_tokens = count()
+            else:
+                self._special_tokens = len(self.tokenizer([""], add_special_tokens=True)["input_ids"][0])
+        return self._special_tokens
+
+    @classmethod
+    def from_config(cls, config) -> "TokenCounter":
+        from src.data_loader import DataLoader
+        name = config.get("model.name", "facebook/nllb-200-distilled-600M")
+        return cls(DataLoader().get_tokenizer(name), config.get("length_filter.cache_dir", None), name)
+
+    def counts(self, texts: Texts) -> np.ndarray:
+        values = [text or "" for text in _as_array(texts).to_pylist()]
+        path = None
+        if self.cache_dir is not None:
+            digest = hashlib.blake2b(self.name.encode("utf-8"), digest_size=16)
+            for text in values:
+                digest.update(text.encode("utf-8"))
+                digest.update(b"\x00")
+            path = self.cache_dir / f"{digest.hexdigest()}.npy"
+            if path.exists():
+                self.hits += 1
+                return np.load(path)
+        counts = np.empty(len(values), dtype=np.int64)
+        for i in range(0, len(values), TOKENIZE_BATCH):
+            encoded = self.tokenizer(values[i:i + TOKENIZE_BATCH], add_special_tokens=False)["input_ids"]
+            counts[i:i + len(encoded)] = [len(ids) for ids in encoded]
+        self.misses += 1
+        if path is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            np.save(path, counts)
+        return counts
+
+
+class LengthFilter:
+    """
+    Vectorized pair filter that checks every length criterion in one pass over a batch:
+    empty sides, source/target length ratio within [1/ratio, ratio], min/max length
+    per side, and (with max_tokens, e.g. data.max_length) pairs that training would
+    truncate once special tokens are added. Lengths are whitespace words, or subword tokens with unit="tokens".
+    Drop counts per criterion are kept in dropped (the first failing criterion counts).
+    """
+    CRITERIA = ("empty", "ratio", "min_length", "max_length", "truncated")
+
+    def __init__(self, ratio: Optional[float] = 1.5, min_length: int = 1, max_length: Optional[int] = None,
+                 unit: str = "words", max_tokens: Optional[int] = None, token_counter: Optional[TokenCounter] = None):
+        if unit not in ("words", "tokens"):
+            raise ValueError(f"Unknown length unit: {unit}. Use 'words' or 'tokens'.")
+        if (unit == "tokens" or max_tokens) and token_counter is None:
+            raise ValueError("Token lengths need a token_counter")
+        self.ratio = ratio
+        self.min_length = min_length
+        self.max_length = max_length
+        self.unit = unit
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter
+        self.dropped: Dict[str, int] = {criterion: 0 for criterion in self.CRITERIA}
+
+    @classmethod
+    def from_config(cls, config, ratio: Optional[float] = None) -> "LengthFilter":
+        unit = config.get("length_filter.unit", "words")
+        max_tokens = config.get("data.max_length", 128) if config.get("length_filter.drop_truncated", False) else None
+        return cls(
+            ratio=ratio if ratio is not None else config.get("length_filter.ratio", 1.5),
+            min_length=config.get("length_filter.min_length", 1),
+            max_length=config.get("length_filter.max_length", None),
+            unit=unit,
+            max_tokens=max_tokens,
+            token_counter=TokenCounter.from_config(config) if unit == "tokens" or max_tokens else None,
+        )
+
+    def mask(self, sources: Texts, targets: Texts) -> np.ndarray:
+        """
+        Boolean array marking the pairs that pass every criterion.
+        """
+        tokens = None
+        if self.token_counter is not None:
+            tokens = self.token_counter.counts(sources), self.token_counter.counts(targets)
+        src, tgt = tokens if self.unit == "tokens" else (word_counts(sources), word_counts(targets))
+
+        failed = {"empty": (src == 0) | (tgt == 0)}
+        if self.ratio:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = src / tgt
+            failed["ratio"] = ~((1 / self.ratio <= ratio) & (ratio <= self.ratio))
+        failed["min_length"] = (src < self.min_length) | (tgt < self.min_length)
+        if self.max_length is not None:
+            failed["max_length"] = (src > self.max_length) | (tgt > self.max_length)
+        if self.max_tokens:
+            # Training tokenizes with special tokens (language tag, </s>), which share the max_length budget
+            budget = self.max_tokens - self.token_counter.special_tokens
+            failed["truncated"] = (tokens[0] > budget) | (tokens[1] > budget)
+
+        keep = np.ones(len(src), dtype=bool)
+        for criterion, fails in failed.items():
+            self.dropped[criterion] += int(np.count_nonzero(keep & fails))
+            keep &= ~fails
+        return keep
+
+    def report(self) -> str:
+        parts = [f"{criterion} {count}" for criterion, count in self.dropped.items() if count]
+        line = f"length filter ({self.unit}): dropped " + (", ".join(parts) if parts else "nothing")
+        if self.token_counter is not None and self.token_counter.cache_dir is not None:
+            line += f"; token count cache {self.token_counter.hits} hits, {self.token_counter.misses} misses"
+        return line
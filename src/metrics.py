@@ -0,0 +1,169 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional
+
+# Seconds; spans interactive single-sentence calls up to large file batches
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+TOKEN_BUCKETS = (8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 65536)
+
+
+class Counter:
+    """
+    Monotonically increasing value.
+    """
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> float:
+        return self.value
+
+
+class Gauge:
+    """
+    Value that can go up and down (e.g. queue depth).
+    """
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    def snapshot(self) -> float:
+        return self.value
+
+
+class Histogram:
+    """
+    Cumulative bucketed distribution plus a window of recent samples for percentiles.
+    """
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS, window: int = 10000):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            index = len(self.buckets)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    index = i
+                    break
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            self._recent.append(value)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """
+        Observes the wall-clock duration of the with-block in seconds.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Returns the q-th percentile (0-100) over the recent window, or None if empty.
+        """
+        with self._lock:
+            samples = sorted(self._recent)
+        if not samples:
+            return None
+        rank = min(len(samples) - 1, max(0, int(round(q / 100 * (len(samples) - 1)))))
+        return samples[rank]
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            counts = list(self.counts)
+            count, total = self.count, self.sum
+        return {
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else None,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "buckets": {str(bound): c for bound, c in zip(self.buckets + ("+Inf",), counts)},
+        }
+
+
+class MetricsRegistry:
+    """
+    Named collection of metrics with a JSON-friendly snapshot.
+    """
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name: str, factory):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = factory()
+            return self._metrics[name]
+
+    def counter(self, name: str) -> Counter:
+        return self._get_or_create(name, Counter)
+
+    def gauge(self, name: str) -> Gauge:
+        return self._get_or_create(name, Gauge)
+
+    def histogram(self, name: str, buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(buckets))
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            metrics = dict(self._metrics)
+        return {name: metric.snapshot() for name, metric in metrics.items()}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix: str = "zimlingua_") -> str:
+        """
+        Renders all metrics in the Prometheus text exposition format (version 0.0.4).
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+
+        lines = []
+        for name, metric in metrics:
+            full_name = prefix + name
+            if isinstance(metric, Histogram):
+                with metric._lock:
+                    counts = list(metric.counts)
+                    count, total = metric.count, metric.sum
+                lines.append(f"# TYPE {full_name} histogram")
+                cumulative = 0
+                for bound, bucket_count in zip(metric.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(float(bound))
+                    lines.append(f'{full_name}_bucket{{le="{le}"}} {cumulative}')
+                lines.append(f"{full_name}_sum {total}")
+                lines.append(f"{full_name}_count {count}")
+            else:
+                kind = "counter" if isinstance(metric, Counter) else "gauge"
+                lines.append(f"# TYPE {full_name} {kind}")
+                lines.append(f"{full_name} {metric.snapshot()}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,233 @@
+import math
+import re
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.utils import logger
+
+# Whole-segment patterns that never need the model
+_URL = re.compile(r"(?:[a-z][a-z0-9+.-]*://|www\.)\S+", re.IGNORECASE)
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+# Evidence of code in a segment without spaces: brackets and operators, calls like name() or
+# f(a, b=1), "::" and "->", snake_case or _private identifiers, and paths ending in a file extension.
+# Plain "/", "(" or a capital after a lowercase letter are not enough: "and/or", "(Yes)",
+# "iPhone" and Shona/Ndebele prefixed names like "muHarare" or "eBulawayo" are ordinary text
+_CODE_CHARS = re.compile(
+    r"[{}\[\]<>=;\\$#@|`]|::|->"
+    r"|\w\(\)|\w\([^()]*[,=\"'][^()]*\)"
+    r"|[^\W_]_\w|(?:^|\W)_\w"
+    r"|[\w.-]*/[\w./-]*\.[A-Za-z0-9]{1,5}$"
+)
+_CODE_LINE = re.compile(r"^(?:def|class|import|from|return|const|let|var|function|#include|SELECT|INSERT|UPDATE)\b.*[:;{(,]\s*$")
+_BACKTICKED = re.compile(r"^`[^`]+`$")
+_LETTER = re.compile(r"[^\W\d_]")
+_LETTER_WORDS = re.compile(r"[^\W\d_]+")
+
+# Seed text for the built-in language identifier; short, but en/sn/nd differ sharply at the character level
+SEED_TEXT = {
+    "en": [
+        "The people are coming home today and they will stay with us for the whole week.",
+        "Thank you very much for your help, we are grateful for everything you have done.",
+        "Good morning, how are you feeling this morning after the long journey?",
+        "The children went to school early because the teacher wanted to see them.",
+        "Please send the report to the office before the end of the day.",
+        "We need clean water, food and medicine for the families in the village.",
+        "She said that the meeting would be held in the hall on Friday afternoon.",
+        "There is no reason why we should not finish the work this month.",
+        "The government announced new rules for farmers who grow maize and tobacco.",
+        "If it rains tomorrow, the market will be closed and everyone should stay inside.",
+        "What is your name and where do you come from?",
+        "I would like to buy some bread, milk and sugar from the shop.",
+    ],
+    "sn": [
+        "Vanhu vari kuuya kumba nhasi uye vachagara nesu vhiki yose.",
+        "Ndatenda zvikuru nerubatsiro rwenyu, tinotenda nezvose zvamakaita.",
+        "Mangwanani akanaka, makadii mangwanani ano mushure merwendo rurefu?",
+        "Vana vakaenda kuchikoro mangwanani nekuti mudzidzisi aida kuvaona.",
+        "Ndapota tumirai gwaro kuhofisi zuva risati rapera.",
+        "Tinoda mvura yakachena, chikafu nemishonga yemhuri dziri mumusha.",
+        "Akati musangano uchaitirwa muhoro neChishanu masikati.",
+        "Hapana chikonzero chekuti tisapedze basa mwedzi uno.",
+        "Hurumende yakazivisa mitemo mitsva yevarimi vanorima chibage nefodya.",
+        "Kana kukanaya mangwana, musika uchavharwa uye munhu wese anofanira kugara mumba.",
+        "Unonzi ani uye unobva kupi?",
+        "Ndinoda kutenga chingwa, mukaka neshuga kuchitoro.",
+    ],
+    "nd": [
+        "Abantu bayeza ekhaya lamuhla njalo bazahlala lathi iviki lonke.",
+        "Ngiyabonga kakhulu ngosizo lwakho, siyabonga ngakho konke okwenzileyo.",
+        "Livukile, linjani ekuseni lamuhla ngemva kohambo olude?",
+        "Abantwana baya esikolo ekuseni ngoba umfundisi wayefuna ukubabona.",
+        "Ngicela uthumele umbiko ehofisini ilanga lingakatshoni.",
+        "Sidinga amanzi ahlanzekileyo, ukudla lemithi yemuli esigabeni.",
+        "Uthe umhlangano uzakwenzelwa ehholo ngoLwesihlanu ntambama.",
+        "Akukho sizatho sokuthi singaqedi umsebenzi kule nyanga.",
+        "Uhulumende umemezele imithetho emitsha yabalimi abalima umumbu logwayi.",
+        "Uba izulu lina kusasa, imakethe izavalwa njalo wonke umuntu kumele ahlale endlini.",
+        "Ibizo lakho ngubani njalo uvela ngaphi?",
+        "Ngifuna ukuthenga isinkwa, uchago loshukela esitolo.",
+    ],
+}
+
+
+class LanguageIdentifier:
+    """
+    Naive Bayes over character 1-3 grams of space-padded, lowercased words.
+    """
+    def __init__(self, log_probs: Dict[str, Dict[str, float]], unseen: Dict[str, float]):
+        self.log_probs = log_probs
+        self.unseen = unseen
+
+    @staticmethod
+    def ngrams(text: str, max_n: int = 3) -> Iterable[str]:
+        for word in _LETTER_WORDS.findall(text.lower()):
+            padded = f" {word} "
+            for n in range(1, max_n + 1):
+                for i in range(len(padded) - n + 1):
+                    yield padded[i:i + n]
+
+    @classmethod
+    def train(cls, samples: Dict[str, Iterable[str]]) -> "LanguageIdentifier":
+        """
+        Builds n-gram models from example text per language, e.g. lines from data/.
+        """
+        counts = {lang: Counter(gram for text in texts for gram in cls.ngrams(text)) for lang, texts in samples.items()}
+        vocabulary = set().union(*counts.values()) if counts else set()
+        log_probs, unseen = {}, {}
+        for lang, grams in counts.items():
+            # Add-one smoothing over the shared n-gram vocabulary
+            total = sum(grams.values()) + len(vocabulary) + 1
+            log_probs[lang] = {gram: math.log((count + 1) / total) for gram, count in grams.items()}
+            unseen[lang] = math.log(1 / total)
+        return cls(log_probs, unseen)
+
+    @classmethod
+    def from_files(cls, paths: Dict[str, str], max_lines: Optional[int] = None) -> "LanguageIdentifier":
+        """
+        Trains on one text file per language (one sentence per line), e.g. held-out
+        monolingual or parallel-corpus sides; {"en": "data/heldout.en", ...}.
+        """
+        samples = {}
+        for lang, path in paths.items():
+            with open(path, "r", encoding="utf-8") as f:
+                lines = (line.strip() for line in f)
+                samples[lang] = [line for line in islice(lines, max_lines) if line]
+        return cls.train(samples)
+
+    def log_likelihoods(self, text: str) -> Dict[str, float]:
+        """
+        Returns the log-likelihood of the text under each language divided by its n-gram
+        count, so values are comparable across lengths (unlike posteriors, which saturate).
+        """
+        grams = list(self.ngrams(text))
+        if not grams:
+            return {}
+        return {
+            lang: sum(table.get(gram, self.unseen[lang]) for gram in grams) / len(grams)
+            for lang, table in self.log_probs.items()
+        }
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """
+        Returns the posterior probability of each language (uniform prior).
+        """
+        grams = list(self.ngrams(text))
+        if not grams:
+            return {}
+        totals = {
+            lang: sum(table.get(gram, self.unseen[lang]) for gram in grams)
+            for lang, table in self.log_probs.items()
+        }
+        best = max(totals.values())
+        exp = {lang: math.exp(total - best) for lang, total in totals.items()}
+        norm = sum(exp.values())
+        return {lang: value / norm for lang, value in exp.items()}
+
+    def detect(self, text: str) -> Tuple[Optional[str], float]:
+        scores = self.scores(text)
+        if not scores:
+            return None, 0.0
+        lang = max(scores, key=scores.get)
+        return lang, scores[lang]
+
+
+class Prefilter:
+    """
+    Finds segments that should pass through untranslated: empty or whitespace,
+    numbers and other letter-free text, URLs, emails, code-like tokens and text
+    that is already in the target language. Only whole segments are skipped.
+    """
+    REASONS = ("empty", "number", "url", "email", "code", "target_language")
+
+    def __init__(self, languages: Dict[str, str], identifier: Optional[LanguageIdentifier] = None,
+                 skip_target_language: bool = False, min_margin: float = 0.5, min_chars: int = 20):
+        # FLORES code -> short code used by the identifier
+        self.short_codes = {code: short for short, code in languages.items()}
+        self.identifier = identifier or LanguageIdentifier.train(SEED_TEXT)
+        self.skip_target_language = skip_target_language
+        # Per-n-gram log-likelihood lead of the target language over the source language.
+        # English with a few Shona/Ndebele names or loanwords stays well below 0.5
+        self.min_margin = min_margin
+        self.min_chars = min_chars
+
+    @classmethod
+    def from_config(cls, config) -> Optional["Prefilter"]:
+        if not config.get("prefilter.enabled", True):
+            return None
+        identifier_data = config.get("prefilter.identifier_data", None)
+        prefilter = cls(
+            config.get("languages", {}),
+            identifier=LanguageIdentifier.from_files(identifier_data) if identifier_data else None,
+            skip_target_language=config.get("prefilter.skip_target_language", False),
+            min_margin=config.get("prefilter.min_margin", 0.5),
+            min_chars=config.get("prefilter.min_chars", 20),
+        )
+        logger.info("Pass-through pre-filter enabled")
+        return prefilter
+
+    def classify(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        """
+        Returns why the segment needs no translation (one of REASONS), or None to translate it.
+        """
+        stripped = text.strip()
+        if not stripped:
+            return "empty"
+        if not _LETTER.search(stripped):
+            return "number"
+        if _URL.fullmatch(stripped):
+            return "url"
+        if _EMAIL.fullmatch(stripped):
+            return "email"
+        if _BACKTICKED.match(stripped) or _CODE_LINE.match(stripped):
+            return "code"
+        if not any(c.isspace() for c in stripped) and _CODE_CHARS.search(stripped):
+            return "code"
+        if self._in_target_language(stripped, source_lang, target_lang):
+            return "target_language"
+        return None
+
+    def _in_target_language(self, text: str, source_lang: str, target_lang: str) -> bool:
+        if source_lang == target_lang:
+            return True
+        if not self.skip_target_language:
+            return False
+        target = self.short_codes.get(target_lang)
+        if target is None or target not in self.identifier.log_probs or len(text) < self.min_chars:
+            return False
+        likelihoods = self.identifier.log_likelihoods(text)
+        if not likelihoods or max(likelihoods, key=likelihoods.get) != target:
+            return False
+        source = self.short_codes.get(source_lang)
+        runner_up = likelihoods.get(source, max(v for lang, v in likelihoods.items() if lang != target))
+        return likelihoods[target] - runner_up >= self.min_margin
+
+    def split(self, texts: List[str], source_langs: List[str], target_langs: List[str]) -> Dict[int, str]:
+        """
+        Returns {index: reason} for the segments that should pass through.
+        """
+        skipped = {}
+        for i, (text, src, tgt) in enumerate(zip(texts, source_langs, target_langs)):
+            reason = self.classify(text, src, tgt)
+            if reason is not None:
+                skipped[i] = reason
+        return skipped
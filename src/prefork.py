@@ -0,0 +1,442 @@
+import asyncio
+import gc
+import itertools
+import os
+import queue
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import Pipe
+from multiprocessing.connection import Connection
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional, Union
+from src.utils import logger
+from src.config import config
+from src.metrics import MetricsRegistry
+from src.server import TranslationServer
+
+MB = 1 << 20
+# Fields of a CTranslate2 GenerationStepResult sent over the pipe for each streamed token
+_STEP_FIELDS = ("step", "batch_id", "token_id", "hypothesis_id", "token", "log_prob", "is_last")
+
+# /proc/<pid>/smaps_rollup fields (kB) behind each figure of memory_usage()
+_SMAPS_FIELDS = {
+    "rss": ("Rss",),
+    "pss": ("Pss",),
+    "shared": ("Shared_Clean", "Shared_Dirty"),
+    "unique": ("Private_Clean", "Private_Dirty"),
+    "swap": ("Swap",),
+}
+
+
+def memory_usage(pid: Union[int, str] = "self") -> Dict[str, int]:
+    """
+    Memory of a process in bytes: rss, pss (shared pages split between their users),
+    shared (pages also mapped by other processes), unique (pages only this process
+    holds, i.e. what it costs to add one more worker) and swap. Linux only; empty elsewhere.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            lines = f.readlines()
+    except OSError:
+        return {}
+    fields = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        parts = value.split()
+        if parts and parts[0].isdigit():
+            fields[name.strip()] = int(parts[0]) * 1024
+    return {key: sum(fields.get(name, 0) for name in names) for key, names in _SMAPS_FIELDS.items()}
+
+
+def memory_report(pids: Dict[str, int]) -> str:
+    """
+    One line per process with RSS split into unique and shared MB, plus the total
+    proportional footprint, which is what the processes really use together.
+    """
+    lines, total_pss = [], 0
+    for name, pid in pids.items():
+        usage = memory_usage(pid)
+        if not usage:
+            continue
+        total_pss += usage["pss"]
+        lines.append(
+            f"{name} (pid {pid}): rss {usage['rss'] / MB:.0f} MB = unique {usage['unique'] / MB:.0f} MB "
+            f"+ shared {usage['shared'] / MB:.0f} MB (pss {usage['pss'] / MB:.0f} MB)"
+        )
+    lines.append(f"total pss {total_pss / MB:.0f} MB")
+    return "\n".join(lines)
+
+
+def update_memory_gauges(metrics: MetricsRegistry):
+    for key, value in memory_usage().items():
+        metrics.gauge(f"process_{key}_bytes").set(value)
+
+
+class _RemoteResult:
+    __slots__ = ("hypotheses", "_future", "_index")
+
+    def __init__(self, future: Future, index: int):
+        self._future = future
+        self._index = index
+        self.hypotheses = None
+
+    def result(self) -> "_RemoteResult":
+        # Same shape as a CTranslate2 async result: result() blocks, then .hypotheses is set
+        self.hypotheses = self._future.result()[self._index]
+        return self
+
+
+class RemoteEngine:
+    """
+    Stands in for ctranslate2.Translator inside a pre-fork worker: translate_batch and
+    generate_tokens calls are sent to the engine process over a pipe, so the weights
+    exist there only once. Supports what Translator uses for batch and streaming translation.
+    """
+    def __init__(self, connection: Connection):
+        self._connection = connection
+        self._send_lock = threading.Lock()
+        # request id -> Future (translate_batch) or Queue of steps (generate_tokens)
+        self._pending: Dict[int, Union[Future, queue.Queue]] = {}
+        self._ids = itertools.count()
+        self._reader = threading.Thread(target=self._read, name="engine-client", daemon=True)
+        self._reader.start()
+
+    def _send(self, method: str, waiter, source, target_prefix, options) -> int:
+        request_id = next(self._ids)
+        self._pending[request_id] = waiter
+        with self._send_lock:
+            self._connection.send((request_id, method, source, target_prefix, options))
+        return request_id
+
+    def translate_batch(self, source: List[List[str]], target_prefix: Optional[List[List[str]]] = None,
+                        asynchronous: bool = False, **options) -> List[_RemoteResult]:
+        future: Future = Future()
+        self._send("translate_batch", future, source, target_prefix, options)
+        results = [_RemoteResult(future, i) for i in range(len(source))]
+        return results if asynchronous else [result.result() for result in results]
+
+    def generate_tokens(self, source: List[str], target_prefix: Optional[List[str]] = None, **options) -> Iterator[SimpleNamespace]:
+        steps: queue.Queue = queue.Queue()
+        request_id = self._send("generate_tokens", steps, source, target_prefix, options)
+        return self._steps(request_id, steps)
+
+    def _steps(self, request_id: int, steps: queue.Queue) -> Iterator[SimpleNamespace]:
+        done = False
+        try:
+            while True:
+                step, error = steps.get()
+                if error is not None:
+                    done = True
+                    raise RuntimeError(f"Engine process: {error}")
+                if step is None:
+                    done = True
+                    return
+                yield SimpleNamespace(**step)
+        finally:
+            self._pending.pop(request_id, None)
+            if not done:
+                # Abandoned stream: stop decoding it in the engine process
+                try:
+                    with self._send_lock:
+                        self._connection.send((request_id, "cancel", None, None, None))
+                except OSError:
+                    pass
+
+    def unload_model(self):
+        self._connection.close()
+
+    def _read(self):
+        while True:
+            try:
+                request_id, payload, error = self._connection.recv()
+            except (EOFError, OSError):
+                break
+            waiter = self._pending.get(request_id)
+            if isinstance(waiter, queue.Queue):
+                # One message per token, then None (or an error) to end the stream
+                waiter.put((payload, error))
+                continue
+            self._pending.pop(request_id, None)
+            if waiter is None:
+                continue
+            if error is not None:
+                waiter.set_exception(RuntimeError(f"Engine process: {error}"))
+            else:
+                waiter.set_result(payload)
+        for waiter in list(self._pending.values()):
+            if isinstance(waiter, queue.Queue):
+                waiter.put((None, "Engine process is gone"))
+            else:
+                waiter.set_exception(RuntimeError("Engine process is gone"))
+
+
+class EngineHost:
+    """
+    Runs the one CTranslate2 engine of a pre-fork server and answers the workers'
+    translate_batch and generate_tokens calls. Up to the engine's inter_threads calls
+    run at once; replicas share the weights. swap() replaces the engine; calls already
+    running finish on the old one, which is unloaded after the last of them.
+    """
+    def __init__(self, engine, connections: List[Connection], max_parallel: int = 1):
+        self.engine = engine
+        self.connections = connections
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_parallel), thread_name_prefix="engine")
+        self._lock = threading.Lock()
+        # id(engine) -> calls running on it, for engines that may be swapped out
+        self._users: Dict[int, int] = {}
+        self._retired: Dict[int, object] = {}
+
+    def start(self):
+        for connection in self.connections:
+            threading.Thread(target=self._serve, args=(connection, threading.Lock()), name="engine-host", daemon=True).start()
+
+    def swap(self, engine):
+        with self._lock:
+            old, self.engine = self.engine, engine
+            idle = self._users.get(id(old), 0) == 0
+            if not idle:
+                self._retired[id(old)] = old
+        if idle:
+            old.unload_model()
+
+    def _acquire(self):
+        with self._lock:
+            engine = self.engine
+            self._users[id(engine)] = self._users.get(id(engine), 0) + 1
+            return engine
+
+    def _release(self, engine):
+        with self._lock:
+            self._users[id(engine)] -= 1
+            if self._users[id(engine)]:
+                return
+            del self._users[id(engine)]
+            retired = self._retired.pop(id(engine), None)
+        if retired is not None:
+            retired.unload_model()
+
+    def _serve(self, connection: Connection, send_lock: threading.Lock):
+        cancelled = set()
+        while True:
+            try:
+                request = connection.recv()
+            except (EOFError, OSError):
+                return
+            request_id, method = request[0], request[1]
+            if method == "cancel":
+                cancelled.add(request_id)
+            elif method == "generate_tokens":
+                self._executor.submit(self._generate, connection, send_lock, cancelled, request)
+            else:
+                self._executor.submit(self._translate, connection, send_lock, request)
+
+    @staticmethod
+    def _reply(connection: Connection, send_lock: threading.Lock, response) -> bool:
+        try:
+            with send_lock:
+                connection.send(response)
+            return True
+        except OSError:
+            # The worker went away
+            return False
+
+    def _translate(self, connection: Connection, send_lock: threading.Lock, request):
+        request_id, _, source, target_prefix, options = request
+        engine = self._acquire()
+        try:
+            results = engine.translate_batch(source, target_prefix=target_prefix, **options)
+            response = (request_id, [result.hypotheses for result in results], None)
+        except Exception as e:
+            response = (request_id, None, str(e))
+        finally:
+            self._release(engine)
+        self._reply(connection, send_lock, response)
+
+    def _generate(self, connection: Connection, send_lock: threading.Lock, cancelled: set, request):
+        request_id, _, source, target_prefix, options = request
+        engine = self._acquire()
+        try:
+            for step in engine.generate_tokens(source, target_prefix=target_prefix, **options):
+                if request_id in cancelled:
+                    return
+                if not self._reply(connection, send_lock, (request_id, {field: getattr(step, field, None) for field in _STEP_FIELDS}, None)):
+                    return
+            self._reply(connection, send_lock, (request_id, None, None))
+        except Exception as e:
+            self._reply(connection, send_lock, (request_id, None, str(e)))
+        finally:
+            cancelled.discard(request_id)
+            self._release(engine)
+
+
+class PreforkServer:
+    """
+    Scales the HTTP server across processes without a copy of the model per process.
+
+    The parent loads the tokenizer, configuration and everything else a Translator
+    needs, then forks the workers, which inherit it copy-on-write and share one
+    listening socket. CTranslate2 cannot be used across fork (its thread pools do not
+    survive it), so the engine is created in the parent only after forking and the
+    workers reach it through RemoteEngine: the weights stay resident once, however
+    many workers run. Per-process unique and shared memory is logged every
+    report_interval seconds and exposed as process_*_bytes gauges in each worker's /metrics.
+
+    SIGHUP to the parent reloads the model: the parent loads a new engine and swaps
+    it in, then tells the workers, which reload tokenizer and model id and keep their
+    connection to the engine process.
+    """
+    def __init__(self, translator, workers: int, host: str = "127.0.0.1", port: int = 8080,
+                 report_interval: float = 60.0, **server_options):
+        if translator.load_engine:
+            raise ValueError("PreforkServer needs a Translator created with load_engine=False")
+        self.translator = translator
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.report_interval = report_interval
+        self.server_options = server_options
+        self.pids: Dict[str, int] = {}
+        self.engine_host: Optional[EngineHost] = None
+        self._stopping = False
+        self._reload_requested = False
+
+    @classmethod
+    def from_config(cls, translator, workers: int, **overrides) -> "PreforkServer":
+        settings = {
+            "host": config.get("server.host", "127.0.0.1"),
+            "port": config.get("server.port", 8080),
+            "max_wait_ms": config.get("server.max_wait_ms", 10),
+            "max_batch_tokens": config.get("server.max_batch_tokens", config.get("quantization.max_batch_size", 1024)),
+            "report_interval": config.get("server.memory_report_interval", 60),
+        }
+        settings.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(translator, workers, **settings)
+
+    def serve_forever(self):
+        listener = socket.create_server((self.host, self.port))
+        pipes = [Pipe() for _ in range(self.workers)]
+        # Keep the inherited objects out of the collector so its bookkeeping does not copy their pages
+        gc.freeze()
+        for i, (_, worker_end) in enumerate(pipes):
+            pid = os.fork()
+            if pid == 0:
+                self._run_worker(i + 1, listener, worker_end, [parent_end for parent_end, _ in pipes])
+            self.pids[f"worker-{i + 1}"] = pid
+        gc.unfreeze()
+        listener.close()
+        for _, worker_end in pipes:
+            worker_end.close()
+
+        self.pids = {"engine": os.getpid(), **self.pids}
+        engine = self.translator.create_engine()
+        self.engine_host = EngineHost(engine, [parent_end for parent_end, _ in pipes], max_parallel=self.translator.inter_threads)
+        self.engine_host.start()
+        logger.info(f"Pre-fork server on http://{self.host}:{self.port} with {self.workers} workers sharing one engine")
+
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *_: self._shutdown())
+        # `kill -HUP <parent pid>` swaps in a re-converted model; handled by the supervisor loop
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "_reload_requested", True))
+        self._supervise()
+
+    def reload(self):
+        """
+        Loads the model again in the parent and swaps the new engine in, then signals
+        the workers to reload their side. A failed load keeps the current model.
+        """
+        try:
+            self.translator.reload()
+            engine = self.translator.create_engine()
+        except Exception as e:
+            logger.error(f"Hot reload of {self.translator.model_path} failed, keeping the current model: {e}")
+            return
+        self.engine_host.swap(engine)
+        for name, pid in self.pids.items():
+            if name != "engine":
+                try:
+                    os.kill(pid, signal.SIGHUP)
+                except ProcessLookupError:
+                    pass
+
+    def _supervise(self):
+        next_report = time.monotonic() + min(self.report_interval, 10)
+        workers = {pid: name for name, pid in self.pids.items() if name != "engine"}
+        while workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if self._reload_requested and not self._stopping:
+                self._reload_requested = False
+                self.reload()
+            if pid:
+                name = workers.pop(pid, None)
+                self.pids.pop(name, None)
+                if not self._stopping:
+                    logger.warning(f"{name} exited with status {status}; {len(workers)} workers left")
+                continue
+            if time.monotonic() >= next_report and not self._stopping:
+                logger.info("Memory per process:\n" + memory_report(self.pids))
+                next_report = time.monotonic() + self.report_interval
+            time.sleep(0.5)
+        logger.info("Pre-fork server stopped.")
+
+    def _shutdown(self):
+        self._stopping = True
+        for name, pid in self.pids.items():
+            if name != "engine":
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+    def _run_worker(self, number: int, listener: socket.socket, connection: Connection, parent_ends: List[Connection]):
+        code = 0
+        try:
+            for parent_end in parent_ends:
+                parent_end.close()
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            # Until _serve_worker handles it, a reload signal must not kill the worker
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            # The parent's SQLite translation-memory connection must not be used across fork
+            if self.translator.cache is not None:
+                self.translator.cache.reopen()
+            self.translator.translator = RemoteEngine(connection)
+            listener.setblocking(False)
+            server = TranslationServer(self.translator, sock=listener, **self.server_options)
+            asyncio.run(self._serve_worker(server))
+        except BaseException as e:
+            logger.error(f"worker-{number} failed: {e}")
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _reload_worker(self):
+        try:
+            # The RemoteEngine stays: the engine process has already swapped models
+            self.translator.reload(engine=self.translator.translator)
+        except Exception as e:
+            logger.error(f"Worker reload of {self.translator.model_path} failed, keeping the current model: {e}")
+
+    async def _serve_worker(self, server: TranslationServer):
+        loop = asyncio.get_running_loop()
+        stopped = asyncio.Event()
+        loop.add_signal_handler(signal.SIGTERM, stopped.set)
+        # Sent by the parent once its new engine is in place
+        loop.add_signal_handler(signal.SIGHUP, lambda: loop.run_in_executor(None, self._reload_worker))
+        await server.start()
+
+        async def report_memory():
+            while True:
+                update_memory_gauges(server.metrics)
+                await asyncio.sleep(min(self.report_interval, 10))
+
+        reporter = asyncio.create_task(report_memory())
+        try:
+            await stopped.wait()
+        finally:
+            reporter.cancel()
+            await server.stop()
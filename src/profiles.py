@@ -0,0 +1,91 @@
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional
+
+# Used when config.yaml has no decoding section
+DEFAULT_PROFILES = {
+    "fast": {"beam_size": 1, "max_decoding_ratio": 1.5, "max_decoding_extra": 10, "repetition_penalty": 1.2, "no_repeat_ngram_size": 4},
+    "balanced": {},
+    "quality": {"beam_size": 5, "max_decoding_ratio": 3.0, "max_decoding_extra": 32, "max_decoding_length": 512},
+}
+
+
+@dataclass(frozen=True)
+class DecodingProfile:
+    """
+    Named set of CTranslate2 decoding options.
+
+    The decoding budget follows the source: max_decoding_ratio * source tokens
+    + max_decoding_extra, capped at max_decoding_length. This bounds runaway
+    repetition loops on bad input instead of always allowing the full cap.
+    """
+    name: str
+    beam_size: int = 5
+    max_input_length: int = 1024
+    max_decoding_length: int = 256
+    max_decoding_ratio: float = 2.0
+    max_decoding_extra: int = 16
+    length_penalty: float = 1.0
+    repetition_penalty: float = 1.0
+    no_repeat_ngram_size: int = 0
+
+    @classmethod
+    def from_dict(cls, name: str, options: Dict[str, Any], default_beam_size: int = 5) -> "DecodingProfile":
+        unknown = set(options) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise ValueError(f"Unknown options in decoding profile '{name}': {sorted(unknown)}")
+        return cls(name=name, **{"beam_size": default_beam_size, **options})
+
+    def with_beam_size(self, beam_size: Optional[int]) -> "DecodingProfile":
+        return replace(self, beam_size=beam_size) if beam_size and beam_size != self.beam_size else self
+
+    def decoding_length(self, source_length: int) -> int:
+        return max(1, min(self.max_decoding_length, int(self.max_decoding_ratio * source_length) + self.max_decoding_extra))
+
+    def options(self, source_length: int) -> Dict[str, Any]:
+        """
+        CTranslate2 translate_batch options for a batch whose longest source has source_length tokens.
+        """
+        return {
+            "beam_size": self.beam_size,
+            "max_input_length": self.max_input_length,
+            "max_decoding_length": self.decoding_length(source_length),
+            "length_penalty": self.length_penalty,
+            "repetition_penalty": self.repetition_penalty,
+            "no_repeat_ngram_size": self.no_repeat_ngram_size,
+        }
+
+    @property
+    def signature(self) -> str:
+        """
+        Everything that changes the output, for translation-memory keys.
+        """
+        return (
+            f"{self.beam_size}/{self.max_input_length}/{self.max_decoding_length}/{self.max_decoding_ratio}/"
+            f"{self.max_decoding_extra}/{self.length_penalty}/{self.repetition_penalty}/{self.no_repeat_ngram_size}"
+        )
+
+
+def load_profiles(config) -> Dict[str, DecodingProfile]:
+    """
+    Reads decoding.profiles from config.yaml. Profiles without a beam_size use quantization.beam_size.
+    """
+    default_beam_size = config.get("quantization.beam_size", 5)
+    profiles = config.get("decoding.profiles") or DEFAULT_PROFILES
+    return {
+        name: DecodingProfile.from_dict(name, options or {}, default_beam_size)
+        for name, options in profiles.items()
+    }
+
+
+def resolve_profile(profiles: Dict[str, DecodingProfile], default: str, profile=None,
+                    beam_size: Optional[int] = None) -> DecodingProfile:
+    """
+    Resolves a profile name (None for default) or passes a DecodingProfile through,
+    applying a beam_size override. Raises ValueError for an unknown profile.
+    """
+    if not isinstance(profile, DecodingProfile):
+        name = profile or default
+        if name not in profiles:
+            raise ValueError(f"Unknown decoding profile '{name}'. Available: {', '.join(profiles)}")
+        profile = profiles[name]
+    return profile.with_beam_size(beam_size)
@@ -0,0 +1,321 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from src.utils import logger
+from src.config import config
+from src.metrics import MetricsRegistry
+from src.profiles import DecodingProfile, load_profiles, resolve_profile
+from src.translator import ProfileSpec, Translator
+
+MB = 1 << 20
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """
+    One entry of models.registry in config.yaml.
+
+    directions lists the (source, target) FLORES pairs the model serves; empty means
+    any pair. A model with a domain only serves requests for that domain.
+    memory_mb overrides the measured footprint used for the memory budget.
+    """
+    name: str
+    path: str
+    directions: Tuple[Tuple[str, str], ...] = ()
+    domain: Optional[str] = None
+    tokenizer: Optional[str] = None
+    memory_mb: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, name: str, options: Dict, languages: Dict[str, str]) -> "ModelSpec":
+        if "path" not in options:
+            raise ValueError(f"Model '{name}' in models.registry has no path")
+        directions = []
+        for direction in options.get("directions") or []:
+            # "en-sn" or "eng_Latn-sna_Latn"
+            source, sep, target = direction.partition("-")
+            if not sep or not source or not target:
+                raise ValueError(f"Invalid direction '{direction}' for model '{name}', expected e.g. 'en-sn'")
+            directions.append((languages.get(source, source), languages.get(target, target)))
+        return cls(
+            name=name,
+            path=options["path"],
+            directions=tuple(directions),
+            domain=options.get("domain"),
+            tokenizer=options.get("tokenizer"),
+            memory_mb=options.get("memory_mb"),
+        )
+
+    def match(self, source_lang: str, target_lang: str, domain: Optional[str]) -> Optional[int]:
+        """
+        Returns how specifically this model serves the request (higher wins), or None if it does not.
+        """
+        if self.domain is not None and self.domain != domain:
+            return None
+        if self.directions and (source_lang, target_lang) not in self.directions:
+            return None
+        return (2 if self.domain is not None else 0) + (1 if self.directions else 0)
+
+
+class _LoadedModel:
+    __slots__ = ("translator", "footprint", "users", "last_used")
+
+    def __init__(self, translator: Translator, footprint: int):
+        self.translator = translator
+        self.footprint = footprint
+        # Requests currently running on the model; it is never evicted under them
+        self.users = 0
+        self.last_used = time.time()
+
+
+def model_disk_size(path) -> int:
+    """
+    Bytes of the model directory; CTranslate2 weights take roughly their file size in RAM.
+    """
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+
+
+def current_rss() -> int:
+    """
+    Resident set size of this process in bytes (0 where /proc is unavailable).
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class ModelRegistry:
+    """
+    Routes requests to one of several models by (direction, domain), e.g. en->sn and
+    en->nd fine-tunes, a health-domain model and the base NLLB model as fallback.
+
+    Models are loaded on first use. When the resident models' footprint exceeds
+    memory_budget_mb, the least recently used idle models are unloaded. Offers the
+    Translator methods used by the CLI, server, daemon and web UI, each with an
+    optional domain.
+    """
+    def __init__(self, specs: List[ModelSpec], memory_budget_mb: Optional[float] = None,
+                 metrics: Optional[MetricsRegistry] = None,
+                 loader: Optional[Callable[[ModelSpec, MetricsRegistry], Translator]] = None):
+        if not specs:
+            raise ValueError("ModelRegistry needs at least one model")
+        self.specs = list(specs)
+        self.memory_budget = int(memory_budget_mb * MB) if memory_budget_mb else None
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self._loader = loader or (lambda spec, metrics: Translator(spec.path, spec.tokenizer, metrics=metrics))
+        self.profiles = load_profiles(config)
+        self.default_profile = config.get("decoding.default_profile", "balanced")
+        self.inter_threads = config.get("model.inter_threads", 1)
+
+        # Least recently used first
+        self._loaded: "OrderedDict[str, _LoadedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Serializes loading of each model without blocking requests to the others
+        self._load_locks = {spec.name: threading.Lock() for spec in self.specs}
+
+        self._loads = self.metrics.counter("model_loads_total")
+        self._evictions = self.metrics.counter("model_evictions_total")
+        self._resident_models = self.metrics.gauge("models_resident")
+        self._resident_bytes = self.metrics.gauge("models_resident_bytes")
+
+    @classmethod
+    def from_config(cls, config) -> Optional["ModelRegistry"]:
+        """
+        Builds the registry from models.registry, or returns None when it is empty
+        (a single Translator on model.ct2_model_path then serves everything).
+        """
+        entries = config.get("models.registry") or {}
+        if not entries:
+            return None
+        languages = config.get("languages", {})
+        specs = [ModelSpec.from_dict(name, options or {}, languages) for name, options in entries.items()]
+        registry = cls(specs, memory_budget_mb=config.get("models.memory_budget_mb"))
+        budget = f"{registry.memory_budget / MB:.0f} MB" if registry.memory_budget else "unlimited"
+        logger.info(f"Model registry with {len(specs)} models (memory budget {budget})")
+        return registry
+
+    def route(self, source_lang: str, target_lang: str, domain: Optional[str] = None) -> ModelSpec:
+        """
+        Picks the most specific model for the request: domain and direction match over
+        domain only over direction only over a catch-all model; ties go to the first configured.
+        Raises ValueError when no model serves it.
+        """
+        best, best_score = None, None
+        for spec in self.specs:
+            score = spec.match(source_lang, target_lang, domain)
+            if score is not None and (best_score is None or score > best_score):
+                best, best_score = spec, score
+        if best is None:
+            wanted = f"{source_lang}->{target_lang}" + (f" (domain '{domain}')" if domain else "")
+            raise ValueError(f"No model in models.registry serves {wanted}")
+        return best
+
+    @contextmanager
+    def acquire(self, source_lang: str, target_lang: str, domain: Optional[str] = None) -> Iterator[Translator]:
+        """
+        Yields the routed model's Translator, loading it if needed; it is not evicted
+        while the block runs.
+        """
+        spec = self.route(source_lang, target_lang, domain)
+        entry = self._checkout(spec)
+        try:
+            yield entry.translator
+        finally:
+            with self._lock:
+                entry.users -= 1
+                entry.last_used = time.time()
+                if self._loaded.get(spec.name) is entry:
+                    self._loaded.move_to_end(spec.name)
+                self._evict()
+
+    def _checkout(self, spec: ModelSpec) -> _LoadedModel:
+        with self._load_locks[spec.name]:
+            with self._lock:
+                entry = self._loaded.get(spec.name)
+                if entry is not None:
+                    self._loaded.move_to_end(spec.name)
+                    entry.users += 1
+                    return entry
+                # Make room up front so the new weights do not push the process past the budget
+                self._evict(reserve=self._estimate(spec))
+
+            # Import the model stack first so RSS growth counts only this model
+            import ctranslate2  # noqa: F401
+            import transformers  # noqa: F401
+            rss_before = current_rss()
+            translator = self._loader(spec, self.metrics)
+            footprint = self._estimate(spec, measured=current_rss() - rss_before)
+
+            with self._lock:
+                entry = _LoadedModel(translator, footprint)
+                entry.users = 1
+                self._loaded[spec.name] = entry
+                self._loads.inc()
+                logger.info(f"Loaded model '{spec.name}' from {spec.path} ({footprint / MB:.0f} MB)")
+                self._evict()
+                return entry
+
+    def _estimate(self, spec: ModelSpec, measured: int = 0) -> int:
+        if spec.memory_mb:
+            return int(spec.memory_mb * MB)
+        # RSS growth also counts the tokenizer and allocator overhead; disk size is the floor
+        return max(model_disk_size(spec.path) if Path(spec.path).exists() else 0, measured)
+
+    def _evict(self, reserve: int = 0):
+        # Called with self._lock held
+        if self.memory_budget is not None:
+            for name in list(self._loaded):
+                if self.resident_bytes() + reserve <= self.memory_budget:
+                    break
+                entry = self._loaded[name]
+                if entry.users:
+                    continue
+                del self._loaded[name]
+                entry.translator.unload()
+                self._evictions.inc()
+                logger.info(f"Evicted model '{name}' ({entry.footprint / MB:.0f} MB) to stay within the memory budget")
+            if self.resident_bytes() + reserve > self.memory_budget:
+                logger.warning(f"Models in use need {(self.resident_bytes() + reserve) / MB:.0f} MB, "
+                               f"over the {self.memory_budget / MB:.0f} MB budget")
+        self._resident_models.set(len(self._loaded))
+        self._resident_bytes.set(self.resident_bytes())
+
+    def resident_bytes(self) -> int:
+        return sum(entry.footprint for entry in self._loaded.values())
+
+    def translators(self) -> List[Translator]:
+        """
+        The loaded models' Translators, e.g. for a ModelReloader.
+        """
+        with self._lock:
+            return [entry.translator for entry in self._loaded.values()]
+
+    def resident(self) -> List[Dict]:
+        """
+        Loaded models, least recently used first, for status reporting.
+        """
+        with self._lock:
+            return [
+                {"name": name, "memory_mb": entry.footprint / MB, "in_use": entry.users, "last_used": entry.last_used}
+                for name, entry in self._loaded.items()
+            ]
+
+    def close(self):
+        with self._lock:
+            for entry in self._loaded.values():
+                entry.translator.unload()
+            self._loaded.clear()
+            self._evict()
+
+    def decoding_profile(self, profile: ProfileSpec = None, beam_size: Optional[int] = None) -> DecodingProfile:
+        return resolve_profile(self.profiles, self.default_profile, profile, beam_size)
+
+    def get_language_code(self, short_code: str) -> str:
+        return config.get("languages", {}).get(short_code, short_code)
+
+    def translate_batch(self, source_text: List[str], source_lang: str, target_lang: str, beam_size: Optional[int] = None,
+                        profile: ProfileSpec = None, domain: Optional[str] = None) -> List[str]:
+        with self.acquire(source_lang, target_lang, domain) as translator:
+            return translator.translate_batch(source_text, source_lang, target_lang, beam_size=beam_size, profile=profile)
+
+    def translate_mixed(self, source_text: List[str], source_langs: List[str], target_langs: List[str], beam_size: Optional[int] = None,
+                        profile: ProfileSpec = None, domain: Optional[str] = None) -> List[str]:
+        """
+        Translates items with their own language pairs; each model gets one call with its share.
+        """
+        if not len(source_text) == len(source_langs) == len(target_langs):
+            raise ValueError("source_text, source_langs and target_langs must have the same length")
+        by_model: Dict[str, List[int]] = {}
+        for i, (src, tgt) in enumerate(zip(source_langs, target_langs)):
+            by_model.setdefault(self.route(src, tgt, domain).name, []).append(i)
+
+        results = [None] * len(source_text)
+        for indices in by_model.values():
+            first = indices[0]
+            with self.acquire(source_langs[first], target_langs[first], domain) as translator:
+                translations = translator.translate_mixed(
+                    [source_text[i] for i in indices], [source_langs[i] for i in indices],
+                    [target_langs[i] for i in indices], beam_size=beam_size, profile=profile
+                )
+            for i, translation in zip(indices, translations):
+                results[i] = translation
+        return results
+
+    def translate_document(self, text: str, source_lang: str, target_lang: str, beam_size: Optional[int] = None,
+                           profile: ProfileSpec = None, domain: Optional[str] = None) -> str:
+        with self.acquire(source_lang, target_lang, domain) as translator:
+            return translator.translate_document(text, source_lang, target_lang, beam_size=beam_size, profile=profile)
+
+    def translate_stream(self, text: str, source_lang: str, target_lang: str, max_decoding_length: Optional[int] = None,
+                         profile: ProfileSpec = None, domain: Optional[str] = None) -> Iterator[str]:
+        with self.acquire(source_lang, target_lang, domain) as translator:
+            yield from translator.translate_stream(text, source_lang, target_lang, max_decoding_length, profile=profile)
+
+
+def domain_options(translator, domain: Optional[str]) -> Dict[str, str]:
+    """
+    Keyword arguments selecting a domain model. Raises ValueError when a domain is
+    requested but only a single model is configured.
+    """
+    if domain is None:
+        return {}
+    if not isinstance(translator, ModelRegistry):
+        raise ValueError("Domain routing needs models.registry in config.yaml")
+    return {"domain": domain}
+
+
+def load_translator():
+    """
+    Returns the ModelRegistry configured under models.registry, or a single Translator.
+    """
+    return ModelRegistry.from_config(config) or Translator()
@@ -0,0 +1,122 @@
+import signal
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from src.utils import logger
+from src.artifact import MANIFEST_NAME
+
+# Identifies a deployed artifact: resolved directory (so a flipped symlink counts) and manifest stamp
+Signature = Optional[Tuple[str, int, int]]
+
+
+def model_signature(model_path) -> Signature:
+    """
+    Fingerprint of the model directory's manifest. scripts/convert_model.py writes the
+    manifest last, so it only exists once a new artifact is complete; None until then.
+    Directories without a manifest (plain CTranslate2 output) are never auto-reloaded,
+    since a half-written model.bin cannot be told apart from a finished one; use SIGHUP.
+    """
+    try:
+        stat = (Path(model_path) / MANIFEST_NAME).stat()
+    except OSError:
+        return None
+    return str(Path(model_path).resolve()), stat.st_mtime_ns, stat.st_size
+
+
+class ModelReloader:
+    """
+    Hot-swaps re-converted models into a running Translator (or every resident model
+    of a ModelRegistry) without a restart.
+
+    A reload is triggered by request_reload() (wired to SIGHUP by install_signal_handler)
+    or, with watch enabled, when a model directory's signature changes and then holds
+    still for one poll interval. The new model loads in this background thread while
+    requests keep being served; Translator.reload() then swaps it in and releases the
+    old one after in-flight work finishes. A failed load keeps the current model.
+    """
+    def __init__(self, translator, watch: bool = False, interval: float = 5.0):
+        self.translator = translator
+        self.watch = watch
+        self.interval = interval
+        self._wake = threading.Event()
+        self._requested = False
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        # Per translator: signature of the loaded model and the last one seen while polling
+        self._loaded: Dict[int, Signature] = {}
+        self._seen: Dict[int, Signature] = {}
+
+    @classmethod
+    def from_config(cls, translator, config) -> "ModelReloader":
+        return cls(
+            translator,
+            watch=config.get("model.reload.watch", False),
+            interval=config.get("model.reload.interval_seconds", 5),
+        )
+
+    def _translators(self) -> List:
+        # A ModelRegistry reloads the models it currently holds
+        translators = getattr(self.translator, "translators", None)
+        return translators() if translators is not None else [self.translator]
+
+    def start(self) -> "ModelReloader":
+        for translator in self._translators():
+            self._loaded[id(translator)] = model_signature(translator.model_path)
+        self._thread = threading.Thread(target=self._run, name="model-reloader", daemon=True)
+        self._thread.start()
+        if self.watch:
+            logger.info(f"Watching model directories for new artifacts every {self.interval}s")
+        return self
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def request_reload(self):
+        """
+        Reloads every model on the background thread as soon as possible. Safe to call from a signal handler.
+        """
+        self._requested = True
+        self._wake.set()
+
+    def install_signal_handler(self, signum: int = signal.SIGHUP):
+        """
+        Reloads on signum (default SIGHUP). Must be called from the main thread.
+        """
+        signal.signal(signum, lambda *_: self.request_reload())
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.interval if self.watch else None)
+            self._wake.clear()
+            if self._stopping:
+                return
+            requested, self._requested = self._requested, False
+            self.check(force=requested)
+
+    def check(self, force: bool = False) -> int:
+        """
+        Reloads the models that changed (all of them with force). Returns how many were swapped.
+        """
+        reloaded = 0
+        for translator in self._translators():
+            key = id(translator)
+            signature = model_signature(translator.model_path)
+            loaded = self._loaded.setdefault(key, signature)
+            previous, self._seen[key] = self._seen.get(key), signature
+            # Wait for a changed directory to settle, e.g. a copy still in progress
+            changed = signature is not None and signature != loaded and signature == previous
+            if not (force or changed):
+                continue
+            # Recorded even on failure so a broken artifact is not retried every poll
+            self._loaded[key] = signature
+            try:
+                translator.reload()
+            except Exception as e:
+                logger.error(f"Hot reload of {translator.model_path} failed, keeping the current model: {e}")
+                continue
+            reloaded += 1
+        return reloaded
@@ -0,0 +1,99 @@
+import re
+from typing import Callable, List, Tuple
+
+# Abbreviations whose trailing period does not end a sentence. English forms are
+# also the ones used in Shona and Ndebele text (titles, "e.g.", dates).
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "st", "jr", "sr", "vs", "etc", "e.g", "i.e",
+    "no", "vol", "fig", "inc", "ltd", "co", "mt", "gen", "hon", "rev", "jan", "feb",
+    "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+}
+
+# Line breaks (with surrounding whitespace) are kept verbatim, so paragraph breaks survive
+_LINE_BREAK = re.compile(r"[ \t]*\n\s*")
+# Terminal punctuation, optional closing quotes/brackets, then the whitespace after them
+_SENTENCE_END = re.compile(r"[.!?…]+[\"'”’)\]]*(\s+)")
+_CLAUSE_END = re.compile(r"[,;:]$")
+
+
+def split_segments(text: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Splits text into sentences, keeping the exact whitespace between them.
+
+    Returns (leading whitespace, [(sentence, whitespace after it)]) so that
+    leading + "".join(sentence + gap) reproduces the input.
+    """
+    leading = text[:len(text) - len(text.lstrip())]
+    body = text[len(leading):]
+
+    segments: List[Tuple[str, str]] = []
+    position = 0
+    for line_break in _LINE_BREAK.finditer(body):
+        segments.extend(_split_line(body[position:line_break.start()], line_break.group(0)))
+        position = line_break.end()
+    segments.extend(_split_line(body[position:], ""))
+
+    # Trailing whitespace on the last line ends up on the last segment's gap
+    if segments:
+        sentence, gap = segments[-1]
+        stripped = sentence.rstrip()
+        segments[-1] = (stripped, sentence[len(stripped):] + gap)
+    return leading, [(sentence, gap) for sentence, gap in segments if sentence or gap]
+
+
+def _split_line(line: str, line_gap: str) -> List[Tuple[str, str]]:
+    segments = []
+    start = 0
+    for match in _SENTENCE_END.finditer(line):
+        end = match.start(1)
+        if not _is_boundary(line, match.start(), match.end()):
+            continue
+        segments.append((line[start:end], match.group(1)))
+        start = match.end()
+    segments.append((line[start:], line_gap))
+    return segments
+
+
+def _is_boundary(line: str, punct_start: int, next_start: int) -> bool:
+    if next_start >= len(line):
+        return True
+    # A lowercase continuation is almost never a new sentence
+    if line[next_start].islower():
+        return False
+    if line[punct_start] != ".":
+        return True
+
+    word = line[:punct_start].rsplit(None, 1)[-1] if line[:punct_start].strip() else ""
+    word = word.lstrip("(\"'“‘").lower()
+    # Initials ("J. Moyo") and known abbreviations ("Dr. Ncube")
+    if len(word) == 1 and word.isalpha():
+        return False
+    return word not in ABBREVIATIONS
+
+
+def split_long_segment(text: str, count_tokens: Callable[[List[str]], List[int]], max_tokens: int) -> List[str]:
+    """
+    Cuts a sentence whose token count exceeds max_tokens into pieces that fit,
+    preferring to break after clause punctuation (, ; :) and otherwise between words.
+    count_tokens receives a list of words and returns the token count of each.
+    """
+    words = text.split()
+    counts = count_tokens(words)
+    if sum(counts) <= max_tokens:
+        return [text]
+
+    pieces = []
+    current: List[Tuple[str, int]] = []
+    clause_break = 0
+    for word, count in zip(words, counts):
+        while current and sum(c for _, c in current) + count > max_tokens:
+            cut = clause_break or len(current)
+            pieces.append(" ".join(w for w, _ in current[:cut]))
+            current = current[cut:]
+            clause_break = 0
+        current.append((word, count))
+        if _CLAUSE_END.search(word):
+            clause_break = len(current)
+    if current:
+        pieces.append(" ".join(w for w, _ in current))
+    return pieces
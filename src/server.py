@@ -0,0 +1,327 @@
+import asyncio
+import json
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple, Union
+from urllib.parse import parse_qs
+from src.utils import logger
+from src.config import config
+from src.metrics import MetricsRegistry, SIZE_BUCKETS, TOKEN_BUCKETS
+from src.registry import domain_options
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Queued by stop() to end the batching loop
+_STOP = object()
+
+
+class _PendingRequest:
+    __slots__ = ("text", "source_lang", "target_lang", "profile", "domain", "tokens", "future", "enqueued")
+
+    def __init__(self, text: str, source_lang: str, target_lang: str, tokens: int, future: asyncio.Future,
+                 profile: Optional[str] = None, domain: Optional[str] = None):
+        self.text = text
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.profile = profile
+        self.domain = domain
+        self.tokens = tokens
+        self.future = future
+        self.enqueued = time.perf_counter()
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap source-length estimate used for the batching budget (words + language tag/EOS).
+    """
+    return len(text.split()) + 2
+
+
+class MicroBatcher:
+    """
+    Gathers concurrent translation requests into micro-batches for the engine.
+
+    A batch is dispatched when max_wait_ms has passed since its first request or when
+    its estimated source tokens reach max_batch_tokens. Up to the translator's
+    inter_threads batches run on the engine at once; while they do, the next one
+    accumulates, so under load batches fill up by themselves.
+    """
+    def __init__(self, translator, max_wait_ms: float = 10.0, max_batch_tokens: int = 1024,
+                 metrics: Optional[MetricsRegistry] = None, count_tokens: Callable[[str], int] = estimate_tokens):
+        self.translator = translator
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_tokens = max_batch_tokens
+        self.count_tokens = count_tokens
+        self.metrics = metrics or MetricsRegistry()
+        self._queue: Optional[asyncio.Queue] = None
+        self._carry: Optional[_PendingRequest] = None
+        self._task: Optional[asyncio.Task] = None
+        # One engine call per model replica; CTranslate2 parallelizes inside each call
+        self.workers = max(1, getattr(translator, "inter_threads", 1))
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="engine")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = set()
+
+        self._queue_depth = self.metrics.gauge("queue_depth")
+        self._batch_size = self.metrics.histogram("batch_size", SIZE_BUCKETS)
+        self._batch_tokens = self.metrics.histogram("batch_tokens", TOKEN_BUCKETS)
+        self._latency = self.metrics.histogram("request_latency_seconds")
+        self._requests = self.metrics.counter("requests_total")
+        self._errors = self.metrics.counter("errors_total")
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # A sentinel rather than task.cancel(): wait_for() can swallow a cancellation
+        if self._task is not None:
+            self._queue.put_nowait(_STOP)
+            await self._task
+            self._task = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight)
+        self._executor.shutdown(wait=True)
+
+    async def translate(self, texts: List[str], source_lang: str, target_lang: str, profile: Optional[str] = None,
+                        domain: Optional[str] = None) -> List[str]:
+        """
+        Queues sentences for translation and waits for their results.
+        profile selects a decoding profile (default decoding.default_profile);
+        domain routes to a domain model when the translator is a ModelRegistry.
+        """
+        loop = asyncio.get_running_loop()
+        requests = []
+        for text in texts:
+            request = _PendingRequest(text, source_lang, target_lang, self.count_tokens(text), loop.create_future(), profile, domain)
+            requests.append(request)
+            self._queue.put_nowait(request)
+        self._requests.inc(len(requests))
+        self._queue_depth.set(self._queue.qsize())
+        return list(await asyncio.gather(*(request.future for request in requests)))
+
+    async def _next_request(self, timeout: Optional[float]) -> Optional[_PendingRequest]:
+        if self._carry is not None:
+            request, self._carry = self._carry, None
+            return request
+        if timeout is None:
+            return await self._queue.get()
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _collect(self) -> Optional[List[_PendingRequest]]:
+        loop = asyncio.get_running_loop()
+        first = await self._next_request(None)
+        if first is _STOP:
+            return None
+        batch, tokens = [first], first.tokens
+        deadline = loop.time() + self.max_wait
+
+        while tokens < self.max_batch_tokens:
+            request = await self._next_request(max(deadline - loop.time(), 0))
+            if request is None:
+                break
+            if request is _STOP or tokens + request.tokens > self.max_batch_tokens:
+                # Keep it for the next round rather than overshooting the budget
+                self._carry = request
+                break
+            batch.append(request)
+            tokens += request.tokens
+        return batch
+
+    async def _run(self):
+        while True:
+            # Hold off collecting until a replica is free so waiting requests keep joining
+            await self._slots.acquire()
+            batch = await self._collect()
+            if batch is None:
+                self._slots.release()
+                return
+            self._queue_depth.set(self._queue.qsize())
+            self._batch_size.observe(len(batch))
+            self._batch_tokens.observe(sum(request.tokens for request in batch))
+            task = asyncio.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: List[_PendingRequest]):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self._executor, self._translate, batch)
+        except Exception as e:
+            logger.error(f"Batch translation failed: {e}")
+            self._errors.inc()
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        now = time.perf_counter()
+        for request, result in zip(batch, results):
+            if not request.future.done():
+                request.future.set_result(result)
+            self._latency.observe(now - request.enqueued)
+
+    def _translate(self, batch: List[_PendingRequest]) -> List[str]:
+        # Mixed language pairs share one engine call via per-item target prefixes;
+        # decoding options are per engine call, so each profile (and domain) gets its own
+        groups = {}
+        for i, request in enumerate(batch):
+            groups.setdefault((request.profile, request.domain), []).append(i)
+
+        results = [None] * len(batch)
+        for (profile, domain), indices in groups.items():
+            translations = self.translator.translate_mixed(
+                [batch[i].text for i in indices],
+                [batch[i].source_lang for i in indices],
+                [batch[i].target_lang for i in indices],
+                profile=profile,
+                **domain_options(self.translator, domain),
+            )
+            for i, translation in zip(indices, translations):
+                results[i] = translation
+        return results
+
+
+class TranslationServer:
+    """
+    Minimal asyncio HTTP/1.1 JSON server in front of a MicroBatcher.
+
+    Routes:
+        POST /translate  {"text": str | "texts": [str], "src": "en", "tgt": "sn",
+                          "profile": "fast" (optional), "domain": "health" (optional, needs models.registry)}
+        GET  /metrics    JSON metrics snapshot (?format=prometheus for the text format)
+        GET  /health
+    """
+    def __init__(self, translator, host: str = "127.0.0.1", port: int = 8080,
+                 max_wait_ms: float = 10.0, max_batch_tokens: int = 1024, sock: Optional[socket.socket] = None):
+        self.translator = translator
+        self.host = host
+        self.port = port
+        # An already bound listening socket, shared by pre-fork workers (see src/prefork.py)
+        self.sock = sock
+        # Share the translator's registry so stage timings and serving metrics come out together
+        self.metrics = getattr(translator, "metrics", None) or MetricsRegistry()
+        self.batcher = MicroBatcher(translator, max_wait_ms=max_wait_ms, max_batch_tokens=max_batch_tokens, metrics=self.metrics)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @classmethod
+    def from_config(cls, translator, **overrides) -> "TranslationServer":
+        settings = {
+            "host": config.get("server.host", "127.0.0.1"),
+            "port": config.get("server.port", 8080),
+            "max_wait_ms": config.get("server.max_wait_ms", 10),
+            "max_batch_tokens": config.get("server.max_batch_tokens", config.get("quantization.max_batch_size", 1024)),
+        }
+        settings.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(translator, **settings)
+
+    async def start(self):
+        await self.batcher.start()
+        if self.sock is not None:
+            self._server = await asyncio.start_server(self._handle_connection, sock=self.sock)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        # Pick up the real port when started with port 0
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Serving translations on http://{self.host}:{self.port}")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._route(method, path, body)
+                if isinstance(payload, str):
+                    data, content_type = payload.encode("utf-8"), PROMETHEUS_CONTENT_TYPE
+                else:
+                    data, content_type = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json"
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, target: str, body: bytes) -> Tuple[str, Union[dict, str]]:
+        path, _, query = target.partition("?")
+        if method == "GET" and path == "/health":
+            return "200 OK", {"status": "ok"}
+        if method == "GET" and path == "/metrics":
+            if parse_qs(query).get("format") == ["prometheus"]:
+                return "200 OK", self.metrics.to_prometheus()
+            return "200 OK", self.metrics.snapshot()
+        if method == "POST" and path == "/translate":
+            return await self._translate(body)
+        return "404 Not Found", {"error": f"No route for {method} {path}"}
+
+    async def _translate(self, body: bytes) -> Tuple[str, dict]:
+        try:
+            request = json.loads(body or b"{}")
+            single = "text" in request
+            texts = [request["text"]] if single else request["texts"]
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ValueError("texts must be a list of strings")
+        except (ValueError, KeyError, TypeError) as e:
+            return "400 Bad Request", {"error": f"Invalid request: {e}"}
+
+        source_lang = self.translator.get_language_code(request.get("src", "en"))
+        target_lang = self.translator.get_language_code(request.get("tgt", "sn"))
+        profile = request.get("profile")
+        domain = request.get("domain")
+        try:
+            self.translator.decoding_profile(profile)
+            domain_options(self.translator, domain)
+            if domain is not None:
+                self.translator.route(source_lang, target_lang, domain)
+        except ValueError as e:
+            return "400 Bad Request", {"error": str(e)}
+        try:
+            translations = await self.batcher.translate(texts, source_lang, target_lang, profile, domain)
+        except Exception as e:
+            return "500 Internal Server Error", {"error": str(e)}
+
+        if single:
+            return "200 OK", {"translation": translations[0]}
+        return "200 OK", {"translations": translations}
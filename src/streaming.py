@@ -0,0 +1,272 @@
+import gzip
+import io
+import os
+import queue
+import threading
+import time
+from itertools import islice
+from pathlib import Path
+from typing import IO, Iterator, List, Optional
+from src.utils import logger
+from src.journal import JobJournal
+from src.translator import is_passthrough_key
+
+COMPRESSION_SUFFIXES = (".gz", ".zst")
+
+# Marks the end of the stream on the stage queues
+_DONE = object()
+
+
+def open_binary(path, mode: str = "rb") -> IO[bytes]:
+    """
+    Opens a file in binary mode, transparently (de)compressing .gz and .zst files.
+    """
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, mode)
+    if path.suffix == ".zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Reading or writing .zst files requires the 'zstandard' package (pip install zstandard)")
+        return zstandard.open(path, mode)
+    return open(path, mode)
+
+
+def default_output_path(input_path) -> Path:
+    """
+    Derives `<name>_translated<ext>` next to the input, keeping any compression suffix.
+    """
+    input_path = Path(input_path)
+    compression = input_path.suffix if input_path.suffix in COMPRESSION_SUFFIXES else ""
+    base = Path(input_path.name[:len(input_path.name) - len(compression)]) if compression else Path(input_path.name)
+    return input_path.with_name(f"{base.stem}_translated{base.suffix}{compression}")
+
+
+class PipelineStats:
+    """
+    Throughput counters for a streaming translation, logged periodically.
+    """
+    def __init__(self, report_interval: float = 10.0):
+        self.report_interval = report_interval
+        self.lines = 0
+        # Blank and pre-filtered lines that never reached the model
+        self.skipped = 0
+        self.source_tokens = 0
+        self.target_tokens = 0
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    def add_chunk(self, lines: int, source_tokens: int, target_tokens: int, skipped: int = 0):
+        self.lines += lines
+        self.skipped += skipped
+        self.source_tokens += source_tokens
+        self.target_tokens += target_tokens
+        now = time.perf_counter()
+        if now - self._last_report >= self.report_interval:
+            self._last_report = now
+            logger.info(self.summary())
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.perf_counter() - self.started, 1e-9)
+
+    def summary(self) -> str:
+        return (
+            f"{self.lines} lines | {self.lines / self.elapsed:.1f} lines/s | "
+            f"{self.source_tokens / self.elapsed:.1f} src tokens/s | "
+            f"{self.target_tokens / self.elapsed:.1f} tgt tokens/s | "
+            f"{self.skipped} lines passed through (model calls avoided)"
+        )
+
+
+class _Chunk:
+    """
+    A block of consecutive input lines moving through the pipeline.
+    """
+    def __init__(self, lines: List[str], end_offset: int):
+        self.lines = lines
+        # Input byte offset just past the chunk's last line
+        self.end_offset = end_offset
+        self.keys: List[Optional[str]] = []
+        self.known = {}
+        self.pending_keys: List[str] = []
+        self.source_tokens: List[List[str]] = []
+        self.target_tokens: List[List[str]] = []
+
+
+class StreamingFileTranslator:
+    """
+    Translates a file line by line with bounded memory.
+
+    Three stages run in their own threads and hand chunks over bounded queues:
+    read + tokenize, CTranslate2 inference, and detokenize + write. Each input line
+    produces exactly one output line; blank lines are written back as blank lines.
+
+    With a JobJournal, progress is committed after every written chunk and an
+    interrupted job resumes from the last commit, so a crash costs at most the
+    chunks that were in flight.
+    """
+    def __init__(self, translator, source_lang: str, target_lang: str, beam_size: Optional[int] = None,
+                 chunk_lines: int = 256, queue_size: int = 4, report_interval: float = 10.0,
+                 journal: Optional[JobJournal] = None, profile: Optional[str] = None):
+        self.translator = translator
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        # Resolved once so every chunk decodes (and hits the translation memory) with the same options
+        self.decoding = translator.decoding_profile(profile, beam_size)
+        self.beam_size = self.decoding.beam_size
+        self.chunk_lines = chunk_lines
+        self.queue_size = queue_size
+        self.stats = PipelineStats(report_interval)
+        self.journal = journal
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+
+    def translate_file(self, input_path, output_path) -> PipelineStats:
+        journal = self.journal
+        if journal is not None and Path(output_path).suffix in COMPRESSION_SUFFIXES:
+            # A compressed stream cannot be truncated back to a committed byte offset
+            raise ValueError("Resumable jobs need an uncompressed output file")
+
+        if journal is not None:
+            journal.check_output(output_path)
+        if journal is not None and journal.resuming:
+            with open_binary(input_path, "rb") as f_in, open(output_path, "r+b") as f_out:
+                # Skip committed input and drop any partially written tail
+                f_in.seek(journal.input_offset)
+                f_out.truncate(journal.output_offset)
+                f_out.seek(journal.output_offset)
+                self.translate_stream(f_in, f_out, input_offset=journal.input_offset, lines_done=journal.lines_done)
+        else:
+            with open_binary(input_path, "rb") as f_in, open_binary(output_path, "wb") as f_out:
+                self.translate_stream(f_in, f_out)
+
+        if journal is not None:
+            journal.finish()
+        return self.stats
+
+    def translate_stream(self, f_in: IO[bytes], f_out: IO[bytes], input_offset: int = 0, lines_done: int = 0) -> PipelineStats:
+        self._input_offset = input_offset
+        self._lines_done = lines_done
+        self._output_offset = f_out.tell() if self.journal is not None else 0
+        tokenized: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        inferred: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+
+        self._model = self.translator.hold()
+        started: List[threading.Thread] = []
+        try:
+            stages = [
+                threading.Thread(target=self._run_stage, args=(self._read_and_tokenize, f_in, tokenized), name="tokenize"),
+                threading.Thread(target=self._run_stage, args=(self._infer, tokenized, inferred), name="infer"),
+                threading.Thread(target=self._run_stage, args=(self._detokenize_and_write, inferred, f_out), name="write"),
+            ]
+            for stage in stages:
+                stage.start()
+                started.append(stage)
+            for stage in stages:
+                stage.join()
+        finally:
+            # Interrupted while waiting, or a stage failed to start: stop the rest before letting go of the model
+            if any(stage.is_alive() for stage in started):
+                self._stop.set()
+                for stage in started:
+                    stage.join()
+            self.translator.release(self._model)
+
+        if self._errors:
+            raise self._errors[0]
+        logger.info(f"Streaming translation finished: {self.stats.summary()}")
+        return self.stats
+
+    def _run_stage(self, stage, source, sink):
+        try:
+            # Every stage of the job uses the model it started on, even if the translator is hot-reloaded
+            with self.translator.pinned(self._model):
+                stage(source, sink)
+        except BaseException as e:
+            self._errors.append(e)
+            self._stop.set()
+
+    def _put(self, q: "queue.Queue", item):
+        # Poll so a failure in a downstream stage cannot leave us blocked on a full queue
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: "queue.Queue"):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _read_chunks(self, f_in: IO[bytes]) -> Iterator[_Chunk]:
+        offset = self._input_offset
+        while True:
+            lines = list(islice(f_in, self.chunk_lines))
+            if not lines:
+                return
+            offset += sum(len(line) for line in lines)
+            yield _Chunk([line.decode("utf-8").rstrip("\r\n") for line in lines], offset)
+
+    def _read_and_tokenize(self, f_in: IO[bytes], sink: "queue.Queue"):
+        for chunk in self._read_chunks(f_in):
+            if self._stop.is_set():
+                return
+            texts = [line.strip() for line in chunk.lines]
+            nonblank = [text for text in texts if text]
+            keys, chunk.known, pending = self.translator.lookup(
+                nonblank, self.source_lang, self.target_lang, profile=self.decoding
+            )
+            key_iter = iter(keys)
+            chunk.keys = [next(key_iter) if text else None for text in texts]
+            chunk.pending_keys = list(pending.keys())
+            chunk.source_tokens = self.translator.tokenize([text for text, _, _ in pending.values()], self.source_lang)
+            self._put(sink, chunk)
+        self._put(sink, _DONE)
+
+    def _infer(self, source: "queue.Queue", sink: "queue.Queue"):
+        while True:
+            chunk = self._get(source)
+            if chunk is _DONE:
+                break
+            if chunk.source_tokens:
+                chunk.target_tokens = self.translator.infer(chunk.source_tokens, self.target_lang, profile=self.decoding)
+            self._put(sink, chunk)
+        self._put(sink, _DONE)
+
+    def _detokenize_and_write(self, source: "queue.Queue", f_out: IO[bytes]):
+        while True:
+            chunk = self._get(source)
+            if chunk is _DONE:
+                break
+            translations = self.translator.detokenize(chunk.target_tokens) if chunk.target_tokens else []
+            chunk.known.update(self.translator.remember(chunk.pending_keys, translations))
+
+            buffer = io.StringIO()
+            for key in chunk.keys:
+                # A stray newline in a translation would break line alignment
+                buffer.write(chunk.known[key].replace("\n", " ") if key is not None else "")
+                buffer.write("\n")
+            data = buffer.getvalue().encode("utf-8")
+            f_out.write(data)
+            self._output_offset += len(data)
+            self._lines_done += len(chunk.lines)
+
+            if self.journal is not None:
+                # Output must be durable before the journal claims it
+                f_out.flush()
+                os.fsync(f_out.fileno())
+                self.journal.commit(chunk.end_offset, self._output_offset, self._lines_done)
+
+            self.stats.add_chunk(
+                len(chunk.lines),
+                sum(len(tokens) for tokens in chunk.source_tokens),
+                sum(len(tokens) for tokens in chunk.target_tokens),
+                skipped=sum(1 for key in chunk.keys if key is None or is_passthrough_key(key)),
+            )
@@ -59,13 +59,16 @@ class ZimTrainer:
 
     def train(self, train_dataset, val_dataset, batch_size: int = 4, epochs: int = 3, learning_rate: float = 2e-4):
         """
-        Executes the training loop.
+        Executes the training loop. With val_dataset None, evaluation and early stopping are skipped.
         """
         logger.info("Starting training loop...")
+        evaluate = val_dataset is not None
+        if not evaluate:
+            logger.warning("No validation data: training without evaluation or early stopping")
         
         args = Seq2SeqTrainingArguments(
             output_dir=self.output_dir,
-            evaluation_strategy="epoch",
+            evaluation_strategy="epoch" if evaluate else "no",
             learning_rate=learning_rate,
             per_device_train_batch_size=batch_size,
             per_device_eval_batch_size=batch_size,
@@ -76,8 +79,8 @@ class ZimTrainer:
             fp16=(self.device == "cuda"), # Use FP16 if on CUDA
             push_to_hub=False,
             logging_steps=100,
-            load_best_model_at_end=True, # Required for EarlyStopping
-            metric_for_best_model="loss",
+            load_best_model_at_end=evaluate, # Required for EarlyStopping
+            metric_for_best_model="loss" if evaluate else None,
         )
         
         data_collator = DataCollatorForSeq2Seq(self.tokenizer, model=self.model)
@@ -89,7 +92,7 @@ class ZimTrainer:
             eval_dataset=val_dataset,
             data_collator=data_collator,
             tokenizer=self.tokenizer,
-            callbacks=[EarlyStoppingCallback(early_stopping_patience=3)]
+            callbacks=[EarlyStoppingCallback(early_stopping_patience=3)] if evaluate else []
         )
         
         self.trainer.train()
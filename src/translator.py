@@ -1,84 +1,674 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import replace
 from pathlib import Path
-from typing import List, Optional
-import ctranslate2
-import transformers
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import importlib
 from src.utils import logger, get_device
 from src.config import config
+from src.cache import TranslationCache, make_cache_key
+from src.batching import length_sorted_batches
+from src.segmenter import split_segments, split_long_segment
+from src.metrics import MetricsRegistry, SIZE_BUCKETS, TOKEN_BUCKETS
+from src.artifact import file_sha256, read_manifest, verify_manifest
+from src.vocab_map import VMAP_NAME
+from src.profiles import DecodingProfile, load_profiles, resolve_profile
+from src.prefilter import Prefilter
+
+# Imported on first use (see load_model) so the CLI can parse arguments or talk to a
+# daemon without paying for them; still reachable as src.translator.<name>
+_LAZY_MODULES = ("ctranslate2", "transformers")
+
+def __getattr__(name: str):
+    if name in _LAZY_MODULES:
+        module = importlib.import_module(name)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# One language code for the whole batch, or one per item
+LangSpec = Union[str, List[str]]
+# Name of a decoding profile from config.yaml, or an already resolved one
+ProfileSpec = Union[str, DecodingProfile, None]
+# Keys of segments the pre-filter passes through; never stored in the translation memory
+PASSTHROUGH_KEY = "passthrough\x1f"
+
+def is_passthrough_key(key: Optional[str]) -> bool:
+    return key is not None and key.startswith(PASSTHROUGH_KEY)
+
+def _per_item(langs: LangSpec, n: int) -> List[str]:
+    return [langs] * n if isinstance(langs, str) else list(langs)
+
+class ModelState:
+    """
+    One loaded model: CTranslate2 engine, tokenizer and what identifies them.
+    users counts requests running on it; a retired state is unloaded when they finish.
+    """
+    __slots__ = ("path", "engine", "tokenizer", "manifest", "model_id", "use_vmap", "users", "retired", "shares_engine")
+
+    def __init__(self, path: str, engine, tokenizer, manifest: Optional[dict], model_id: str, use_vmap: bool):
+        self.path = path
+        self.engine = engine
+        self.tokenizer = tokenizer
+        self.manifest = manifest
+        self.model_id = model_id
+        self.use_vmap = use_vmap
+        self.users = 0
+        self.retired = False
+        # Set when a newer state took over this engine, which must then stay loaded
+        self.shares_engine = False
+
+    def unload(self):
+        if self.engine is not None and not self.shares_engine:
+            self.engine.unload_model()
+        self.engine = None
 
 class Translator:
-    def __init__(self, model_path: Optional[str] = None):
+    def __init__(self, model_path: Optional[str] = None, tokenizer_name: Optional[str] = None,
+                 metrics: Optional[MetricsRegistry] = None, load_engine: bool = True):
         self.model_path = model_path or config.get("model.ct2_model_path")
+        # False: everything but the CTranslate2 engine, which is attached later (see src/prefork.py)
+        self.load_engine = load_engine
+        # HF hub name or local directory of the tokenizer; None uses the one bundled with the model, else model.name
+        self.tokenizer_name = tokenizer_name
+        # Offline: load only from the self-contained artifact written by scripts/convert_model.py
+        self.offline = config.get("model.offline", False)
+        self.verify_checksums = config.get("model.verify_checksums", False)
         self.device = get_device() if config.get("model.device") == "auto" else config.get("model.device")
         self.compute_type = config.get("model.compute_type", "int8")
+        self.beam_size = config.get("quantization.beam_size", 5)
+        # Named decoding option sets (fast/balanced/quality); see config.yaml decoding.profiles
+        self.profiles = load_profiles(config)
+        self.default_profile = config.get("decoding.default_profile", "balanced")
+        self.batch_type = config.get("quantization.batch_type", "tokens")
+        self.max_batch_size = config.get("quantization.max_batch_size", 1024)
+        self.max_input_length = config.get("data.max_length", 128)
+        # inter_threads: batches run in parallel (model replicas); intra_threads: threads per batch (0 = engine default)
+        self.inter_threads = config.get("model.inter_threads", 1)
+        self.intra_threads = config.get("model.intra_threads", 0)
         
-        self.translator = None
-        self.tokenizer = None
+        # Engine, tokenizer and the id of the loaded weights (used in translation-memory keys);
+        # replaced as a whole by reload(), pinned per request by pinned()
+        self._state: Optional[ModelState] = None
+        self._state_lock = threading.Lock()
+        self._pinned = threading.local()
+        self.cache = TranslationCache.from_config(config)
+        # Numbers, URLs, code and text already in the target language skip the model
+        self.prefilter = Prefilter.from_config(config)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._vocab = None
+
+        # Per-stage timings, batch shapes and cache effectiveness; see metrics.to_prometheus().
+        # Translators sharing a registry (see src/registry.py) report combined figures
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self._tokenize_seconds = self.metrics.histogram("tokenize_seconds")
+        self._infer_seconds = self.metrics.histogram("infer_seconds")
+        self._detokenize_seconds = self.metrics.histogram("detokenize_seconds")
+        self._first_token_seconds = self.metrics.histogram("stream_first_token_seconds")
+        self._batch_sentences = self.metrics.histogram("batch_sentences", SIZE_BUCKETS)
+        self._batch_source_tokens = self.metrics.histogram("batch_source_tokens", TOKEN_BUCKETS)
+        self._batch_target_tokens = self.metrics.histogram("batch_target_tokens", TOKEN_BUCKETS)
+        self._engine_batches = self.metrics.counter("engine_batches_total")
+        self._memory_hits = self.metrics.counter("translation_memory_hits_total")
+        self._memory_misses = self.metrics.counter("translation_memory_misses_total")
+        self._memory_hit_rate = self.metrics.gauge("translation_memory_hit_rate")
+        self._model_load_seconds = self.metrics.gauge("model_load_seconds")
+        self._reloads = self.metrics.counter("model_reloads_total")
+        self._passthrough = self.metrics.counter("prefilter_passthrough_total")
+        self._passthrough_by_reason = {
+            reason: self.metrics.counter(f"prefilter_{reason}_total") for reason in Prefilter.REASONS
+        }
         
-        logger.info(f"Initializing Translator on {self.device} with {self.compute_type} quantization")
+        logger.info(f"Initializing Translator on {self.device} with {self.compute_type} quantization "
+                    f"(inter_threads={self.inter_threads}, intra_threads={self.intra_threads})")
         self.load_model()
 
     def load_model(self):
         """
         Loads the CTranslate2 model and the HuggingFace tokenizer.
         """
-        if not Path(self.model_path).exists():
-            logger.error(f"Model path {self.model_path} does not exist. Run scripts/download_model.py and scripts/convert_model.py first.")
-            raise FileNotFoundError(f"Model not found at {self.model_path}")
+        self._state = self._load_state(self.model_path)
+
+    def reload(self, model_path: Optional[str] = None, engine=None):
+        """
+        Loads the model again (or from model_path) while requests keep running on the
+        current one, then swaps it in. Requests and file jobs already under way finish
+        on the old model, which is unloaded once the last of them completes.
+        Raises, keeping the current model, if the new one fails to load.
+        With load_engine=False, engine is attached to the new model instead, e.g. a
+        pre-fork worker's RemoteEngine, whose engine process reloads on its own.
+        """
+        model_path = model_path or self.model_path
+        logger.info(f"Reloading model from {model_path}")
+        state = self._load_state(model_path)
+        if engine is not None:
+            state.engine = engine
+        with self._state_lock:
+            old, self._state = self._state, state
+            self.model_path = model_path
+            old.retired = True
+            old.shares_engine = old.engine is not None and old.engine is state.engine
+            idle = old.users == 0
+        self._reloads.inc()
+        logger.info(f"Swapped in model {state.model_id}" + ("" if idle else f"; {old.users} in-flight requests finish on the old one"))
+        if idle:
+            old.unload()
+
+    def _load_state(self, model_path: str) -> "ModelState":
+        if not Path(model_path).exists():
+            logger.error(f"Model path {model_path} does not exist. Run scripts/download_model.py and scripts/convert_model.py first.")
+            raise FileNotFoundError(f"Model not found at {model_path}")
         
-        try:
-            self.translator = ctranslate2.Translator(
-                self.model_path,
-                device=self.device,
-                compute_type=self.compute_type
+        load_started = time.perf_counter()
+        import transformers
+        manifest = read_manifest(model_path)
+        model_id = str(Path(model_path).resolve())
+        if manifest is not None:
+            if self.verify_checksums:
+                verify_manifest(model_path, manifest)
+            # Content hash, so translation-memory entries stay valid wherever the artifact is deployed
+            model_id = f"sha256:{manifest['model_sha256']}"
+        elif self.offline:
+            raise FileNotFoundError(
+                f"model.offline is set but {model_path} has no manifest. Re-run scripts/convert_model.py to bundle the tokenizer."
             )
+        tokenizer_source, local_only = self._tokenizer_source(model_path, manifest)
+
+        # A vocabulary map from scripts/convert_model.py restricts the output softmax to en/sn/nd tokens
+        vmap_path = Path(model_path) / VMAP_NAME
+        use_vmap = config.get("model.use_vmap", True) and vmap_path.is_file()
+        if use_vmap:
+            # Outputs can differ from the full vocabulary, so keep their translation-memory entries apart
+            model_id = f"{model_id}+vmap:{file_sha256(vmap_path)[:16]}"
+            logger.info(f"Decoding with vocabulary map {vmap_path}")
+
+        try:
+            engine = self.create_engine(model_path) if self.load_engine else None
             
-            # Using NLLB tokenizer from HF
-            # We assume the tokenizer vocab/config is inside the converted model dir or we fetch from original HF name
-            # CTranslate2 models usually contain the SP model but for NLLB we need the HF tokenizer for correct pre-processing
-            model_name = config.get("model.name", "facebook/nllb-200-distilled-600M")
-            self.tokenizer = transformers.AutoTokenizer.from_pretrained(model_name)
+            # NLLB needs the HF tokenizer for correct pre-processing; converted artifacts carry their own copy
+            tokenizer = transformers.AutoTokenizer.from_pretrained(tokenizer_source, local_files_only=local_only)
             
+            self._model_load_seconds.set(time.perf_counter() - load_started)
             logger.info("Model and Tokenizer loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load model architecture: {e}")
             raise
+        return ModelState(model_path, engine, tokenizer, manifest, model_id, use_vmap)
+
+    def create_engine(self, model_path: Optional[str] = None):
+        """
+        Creates a CTranslate2 translator for the model with this Translator's device and threading settings.
+        """
+        import ctranslate2
+        return ctranslate2.Translator(
+            model_path or self.model_path,
+            device=self.device,
+            compute_type=self.compute_type,
+            inter_threads=self.inter_threads,
+            intra_threads=self.intra_threads
+        )
+
+    def _tokenizer_source(self, model_path: str, manifest: Optional[dict]) -> Tuple[str, bool]:
+        """
+        Returns where to load the tokenizer from and whether the hub must be avoided.
+        """
+        if self.tokenizer_name:
+            return self.tokenizer_name, self.offline
+        if manifest is not None:
+            return str(Path(model_path) / manifest["tokenizer"]), True
+        return config.get("model.name", "facebook/nllb-200-distilled-600M"), False
+
+    def _model(self) -> "ModelState":
+        # The model this thread's request started on, so a reload cannot switch it midway
+        return getattr(self._pinned, "state", None) or self._state
+
+    @property
+    def translator(self):
+        return self._model().engine
+
+    @translator.setter
+    def translator(self, engine):
+        self._model().engine = engine
+
+    @property
+    def tokenizer(self):
+        return self._model().tokenizer
+
+    @tokenizer.setter
+    def tokenizer(self, tokenizer):
+        self._model().tokenizer = tokenizer
 
-    def translate_batch(self, source_text: List[str], source_lang: str, target_lang: str, beam_size: int = 5) -> List[str]:
+    @property
+    def use_vmap(self) -> bool:
+        return self._model().use_vmap
+
+    @use_vmap.setter
+    def use_vmap(self, use_vmap: bool):
+        self._model().use_vmap = use_vmap
+
+    @property
+    def model_id(self) -> str:
+        return self._model().model_id
+
+    @property
+    def manifest(self) -> Optional[dict]:
+        return self._model().manifest
+
+    def hold(self) -> "ModelState":
+        """
+        Keeps the current model loaded across a reload until release() is called,
+        e.g. for a file job whose stages run in several threads (see pinned()).
+        """
+        with self._state_lock:
+            state = self._state
+            state.users += 1
+            return state
+
+    def release(self, state: "ModelState"):
+        with self._state_lock:
+            state.users -= 1
+            idle = state.retired and state.users == 0
+        if idle:
+            state.unload()
+
+    @contextmanager
+    def pinned(self, state: Optional["ModelState"] = None) -> Iterator["ModelState"]:
+        """
+        Runs the block on one model (the current one, or a held state): every
+        tokenize/infer/detokenize call in this thread uses it even if reload() swaps
+        in another meanwhile. Nested blocks reuse the outer pin.
+        """
+        outer = getattr(self._pinned, "state", None)
+        if outer is not None:
+            yield outer
+            return
+        if state is None:
+            state = self.hold()
+        else:
+            with self._state_lock:
+                state.users += 1
+        self._pinned.state = state
+        try:
+            yield state
+        finally:
+            self._pinned.state = None
+            self.release(state)
+
+    def translate_batch(self, source_text: List[str], source_lang: str, target_lang: str, beam_size: Optional[int] = None,
+                        profile: ProfileSpec = None) -> List[str]:
         """
         Translates a batch of sentences from source_lang to target_lang.
+        Sentences found in the translation memory skip the model, and duplicates
+        within the batch are translated once. profile names a decoding profile
+        (default decoding.default_profile); beam_size overrides its beam size.
+        """
+        n = len(source_text)
+        return self.translate_mixed(source_text, [source_lang] * n, [target_lang] * n, beam_size=beam_size, profile=profile)
+
+    def submit(self, source_text: List[str], source_lang: str, target_lang: str, beam_size: Optional[int] = None,
+               profile: ProfileSpec = None) -> Future:
+        """
+        Schedules translate_batch on the translator's worker pool and returns a Future.
+        The pool has one worker per model replica (inter_threads), so concurrent
+        submissions keep every replica busy.
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.inter_threads, thread_name_prefix="translator")
+        return self._executor.submit(self.translate_batch, source_text, source_lang, target_lang, beam_size, profile)
+
+    def close(self):
+        """
+        Shuts down the submission pool, waiting for queued work to finish.
+        """
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def unload(self):
+        """
+        Releases the model weights (e.g. when evicted from a ModelRegistry). The
+        translator cannot be used afterwards.
+        """
+        self.close()
+        with self._state_lock:
+            state = self._state
+            state.retired = True
+            idle = state.users == 0
+        if idle:
+            state.unload()
+        logger.info(f"Unloaded model {self.model_path}")
+
+    def decoding_profile(self, profile: ProfileSpec = None, beam_size: Optional[int] = None) -> DecodingProfile:
+        """
+        Resolves a profile name (None for decoding.default_profile), applying a beam_size override.
+        Raises ValueError for an unknown profile.
+        """
+        return resolve_profile(self.profiles, self.default_profile, profile, beam_size)
+
+    def translate_mixed(self, source_text: List[str], source_langs: List[str], target_langs: List[str], beam_size: Optional[int] = None,
+                        profile: ProfileSpec = None) -> List[str]:
+        """
+        Translates sentences that each carry their own source and target language,
+        e.g. en->sn, sn->en and en->nd together, in a single engine pass.
         """
         if not source_text:
             return []
-        
-        # 1. Tokenize (with HF tokenizer)
-        # NLLB requires setting src_lang on tokenizer
-        self.tokenizer.src_lang = source_lang
-        
-        # Optimization: Use tokenizer.tokenize directly which is faster than encode -> convert
-        # Also, checking if we can use batch_encode_plus if we wanted IDs, but for CT2 strings are needed
-        # We stick to list comprehension but use .tokenize()
-        source_tokens = [self.tokenizer.tokenize(text) for text in source_text]
-        
-        # 2. Run Inference
-        results = self.translator.translate_batch(
-            source_tokens,
-            target_prefix=[[target_lang]] * len(source_text),
-            beam_size=beam_size
+        if not len(source_text) == len(source_langs) == len(target_langs):
+            raise ValueError("source_text, source_langs and target_langs must have the same length")
+        decoding = self.decoding_profile(profile, beam_size)
+
+        with self.pinned():
+            keys, known, pending = self.lookup(source_text, source_langs, target_langs, profile=decoding)
+            if pending:
+                items = list(pending.values())
+                translations = self._translate_uncached(
+                    [text for text, _, _ in items], [src for _, src, _ in items], [tgt for _, _, tgt in items], profile=decoding
+                )
+                known.update(self.remember(pending.keys(), translations))
+
+        return [known[key] for key in keys]
+
+    def translate_multi_target(self, source_text: List[str], source_lang: str, target_langs: List[str], beam_size: Optional[int] = None,
+                               profile: ProfileSpec = None) -> Dict[str, List[str]]:
+        """
+        Translates the same sentences into several target languages in one pass.
+        Each source sentence is tokenized once. Returns translations keyed by target language.
+        """
+        n = len(source_text)
+        expanded_text = [text for _ in target_langs for text in source_text]
+        expanded_targets = [lang for lang in target_langs for _ in source_text]
+        translations = self.translate_mixed(
+            expanded_text, [source_lang] * len(expanded_text), expanded_targets, beam_size=beam_size, profile=profile
         )
+        return {lang: translations[i * n:(i + 1) * n] for i, lang in enumerate(target_langs)}
+
+    def translate_document(self, text: str, source_lang: str, target_lang: str, beam_size: Optional[int] = None,
+                           profile: ProfileSpec = None) -> str:
+        """
+        Translates free-form text such as a multi-paragraph document.
+
+        The text is split into sentences (rule-based, suitable for en/sn/nd), sentences
+        longer than data.max_length tokens are cut at clause or word boundaries instead
+        of being truncated, and all pieces go through translate_batch together. The
+        translations are stitched back with the original line and paragraph breaks.
+        """
+        leading, segments, pieces, owners = self._document_pieces(text)
+        if not segments:
+            return text
+
+        translations = self.translate_batch(pieces, source_lang, target_lang, beam_size=beam_size, profile=profile)
+        translated = [[] for _ in segments]
+        for owner, translation in zip(owners, translations):
+            translated[owner].append(translation)
+
+        return leading + "".join(" ".join(parts) + gap for parts, (_, gap) in zip(translated, segments))
+
+    def translate_stream(self, text: str, source_lang: str, target_lang: str, max_decoding_length: Optional[int] = None,
+                         profile: ProfileSpec = None) -> Iterator[str]:
+        """
+        Translates text incrementally, yielding pieces of output as soon as the engine
+        produces them; concatenating everything yielded gives the full translation.
+        Uses greedy decoding for the lowest time to first token, with the profile's
+        length bounds and penalties; max_decoding_length overrides the profile's cap.
+        Sentences are streamed one after another with the original whitespace between them.
+        """
+        decoding = self.decoding_profile(profile, beam_size=1)
+        if max_decoding_length:
+            decoding = replace(decoding, max_decoding_length=max_decoding_length)
+        leading, segments, pieces, owners = self._document_pieces(text)
+        if not segments:
+            yield text
+            return
+
+        if leading:
+            yield leading
+        for i, (_, gap) in enumerate(segments):
+            parts = [piece for piece, owner in zip(pieces, owners) if owner == i]
+            for j, piece in enumerate(parts):
+                if j:
+                    yield " "
+                yield from self._stream_sentence(piece, source_lang, target_lang, decoding)
+            if gap:
+                yield gap
+
+    def _stream_sentence(self, text: str, source_lang: str, target_lang: str, decoding: DecodingProfile) -> Iterator[str]:
+        # Held rather than pinned: the consumer may resume this generator from another thread
+        state = self.hold()
+        try:
+            yield from self._stream_on(state, text, source_lang, target_lang, decoding)
+        finally:
+            self.release(state)
+
+    def _stream_on(self, state: "ModelState", text: str, source_lang: str, target_lang: str,
+                   decoding: DecodingProfile) -> Iterator[str]:
+        with self.pinned(state):
+            # Greedy results are cacheable like beam size 1 translations of the same profile
+            keys, known, pending = self.lookup([text], source_lang, target_lang, profile=decoding)
+            if pending:
+                source_tokens = self.tokenize([text], source_lang)[0]
+        if not pending:
+            yield known[keys[0]]
+            return
+
+        token_ids: List[int] = []
+        emitted = ""
+        started = time.perf_counter()
+        options = decoding.options(len(source_tokens))
+        for step in state.engine.generate_tokens(
+            # No use_vmap here: generate_tokens reports vocabulary-map indices instead of token ids
+            source_tokens, target_prefix=[target_lang], sampling_topk=1,
+            max_input_length=options["max_input_length"], max_decoding_length=options["max_decoding_length"],
+            repetition_penalty=options["repetition_penalty"], no_repeat_ngram_size=options["no_repeat_ngram_size"]
+        ):
+            token_ids.append(step.token_id)
+            # Decode the whole prefix so SentencePiece spacing comes out right, then emit the new tail.
+            # A character split across byte tokens decodes as U+FFFD until its last byte arrives, so hold it back
+            decoded = state.tokenizer.decode(token_ids, skip_special_tokens=True).rstrip("\ufffd")
+            if decoded.startswith(emitted) and len(decoded) > len(emitted):
+                if not emitted:
+                    self._first_token_seconds.observe(time.perf_counter() - started)
+                yield decoded[len(emitted):]
+                emitted = decoded
+
+        final = state.tokenizer.decode(token_ids, skip_special_tokens=True)
+        # If a later token rewrote already decoded text, send the corrected remainder after the common prefix
+        common = len(os.path.commonprefix([emitted, final]))
+        if len(final) > common:
+            yield final[common:]
+        self.remember(keys, [final])
+
+    def _document_pieces(self, text: str) -> Tuple[str, List[Tuple[str, str]], List[str], List[int]]:
+        """
+        Splits text into sentences and sentences into pieces within data.max_length.
+        Returns (leading whitespace, [(sentence, gap)], pieces, index of the sentence owning each piece).
+        """
+        leading, segments = split_segments(text)
+        if not segments:
+            return leading, segments, [], []
+
+        # Language tag and EOS take two positions of the model's input budget
+        budget = max(self.max_input_length - 2, 1)
+        sentences = [sentence for sentence, _ in segments]
+        lengths = [len(tokens) for tokens in self._tokenize_pieces(sentences)]
+
+        pieces, owners = [], []
+        for i, (sentence, length) in enumerate(zip(sentences, lengths)):
+            if not sentence:
+                continue
+            parts = [sentence] if length <= budget else split_long_segment(sentence, self._count_tokens, budget)
+            pieces.extend(parts)
+            owners.extend([i] * len(parts))
+        return leading, segments, pieces, owners
+
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        return [len(tokens) for tokens in self._tokenize_pieces(texts)]
+
+    def lookup(self, source_text: List[str], source_langs: LangSpec, target_langs: LangSpec, beam_size: Optional[int] = None,
+               profile: ProfileSpec = None) -> Tuple[List[str], Dict[str, str], Dict[str, Tuple[str, str, str]]]:
+        """
+        Splits a batch into pass-through segments, translation-memory hits and unique
+        items still to translate. Returns (key per input, known translations by key,
+        pending (text, source_lang, target_lang) by key); pass-through segments are
+        known under is_passthrough_key() keys and map to themselves.
+        """
+        source_langs = _per_item(source_langs, len(source_text))
+        target_langs = _per_item(target_langs, len(source_text))
+        decoding = self.decoding_profile(profile, beam_size)
+        skipped = self.prefilter.split(source_text, source_langs, target_langs) if self.prefilter is not None else {}
+        keys = [
+            PASSTHROUGH_KEY + text if i in skipped else make_cache_key(src, tgt, decoding.signature, self.model_id, text)
+            for i, (text, src, tgt) in enumerate(zip(source_text, source_langs, target_langs))
+        ]
+        unique_keys = list(dict.fromkeys(key for key in keys if not is_passthrough_key(key)))
+        known = self.cache.get_many(unique_keys) if self.cache is not None else {}
+        self._memory_hits.inc(len(known))
+
+        for i, reason in skipped.items():
+            known[keys[i]] = source_text[i]
+            self._passthrough_by_reason[reason].inc()
+        self._passthrough.inc(len(skipped))
+
+        pending = {}
+        for key, item in zip(keys, zip(source_text, source_langs, target_langs)):
+            if key not in known and key not in pending:
+                pending[key] = item
+
+        self._memory_misses.inc(len(pending))
+        if self.cache is not None:
+            self._memory_hit_rate.set(self.cache.stats["hit_rate"])
+        return keys, known, pending
+
+    def remember(self, keys: Iterable[str], translations: List[str]) -> Dict[str, str]:
+        """
+        Stores freshly translated sentences in the translation memory and returns them by key.
+        """
+        translated = dict(zip(keys, translations))
+        if self.cache is not None:
+            self.cache.put_many(translated)
+        return translated
+
+    def _translate_uncached(self, source_text: List[str], source_langs: List[str], target_langs: List[str],
+                            profile: ProfileSpec = None) -> List[str]:
+        """
+        Runs tokenization, inference and detokenization for every item given.
+        A sentence that appears with several target languages is tokenized once.
+        """
+        unique_sources = list(dict.fromkeys(zip(source_text, source_langs)))
+        tokenized = dict(zip(unique_sources, self.tokenize(
+            [text for text, _ in unique_sources], [src for _, src in unique_sources]
+        )))
+        source_tokens = [tokenized[item] for item in zip(source_text, source_langs)]
+        target_tokens = self.infer(source_tokens, target_langs, profile=profile)
+        return self.detokenize(target_tokens)
+
+    def tokenize(self, source_text: List[str], source_langs: LangSpec) -> List[List[str]]:
+        """
+        Converts sentences to the subword tokens CTranslate2 expects, including the
+        NLLB source language tag and EOS. source_langs is one code or one per sentence.
+        """
+        source_langs = _per_item(source_langs, len(source_text))
+        with self._tokenize_seconds.time():
+            # The language tag is added per item instead of via tokenizer.src_lang, so no shared state is mutated
+            return [
+                self._add_language_tag(tokens, lang)
+                for tokens, lang in zip(self._tokenize_pieces(source_text), source_langs)
+            ]
+
+    def _tokenize_pieces(self, source_text: List[str]) -> List[List[str]]:
+        if self._is_fast_tokenizer():
+            # One call into the Rust tokenizer for the whole batch; same pieces as tokenizer.tokenize()
+            encodings = self.tokenizer.backend_tokenizer.encode_batch(source_text, add_special_tokens=False)
+            return [encoding.tokens for encoding in encodings]
+        return [self.tokenizer.tokenize(text) for text in source_text]
 
-        # 3. Detokenize
-        # CT2 returns a result object, we extract the first hypothesis tokens
-        target_tokens = [result.hypotheses[0] for result in results]
-        # Detokenize using the HF tokenizer's decoder logic (convert_tokens_to_string)
-        translated_text = [
-            self.tokenizer.decode(
-                self.tokenizer.convert_tokens_to_ids(tokens), 
-                skip_special_tokens=True
-            ) 
-            for tokens in target_tokens
+    def _is_fast_tokenizer(self) -> bool:
+        return getattr(self.tokenizer, "is_fast", False) is True
+
+    def _add_language_tag(self, tokens: List[str], source_lang: str) -> List[str]:
+        # Mirrors NllbTokenizer special-token placement for src_lang
+        if getattr(self.tokenizer, "legacy_behaviour", False):
+            return tokens + [self.tokenizer.eos_token, source_lang]
+        return [source_lang] + tokens + [self.tokenizer.eos_token]
+
+    def infer(self, source_tokens: List[List[str]], target_langs: LangSpec, beam_size: Optional[int] = None,
+              profile: ProfileSpec = None) -> List[List[str]]:
+        """
+        Runs beam search on tokenized sentences and returns the best hypothesis for each.
+        target_langs is one code or one per sentence, passed as per-item target_prefix.
+        Inputs are sorted by token length and cut into sub-batches that follow
+        quantization.batch_type / max_batch_size; results come back in input order.
+        Sub-batches are queued asynchronously so up to inter_threads of them run in parallel.
+        Each sub-batch's decoding budget comes from the profile and its longest source.
+        """
+        target_langs = _per_item(target_langs, len(source_tokens))
+        decoding = self.decoding_profile(profile, beam_size)
+        with self._infer_seconds.time():
+            target_tokens = self._infer_batches(source_tokens, target_langs, decoding)
+
+        self._batch_sentences.observe(len(source_tokens))
+        self._batch_source_tokens.observe(sum(len(tokens) for tokens in source_tokens))
+        self._batch_target_tokens.observe(sum(len(tokens) for tokens in target_tokens))
+        return target_tokens
+
+    def _infer_batches(self, source_tokens: List[List[str]], target_langs: List[str], decoding: DecodingProfile) -> List[List[str]]:
+        batches = length_sorted_batches(
+            [len(tokens) for tokens in source_tokens], self.max_batch_size, self.batch_type
+        )
+        submitted = [
+            (indices, self.translator.translate_batch(
+                [source_tokens[i] for i in indices],
+                target_prefix=[[target_langs[i]] for i in indices],
+                use_vmap=self.use_vmap,
+                asynchronous=True,
+                **decoding.options(max(len(source_tokens[i]) for i in indices))
+            ))
+            for indices in batches
         ]
-        
-        return translated_text
+        self._engine_batches.inc(len(submitted))
+        target_tokens = [None] * len(source_tokens)
+        for indices, results in submitted:
+            # CT2 returns a result object, we extract the first hypothesis tokens
+            for i, result in zip(indices, results):
+                target_tokens[i] = result.result().hypotheses[0]
+        return target_tokens
+
+    def detokenize(self, target_tokens: List[List[str]]) -> List[str]:
+        """
+        Converts hypothesis tokens back to text, producing exactly what
+        tokenizer.decode(convert_tokens_to_ids(tokens), skip_special_tokens=True) would.
+        """
+        with self._detokenize_seconds.time():
+            return self._detokenize(target_tokens)
+
+    def _detokenize(self, target_tokens: List[List[str]]) -> List[str]:
+        if not self._is_fast_tokenizer():
+            # Detokenize using the HF tokenizer's decoder logic (convert_tokens_to_string)
+            return [
+                self.tokenizer.decode(
+                    self.tokenizer.convert_tokens_to_ids(tokens), 
+                    skip_special_tokens=True
+                ) 
+                for tokens in target_tokens
+            ]
+
+        vocab, unk_id = self._vocabulary()
+        token_ids = [[vocab.get(token, unk_id) for token in tokens] for tokens in target_tokens]
+        texts = self.tokenizer.backend_tokenizer.decode_batch(token_ids, skip_special_tokens=True)
+        if self.tokenizer.clean_up_tokenization_spaces:
+            texts = [self.tokenizer.clean_up_tokenization(text) for text in texts]
+        return texts
+
+    def _vocabulary(self) -> Tuple[Dict[str, int], int]:
+        # Token -> id map (added tokens included), built once per loaded tokenizer
+        if self._vocab is None or self._vocab[0] is not self.tokenizer:
+            self._vocab = (self.tokenizer, self.tokenizer.get_vocab(), self.tokenizer.unk_token_id)
+        return self._vocab[1], self._vocab[2]
 
     def get_language_code(self, short_code: str) -> str:
         """
@@ -87,6 +677,9 @@ class Translator:
         languages = config.get("languages", {})
         if short_code in languages:
             return languages[short_code]
+        # Artifacts record the mapping they were built with
+        if self.manifest is not None and short_code in self.manifest.get("languages", {}):
+            return self.manifest["languages"][short_code]
         
         # If not in mapping, assume it might already be a FLORES code or return as is
         # Ideally validation should be stricter
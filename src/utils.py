@@ -1,6 +1,5 @@
 import logging
 import sys
-import torch
 from pathlib import Path
 
 def setup_logger(name: str = "zimlingua", level: int = logging.INFO) -> logging.Logger:
@@ -22,13 +21,15 @@ def setup_logger(name: str = "zimlingua", level: int = logging.INFO) -> logging.
 
 def get_device() -> str:
     """
-    Detects the best available device (CUDA, MPS, or CPU).
+    Detects the best available device (CUDA or CPU) for CTranslate2.
+    Asks CTranslate2 itself, so torch does not have to be imported just for this.
     """
-    if torch.cuda.is_available():
-        return "cuda"
-    # elif torch.backends.mps.is_available(): # MPS support for Mac M1/M2 usually requires verification for CTranslate2
-    #     return "cpu" # Safest default for now, can enable mps if supported by backend
-    else:
-        return "cpu"
+    try:
+        import ctranslate2
+        if ctranslate2.get_cuda_device_count() > 0:
+            return "cuda"
+    except (ImportError, RuntimeError):
+        pass
+    return "cpu"
 
 logger = setup_logger()
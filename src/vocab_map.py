@@ -0,0 +1,84 @@
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Set
+
+# CTranslate2 reads this file from the model directory when translating with use_vmap=True
+VMAP_NAME = "vmap.txt"
+
+
+def read_corpus(paths: Iterable[str]) -> Iterator[str]:
+    """
+    Yields the text of a reference corpus: every line of .txt/.tsv files and
+    every text cell of .csv files (so both sides of a parallel corpus count).
+    """
+    for path in paths:
+        path = Path(path)
+        if path.suffix == ".csv":
+            import pandas as pd
+            frame = pd.read_csv(path, dtype=str)
+            for column in frame.columns:
+                yield from frame[column].dropna()
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield line.strip()
+
+
+def read_source_side(paths: Iterable[str], column: str = "source") -> Iterator[str]:
+    """
+    Yields only the source-language text of a corpus: the given column of .csv files
+    (the first column if it is missing), the first field of .tsv lines and every line of
+    other files.
+    """
+    for path in paths:
+        path = Path(path)
+        if path.suffix == ".csv":
+            import pandas as pd
+            frame = pd.read_csv(path, dtype=str)
+            yield from frame[column if column in frame.columns else frame.columns[0]].dropna()
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    text = line.split("\t")[0].strip() if path.suffix == ".tsv" else line.strip()
+                    if text:
+                        yield text
+
+
+def build_vocabulary_map(tokenizer, texts: Iterable[str], language_tags: Iterable[str], min_count: int = 1) -> Set[str]:
+    """
+    Collects the target tokens the model may produce for our languages: every piece seen
+    at least min_count times in the corpus, every single-character piece (so unseen words
+    can still be spelled out), the configured language tags and the special tokens.
+    """
+    counts: Counter = Counter()
+    for text in texts:
+        counts.update(tokenizer.tokenize(text))
+
+    vocab = tokenizer.get_vocab()
+    candidates = {token for token, count in counts.items() if count >= min_count and token in vocab}
+    candidates.update(token for token in vocab if len(token.lstrip("▁")) <= 1)
+    candidates.update(tag for tag in language_tags if tag in vocab)
+    candidates.update(tokenizer.all_special_tokens)
+    return candidates
+
+
+def write_vocabulary_map(model_dir, candidates: Set[str]) -> Path:
+    """
+    Writes the candidates as CTranslate2 fixed candidates (an empty source key),
+    which restricts the output projection and softmax to them for every input.
+    """
+    path = Path(model_dir) / VMAP_NAME
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\t" + " ".join(sorted(candidates)) + "\n")
+    return path
+
+
+def vocabulary_map_report(candidates: Set[str], vocab_size: int) -> Dict[str, float]:
+    return {
+        "file": VMAP_NAME,
+        "tokens": len(candidates),
+        "vocab_size": vocab_size,
+        "fraction": len(candidates) / vocab_size if vocab_size else 0.0,
+    }
+
@@ -0,0 +1,44 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from src.translator import Translator
+
+@pytest.fixture
+def translator():
+    """
+    Translator whose engine echoes the target prefix plus source tokens, one result per input.
+    """
+    with patch('src.translator.ctranslate2.Translator') as mock_ct2, \
+         patch('src.translator.transformers.AutoTokenizer.from_pretrained') as mock_tok:
+
+        tokenizer = MagicMock()
+        tokenizer.tokenize.side_effect = lambda text: text.split()
+        tokenizer.convert_tokens_to_ids.side_effect = lambda tokens: tokens
+        tokenizer.eos_token = "</s>"
+        tokenizer.legacy_behaviour = False
+        tokenizer.decode.side_effect = lambda ids, skip_special_tokens=True: " ".join(
+            token for token in ids if not (token.endswith("_Latn") or token == "</s>")
+        ).upper()
+        mock_tok.return_value = tokenizer
+
+        def fake_translate(tokens, target_prefix, **kwargs):
+            results = []
+            for src, prefix in zip(tokens, target_prefix):
+                result = MagicMock()
+                result.hypotheses = [prefix + src]
+                # asynchronous=True returns handles whose result() yields the translation
+                result.result.return_value = result
+                results.append(result)
+            return results
+
+        def fake_generate_tokens(source, target_prefix, **kwargs):
+            # Echoes the source words one step at a time (the prefix is not re-emitted), ids being the tokens
+            tokens = source[1:-1]
+            for i, token in enumerate(tokens):
+                yield SimpleNamespace(token=token, token_id=token, is_last=i == len(tokens) - 1)
+
+        mock_ct2.return_value.translate_batch.side_effect = fake_translate
+        mock_ct2.return_value.generate_tokens.side_effect = fake_generate_tokens
+        with patch('src.translator.Path.exists', return_value=True):
+            t = Translator(model_path="dummy_path")
+        yield t
@@ -0,0 +1,56 @@
+import json
+import pytest
+from unittest.mock import patch
+from src.artifact import MANIFEST_NAME, language_tags, read_manifest, verify_manifest, write_manifest
+
+
+def test_manifest_roundtrip_and_verification(tmp_path):
+    (tmp_path / "model.bin").write_bytes(b"weights")
+    (tmp_path / "tokenizer").mkdir()
+    (tmp_path / "tokenizer" / "sentencepiece.bpe.model").write_bytes(b"spm")
+
+    manifest = write_manifest(tmp_path, "facebook/nllb", "int8", {"sn": "sna_Latn"}, ["sna_Latn"])
+    assert read_manifest(tmp_path) == manifest
+    assert set(manifest["files"]) == {"model.bin", "tokenizer/sentencepiece.bpe.model"}
+    verify_manifest(tmp_path, manifest)
+
+    (tmp_path / "model.bin").write_bytes(b"tampered")
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        verify_manifest(tmp_path, manifest)
+    assert read_manifest(tmp_path / "missing") is None
+
+
+def test_language_tags_are_flores_codes():
+    assert language_tags(["▁hello", "sna_Latn", "eng_Latn", "</s>", "zho_Hans"]) == ["eng_Latn", "sna_Latn", "zho_Hans"]
+
+
+def test_offline_mode_requires_manifest(tmp_path):
+    from src.translator import Translator
+    from src.config import config
+
+    with patch.dict(config.all["model"], {"offline": True}), \
+         patch('src.translator.ctranslate2.Translator'), \
+         patch('src.translator.transformers.AutoTokenizer.from_pretrained'):
+        with pytest.raises(FileNotFoundError, match="no manifest"):
+            Translator(model_path=str(tmp_path))
+
+
+def test_translator_loads_bundled_tokenizer(tmp_path):
+    pytest.importorskip("torch")
+    pytest.importorskip("sentencepiece")
+    from scripts.benchmark import build_tiny_model
+    from src.translator import Translator
+    from src.config import config
+
+    ct2_dir = build_tiny_model(tmp_path, d_model=16, layers=1)
+    manifest = json.loads((ct2_dir / MANIFEST_NAME).read_text())
+    assert manifest["languages"]["sn"] == "sna_Latn"
+    assert "eng_Latn" in manifest["language_tags"]
+    assert (ct2_dir / "tokenizer" / "sentencepiece.bpe.model").exists()
+
+    with patch.dict(config.all["model"], {"offline": True, "verify_checksums": True}), \
+         patch('src.translator.transformers.AutoTokenizer.from_pretrained', wraps=__import__("transformers").AutoTokenizer.from_pretrained) as from_pretrained:
+        translator = Translator(model_path=str(ct2_dir))
+    from_pretrained.assert_called_once_with(str(ct2_dir / "tokenizer"), local_files_only=True)
+    assert translator.model_id == f"sha256:{manifest['model_sha256']}"
+    assert len(translator.translate_batch(["hello world"], "eng_Latn", "sna_Latn", beam_size=1)) == 1
@@ -0,0 +1,35 @@
+import pytest
+from src.batching import length_sorted_batches
+
+def test_token_budget_groups_similar_lengths():
+    lengths = [10, 2, 9, 3, 1]
+    batches = length_sorted_batches(lengths, max_batch_size=20, batch_type="tokens")
+    assert batches == [[4, 1, 3], [2, 0]]
+    for batch in batches:
+        assert len(batch) * max(lengths[i] for i in batch) <= 20
+
+def test_oversized_item_gets_own_batch():
+    assert length_sorted_batches([50, 1], max_batch_size=8) == [[1], [0]]
+
+def test_examples_batch_type():
+    batches = length_sorted_batches([3, 1, 2, 4, 5], max_batch_size=2, batch_type="examples")
+    assert batches == [[1, 2], [0, 3], [4]]
+
+def test_unknown_batch_type():
+    with pytest.raises(ValueError):
+        length_sorted_batches([1], max_batch_size=2, batch_type="bytes")
+
+def test_translate_batch_restores_order(translator):
+    translator.max_batch_size = 10
+    sources = ["a b c d", "e", "f g", "h"]
+    results = translator.translate_batch(sources, source_lang="eng_Latn", target_lang="sna_Latn", beam_size=2)
+    assert results == ["A B C D", "E", "F G", "H"]
+
+    engine_calls = translator.translator.translate_batch.call_args_list
+    stripped = [[tokens[1:-1] for tokens in call.args[0]] for call in engine_calls]
+    assert stripped == [[["e"], ["h"]], [["f", "g"]], [["a", "b", "c", "d"]]]
+    assert all(call.kwargs["beam_size"] == 2 for call in engine_calls)
+
+def test_beam_size_defaults_to_config(translator):
+    translator.translate_batch(["a"], source_lang="eng_Latn", target_lang="sna_Latn")
+    assert translator.translator.translate_batch.call_args.kwargs["beam_size"] == translator.beam_size
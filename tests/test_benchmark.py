@@ -0,0 +1,21 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("sentencepiece")
+pytest.importorskip("ctranslate2")
+
+from scripts.benchmark import build_tiny_model, run_case, synthetic_corpus
+from src.translator import Translator
+
+def test_tiny_model_benchmark_case(tmp_path):
+    ct2_dir = build_tiny_model(tmp_path, d_model=16, layers=1)
+    translator = Translator(model_path=str(ct2_dir), tokenizer_name=str(tmp_path / "hf"))
+    translator.cache = None
+
+    corpus = synthetic_corpus(4, max_words=5)
+    result = run_case(translator, corpus, "eng_Latn", "sna_Latn", beam_size=1, batch_size=2, repeat=1)
+
+    assert result["sentences_per_sec"] > 0
+    assert result["latency_p50_ms"] <= result["latency_p99_ms"]
+    assert result["peak_rss_mb"] > 0
+    assert result["rss_mb"] > 0 and "rss_delta_mb" in result
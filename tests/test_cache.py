@@ -0,0 +1,67 @@
+import os
+import pytest
+from src.cache import TranslationCache, SQLiteCacheStore, make_cache_key
+
+def test_cache_key_normalizes_whitespace():
+    a = make_cache_key("eng_Latn", "sna_Latn", 5, "model", "Hello   World ")
+    b = make_cache_key("eng_Latn", "sna_Latn", 5, "model", "Hello World")
+    c = make_cache_key("eng_Latn", "nde_Latn", 5, "model", "Hello World")
+    assert a == b
+    assert a != c
+
+def test_lru_eviction_and_counters():
+    cache = TranslationCache(max_entries=2)
+    cache.put_many({"a": "1", "b": "2"})
+    cache.get_many(["a"])  # 'a' becomes most recently used
+    cache.put_many({"c": "3"})
+
+    found = cache.get_many(["a", "b", "c"])
+    assert found == {"a": "1", "c": "3"}
+    assert cache.hits == 3
+    assert cache.misses == 1
+
+def test_sqlite_store_shared_between_instances(tmp_path):
+    path = tmp_path / "tm.sqlite"
+    first = TranslationCache(store=SQLiteCacheStore(str(path)))
+    first.put_many({"k": "mhoro"})
+
+    second = TranslationCache(store=SQLiteCacheStore(str(path)))
+    assert second.get_many(["k"]) == {"k": "mhoro"}
+    assert second.store_hits == 1
+
+def test_sqlite_store_reopens_after_fork(tmp_path):
+    if not hasattr(os, "fork"):
+        pytest.skip("needs fork()")
+    cache = TranslationCache(store=SQLiteCacheStore(str(tmp_path / "tm.sqlite")))
+    cache.put_many({"parent": "mhoro"})
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            cache.reopen()
+            cache.put_many({"child": "ndatenda"})
+            code = 0 if cache.get_many(["parent"]) == {"parent": "mhoro"} else 1
+        finally:
+            os._exit(code)
+    assert os.waitpid(pid, 0)[1] == 0
+    assert cache.store.get_many(["child"]) == {"child": "ndatenda"}
+
+def test_batch_duplicates_translated_once(translator):
+    translator.cache = TranslationCache(max_entries=100)
+    results = translator.translate_batch(["a b", "c", "a b"], source_lang="eng_Latn", target_lang="sna_Latn")
+    assert results == ["A B", "C", "A B"]
+
+    engine_calls = translator.translator.translate_batch.call_args_list
+    assert len(engine_calls) == 1
+    assert sorted(engine_calls[0].args[0]) == [["eng_Latn", "a", "b", "</s>"], ["eng_Latn", "c", "</s>"]]
+
+def test_cache_hits_skip_model(translator):
+    translator.cache = TranslationCache(max_entries=100)
+    translator.translate_batch(["a b"], source_lang="eng_Latn", target_lang="sna_Latn")
+    results = translator.translate_batch(["a b", "d"], source_lang="eng_Latn", target_lang="sna_Latn")
+    assert results == ["A B", "D"]
+
+    engine_calls = translator.translator.translate_batch.call_args_list
+    assert len(engine_calls) == 2
+    assert engine_calls[1].args[0] == [["eng_Latn", "d", "</s>"]]
+    assert translator.cache.stats["hits"] == 1
@@ -0,0 +1,98 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from src.corpus_pipeline import CorpusPipeline, split_of
+from src.data_loader import DataLoader, PAIR_SCHEMA
+
+
+def batches_of(pairs, size):
+    for i in range(0, len(pairs), size):
+        chunk = pairs[i:i + size]
+        yield pa.RecordBatch.from_arrays(
+            [pa.array([s for s, _ in chunk], pa.string()), pa.array([t for _, t in chunk], pa.string())],
+            schema=PAIR_SCHEMA,
+        )
+
+
+def read_split(shards, split):
+    rows = []
+    for path in shards.paths[split]:
+        table = pq.read_table(path)
+        rows.extend(zip(table.column("source").to_pylist(), table.column("target").to_pylist()))
+    return rows
+
+
+def make_corpus(n):
+    pairs = [(f"Hello number {i}!", f"Mhoro nhamba {i}") for i in range(n)]
+    # Cross-chunk duplicates after normalization, and misaligned pairs
+    pairs += [(f"HELLO   number {i}!", f"mhoro nhamba {i}") for i in range(0, n, 10)]
+    pairs += [("yes", "ehe zvakanaka chaizvo nhasi mangwanani"), ("", "pasina")]
+    return pairs
+
+
+def test_pipeline_matches_the_in_memory_steps(tmp_path):
+    pairs = make_corpus(200)
+    pipeline = CorpusPipeline(train_ratio=0.8, val_ratio=0.1, test_ratio=0.1)
+    shards = pipeline.run(batches_of(pairs, 7), tmp_path, shard_rows=50)
+
+    loader = DataLoader()
+    expected = [{"source": loader.normalize_text(s), "target": loader.normalize_text(t)} for s, t in pairs]
+    expected = loader.deduplicate(loader.filter_by_length_ratio(expected))
+    written = [pair for split in ("train", "val", "test") for pair in read_split(shards, split)]
+    assert sorted(written) == sorted((item["source"], item["target"]) for item in expected)
+    assert sum(shards.rows.values()) == 200
+
+    stats = {stage.stats.name: stage.stats for stage in pipeline.stages}
+    assert pipeline.load_stats.rows_out == len(pairs)
+    assert stats["length"].dropped == 2
+    assert stats["dedup"].dropped == 20
+    assert "dedup" in pipeline.report()
+
+
+def test_shards_are_bounded_and_splits_deterministic(tmp_path):
+    pairs = make_corpus(200)
+    first = CorpusPipeline().run(batches_of(pairs, 7), tmp_path / "a", shard_rows=50)
+    second = CorpusPipeline().run(batches_of(pairs, 64), tmp_path / "b", shard_rows=1000)
+
+    assert all(pq.read_metadata(path).num_rows <= 50 for paths in first.paths.values() for path in paths)
+    assert len(first.paths["train"]) > 1
+    assert first.paths["train"][0].name == "train-00000.parquet"
+    # The split depends on the pair only, not on chunking
+    for split in ("train", "val", "test"):
+        assert sorted(read_split(first, split)) == sorted(read_split(second, split))
+    assert 0.65 < first.rows["train"] / 200 < 0.95
+
+
+def test_split_of_respects_ratios():
+    assert split_of("a", "b", 1.0, 0.0) == "train"
+    assert split_of("a", "b", 0.0, 0.0) == "test"
+    with pytest.raises(ValueError):
+        CorpusPipeline(train_ratio=0.5, val_ratio=0.1, test_ratio=0.1)
+
+
+def test_pipeline_reads_loader_batches(tmp_path):
+    (tmp_path / "corpus.csv").write_text("source,target\nHello,Mhoro\nHello,Mhoro\nThanks,Ndatenda\n", encoding="utf-8")
+    loader = DataLoader(str(tmp_path))
+    pipeline = CorpusPipeline(loader, train_ratio=1.0, val_ratio=0.0, test_ratio=0.0)
+    shards = pipeline.run(loader.iter_batches("corpus.csv", batch_rows=1), tmp_path / "out")
+    assert sorted(read_split(shards, "train")) == [("hello", "mhoro"), ("thanks", "ndatenda")]
+    assert shards.paths["val"] == []
+
+
+def test_parallel_normalization_writes_the_same_shards(tmp_path):
+    pairs = make_corpus(200)
+    serial = CorpusPipeline().run(batches_of(pairs, 64), tmp_path / "serial")
+    parallel = CorpusPipeline(workers=2).run(batches_of(pairs, 64), tmp_path / "parallel")
+    for split in ("train", "val", "test"):
+        assert read_split(parallel, split) == read_split(serial, split)
+
+
+def test_rerun_replaces_the_shards_of_the_previous_run(tmp_path):
+    CorpusPipeline().run(batches_of(make_corpus(200), 7), tmp_path, shard_rows=20)
+    (tmp_path / "notes.txt").write_text("kept", encoding="utf-8")
+    shards = CorpusPipeline(train_ratio=1.0, val_ratio=0.0, test_ratio=0.0).run(batches_of(make_corpus(30), 7), tmp_path, shard_rows=20)
+
+    assert sorted(tmp_path.glob("*.parquet")) == sorted(shards.paths["train"])
+    assert shards.paths["val"] == [] and shards.paths["test"] == []
+    assert sum(pq.read_metadata(path).num_rows for path in tmp_path.glob("*.parquet")) == 30
+    assert (tmp_path / "notes.txt").exists()
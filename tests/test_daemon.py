@@ -0,0 +1,51 @@
+import asyncio
+import subprocess
+import sys
+from types import SimpleNamespace
+from src.daemon import TranslationDaemon, DaemonClient, is_daemon_running
+from src.cli import _try_daemon_translate
+
+
+def test_client_translates_through_warm_daemon(translator, tmp_path):
+    socket_path = str(tmp_path / "d.sock")
+
+    async def run():
+        daemon = TranslationDaemon(translator, socket_path=socket_path)
+        await daemon.start()
+        loop = asyncio.get_running_loop()
+        client = DaemonClient(socket_path, timeout=5)
+        try:
+            single = await loop.run_in_executor(None, client.translate, "a b. c", "en", "sn")
+            many = await loop.run_in_executor(None, client.request, {"texts": ["d", "e"], "src": "en", "tgt": "nd"})
+            running = await loop.run_in_executor(None, is_daemon_running, socket_path)
+            try:
+                await loop.run_in_executor(None, client.request, {"texts": "d"})
+                error = None
+            except RuntimeError as e:
+                error = str(e)
+        finally:
+            await daemon.stop()
+        return single, many, running, error
+
+    single, many, running, error = asyncio.run(run())
+    assert single == {"src": "eng_Latn", "tgt": "sna_Latn", "translation": "A B. C"}
+    assert many["translations"] == ["D", "E"]
+    assert running
+    assert "list of strings" in error
+    # Socket is removed on shutdown
+    assert not is_daemon_running(socket_path)
+    assert not (tmp_path / "d.sock").exists()
+
+
+def test_cli_falls_back_without_daemon(tmp_path):
+    args = SimpleNamespace(text="hello", src="en", tgt="sn", profile=None, domain=None, socket=str(tmp_path / "missing.sock"))
+    assert _try_daemon_translate(args) is False
+
+
+def test_cli_import_does_not_load_model_stack():
+    code = (
+        "import sys; import src.cli; from src.utils import get_device; "
+        "heavy = [m for m in ('torch', 'transformers', 'ctranslate2') if m in sys.modules]; "
+        "assert not heavy, heavy"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
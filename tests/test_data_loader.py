@@ -31,3 +31,80 @@ def test_length_filtering(loader):
     filtered = loader.filter_by_length_ratio(data, threshold=2.0)
     assert len(filtered) == 1
     assert filtered[0]['source'] == "short"
+
+PAIRS = [("hello", "mhoro"), ("thank you", "ndatenda"), (None, "pasina"), ("good night", "urare zvakanaka")]
+
+
+def write_dataset(path, rows):
+    import json
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    table = pa.table({"en": [s for s, _ in rows], "sn": [t for _, t in rows], "id": list(range(len(rows)))})
+    if path.suffix == ".csv":
+        table.to_pandas().to_csv(path, index=False)
+    elif path.suffix == ".parquet":
+        pq.write_table(table, path, row_group_size=2)
+    elif path.suffix == ".arrow":
+        with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=2)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            for i, (s, t) in enumerate(rows):
+                f.write(json.dumps({"en": s, "sn": t, "id": i}) + "\n")
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet", ".arrow", ".jsonl"])
+def test_columnar_formats_load_the_same_pairs(tmp_path, suffix):
+    write_dataset(tmp_path / f"corpus{suffix}", PAIRS)
+    loader = DataLoader(str(tmp_path))
+
+    table = loader.load_table(f"corpus{suffix}", "en", "sn")
+    assert table.column_names == ["source", "target"]
+    assert table.column("source").to_pylist() == ["hello", "thank you", "good night"]
+    assert loader.load_csv(f"corpus{suffix}", "en", "sn")[1] == {"source": "thank you", "target": "ndatenda"}
+
+
+def test_batches_are_bounded(tmp_path):
+    write_dataset(tmp_path / "corpus.parquet", PAIRS * 10)
+    batches = list(DataLoader(str(tmp_path)).iter_batches("corpus.parquet", "en", "sn", batch_rows=3))
+    assert max(batch.num_rows for batch in batches) <= 3
+    assert sum(batch.num_rows for batch in batches) == 30
+
+
+@pytest.mark.parametrize("name", ["corpus.parquet", "corpus.arrow", "corpus.jsonl", "corpus.csv"])
+def test_missing_column_raises(tmp_path, name):
+    write_dataset(tmp_path / name, PAIRS)
+    with pytest.raises(ValueError, match="missing"):
+        DataLoader(str(tmp_path)).load_table(name, "en", "nd")
+
+
+def test_missing_csv_column_raises_from_load_csv(tmp_path):
+    write_dataset(tmp_path / "corpus.csv", PAIRS)
+    with pytest.raises(ValueError, match="missing"):
+        DataLoader(str(tmp_path)).load_csv("corpus.csv", source_col="en", target_col="nd")
+
+
+def test_txt_pairs_truncate_to_shorter_file(tmp_path):
+    (tmp_path / "src.txt").write_text("a\nb\nc\n", encoding="utf-8")
+    (tmp_path / "tgt.txt").write_text("x\ny\n", encoding="utf-8")
+    loader = DataLoader(str(tmp_path))
+    assert loader.load_txt("src.txt", "tgt.txt") == [{"source": "a", "target": "x"}, {"source": "b", "target": "y"}]
+    assert [batch.num_rows for batch in loader.iter_txt_batches("src.txt", "tgt.txt", batch_rows=1)] == [1, 1]
+
+
+NOISY = ["  Hello   WORLD!! 🙂 ", "Ｆｕｌｌｗｉｄｔｈ ﬁne", None, "", "Mhoro\tshamwari… (ok)", "İstanbul #tag", "a-b 'c' \"d\""]
+
+
+def test_normalize_batch_matches_normalize_text():
+    expected = [DataLoader.normalize_text(text) for text in NOISY]
+    assert DataLoader.normalize_batch(NOISY) == expected
+    assert DataLoader.normalize_batch(NOISY, workers=1, chunk_size=2) == expected
+
+
+def test_normalize_batch_in_a_process_pool():
+    from src.data_loader import normalize_pool
+    texts = NOISY * 50
+    expected = [DataLoader.normalize_text(text) for text in texts]
+    assert DataLoader.normalize_batch(texts, workers=2, chunk_size=60) == expected
+    with normalize_pool(2) as pool:
+        assert DataLoader.normalize_batch(texts, chunk_size=60, executor=pool) == expected
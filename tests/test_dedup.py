@@ -0,0 +1,103 @@
+import random
+from pathlib import Path
+import pytest
+from src.data_loader import DataLoader
+from src.dedup import Deduplicator, DigestIndex, MinHashLSH, lsh_bands, pair_digest
+
+WORDS = [f"w{i}x" for i in range(2000)]
+
+
+def random_pairs(n, seed=0):
+    rng = random.Random(seed)
+    return [(" ".join(rng.choices(WORDS, k=12)), " ".join(rng.choices(WORDS, k=10))) for _ in range(n)]
+
+
+def first_occurrences(pairs):
+    seen, keep = set(), []
+    for pair in pairs:
+        keep.append(pair not in seen)
+        seen.add(pair)
+    return keep
+
+
+def test_pair_digest_is_fixed_size_and_unambiguous():
+    assert len(pair_digest("hello", "mhoro")) == 16
+    assert pair_digest("ab", "c") != pair_digest("a", "bc")
+    assert pair_digest("hello", "mhoro") == pair_digest("hello", "mhoro")
+
+
+def test_digest_index_spills_to_disk(tmp_path):
+    index = DigestIndex(memory_budget_mb=0.05, spill_dir=str(tmp_path))
+    digests = [pair_digest(str(i), "x") for i in range(5000)]
+    assert index.add_new(digests[:3000]) == [True] * 3000
+    assert index.spills > 0 and index.disk_bytes() > 0
+    assert index.memory_bytes() <= 0.05 * (1 << 20)
+    assert index.add_new(digests[2000:]) == [False] * 1000 + [True] * 2000
+    assert len(index) == 5000
+    index.close()
+    assert list(Path(tmp_path).iterdir()) == []
+
+
+@pytest.mark.parametrize("budget_mb", [1024, 0.05])
+def test_exact_dedup_matches_a_set_of_pairs(budget_mb):
+    pairs = random_pairs(3000)
+    pairs += pairs[:500] + pairs[100:200]
+    random.Random(1).shuffle(pairs)
+    dedup = Deduplicator(memory_budget_mb=budget_mb)
+    keep = []
+    for i in range(0, len(pairs), 700):
+        chunk = pairs[i:i + 700]
+        keep += dedup.mask([s for s, _ in chunk], [t for _, t in chunk])
+    assert keep == first_occurrences(pairs)
+    stats = dedup.stats()
+    assert stats["removed_exact"] == 600 and stats["removed_near"] == 0
+    assert stats["mb_per_million_pairs"] > 0
+    dedup.close()
+
+
+def test_near_duplicates_differing_in_punctuation_and_spacing():
+    pairs = random_pairs(500, seed=2)
+    variants = [(s.replace(" ", "  ", 2) + "!", t.capitalize() + ".") for s, t in pairs[:100]]
+    edited = [(s + " w1x", t) for s, t in pairs[100:150]]
+    dedup = Deduplicator(near_duplicates=True, threshold=0.8)
+    keep = dedup.mask(*zip(*(pairs + variants + edited)))
+    assert keep[:500] == [True] * 500
+    assert not any(keep[500:600])
+    assert sum(keep[600:]) <= 5
+    assert dedup.stats()["removed_near"] == len(keep) - sum(keep)
+    assert "near-duplicates" in dedup.report()
+
+    exact_only = Deduplicator()
+    assert all(exact_only.mask(*zip(*(pairs + variants))))
+
+
+def test_punctuation_only_pairs_get_exact_dedup_only():
+    pairs = [("!!!", "..."), ("???", "--"), ("  ", "\t"), ("!!!", "..."), ("Hello!", "Mhoro!")]
+    dedup = Deduplicator(near_duplicates=True)
+    assert dedup.mask(*zip(*pairs)) == [True, True, True, False, True]
+    assert dedup.stats()["removed_near"] == 0
+    assert not dedup.lsh.hashable("???", "--")
+
+
+def test_minhash_estimates_jaccard_similarity():
+    lsh = MinHashLSH(num_perm=128)
+    pairs = random_pairs(50, seed=3)
+    changed = [(" ".join(s.split()[:6] + random.Random(i).choices(WORDS, k=6)), t) for i, (s, t) in enumerate(pairs)]
+    same = (lsh.signatures(*zip(*pairs)) == lsh.signatures(*zip(*changed))).mean()
+    assert 0.3 < same < 0.9
+    assert (lsh.signatures(["Hello, world!"], ["Mhoro"]) == lsh.signatures(["hello world"], ["mhoro"])).all()
+
+
+def test_lsh_bands_follow_the_threshold():
+    for threshold in (0.5, 0.7, 0.9):
+        bands, rows = lsh_bands(threshold, 64)
+        assert bands * rows <= 64
+        assert abs((1 / bands) ** (1 / rows) - threshold) < 0.06
+
+
+def test_data_loader_deduplicate_with_near_duplicates():
+    data = [{"source": "Hello there, friend", "target": "Mhoro shamwari yangu"},
+            {"source": "hello there friend!", "target": "mhoro  shamwari yangu."},
+            {"source": "Good night", "target": "Urare zvakanaka"}]
+    assert len(DataLoader().deduplicate(data)) == 3
+    assert len(DataLoader().deduplicate(data, Deduplicator(near_duplicates=True))) == 2
@@ -0,0 +1,87 @@
+import random
+import numpy as np
+import pyarrow as pa
+import pytest
+from src.data_loader import DataLoader
+from src.length_filter import LengthFilter, TokenCounter, word_counts
+
+
+class CharTokenizer:
+    """
+    Stand-in for the NLLB tokenizer: one token per two characters of each word, plus a
+    language tag and </s> with special tokens.
+    """
+    name_or_path = "char-pairs"
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, texts, add_special_tokens=True):
+        self.calls += 1
+        special = [1, 2] if add_special_tokens else []
+        return {"input_ids": [special + [0] * sum((len(w) + 1) // 2 for w in text.split()) for text in texts]}
+
+
+def python_ratio_mask(sources, targets, threshold):
+    keep = []
+    for source, target in zip(sources, targets):
+        src_len, tgt_len = len(source.split()), len(target.split())
+        keep.append(src_len > 0 and tgt_len > 0 and 1 / threshold <= src_len / tgt_len <= threshold)
+    return keep
+
+
+def test_word_counts_match_str_split():
+    texts = ["", "  ", "one", " two  words ", "tab\tand\nnewline", "nbsp and　ideographic", "a\x1cb\x85c", "zero​width"]
+    assert word_counts(texts).tolist() == [len(text.split()) for text in texts]
+    assert word_counts(pa.chunked_array([texts[:3], texts[3:]])).tolist() == [len(text.split()) for text in texts]
+
+
+@pytest.mark.parametrize("threshold", [1.5, 2.0, 3.0])
+def test_length_ratio_mask_matches_the_python_loop(threshold):
+    rng = random.Random(threshold)
+    sources = [" ".join(["w"] * rng.randint(0, 9)) for _ in range(2000)]
+    targets = [" ".join(["v"] * rng.randint(0, 9)) for _ in range(2000)]
+    assert DataLoader.length_ratio_mask(sources, targets, threshold) == python_ratio_mask(sources, targets, threshold)
+
+
+def test_all_criteria_in_one_pass():
+    sources = ["a b c", "", "a b c d e f g h", "a", "a b c d e f g", "a b"]
+    targets = ["x y z", "x", "x y", "x", "x y z u v w s", "x y"]
+    length_filter = LengthFilter(ratio=2.0, min_length=2, max_length=6)
+    assert length_filter.mask(sources, targets).tolist() == [True, False, False, False, False, True]
+    assert length_filter.dropped == {"empty": 1, "ratio": 1, "min_length": 1, "max_length": 1, "truncated": 0}
+    assert "max_length 1" in length_filter.report()
+
+
+def test_token_lengths_and_truncation_limit():
+    counter = TokenCounter(CharTokenizer())
+    # Agglutinative words count as several tokens
+    sources = ["i am going to the shop", "i am going home now", "hi"]
+    targets = ["ndiri kuenda kushopu", "ndiri kuenda kumba zvino", "mhoroi shamwari yangu yakanaka"]
+    assert counter.counts(targets).tolist() == [10, 12, 14]
+    assert LengthFilter(unit="words").mask(sources, targets).tolist() == [False, True, False]
+    assert LengthFilter(unit="tokens", token_counter=counter).mask(sources, targets).tolist() == [True, True, False]
+
+    # 10 content tokens + 2 special tokens fit 12 but not 11
+    truncating = LengthFilter(ratio=None, max_tokens=12, token_counter=counter)
+    assert truncating.mask(sources, targets).tolist() == [True, False, False]
+    assert truncating.dropped["truncated"] == 2
+    assert counter.special_tokens == 2
+    assert LengthFilter(ratio=None, max_tokens=11, token_counter=counter).mask(sources, targets).tolist() == [False, False, False]
+    with pytest.raises(ValueError):
+        LengthFilter(unit="tokens")
+
+
+def test_token_counts_are_batched_and_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.length_filter.TOKENIZE_BATCH", 4)
+    tokenizer = CharTokenizer()
+    counter = TokenCounter(tokenizer, cache_dir=str(tmp_path))
+    texts = pa.array([f"mashoko {i}" for i in range(10)])
+    first = counter.counts(texts)
+    assert tokenizer.calls == 3
+    assert np.array_equal(counter.counts(texts), first)
+    assert tokenizer.calls == 3 and counter.hits == 1
+    # A different tokenizer does not reuse the counts
+    other = TokenCounter(CharTokenizer(), cache_dir=str(tmp_path), name="other")
+    other.counts(texts)
+    assert other.misses == 1
@@ -0,0 +1,45 @@
+from src.metrics import MetricsRegistry
+
+
+def test_prometheus_exposition_format():
+    registry = MetricsRegistry()
+    registry.counter("requests_total").inc(3)
+    registry.gauge("queue_depth").set(2)
+    latency = registry.histogram("latency_seconds", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+
+    text = registry.to_prometheus()
+    assert "# TYPE zimlingua_requests_total counter\nzimlingua_requests_total 3\n" in text
+    assert "# TYPE zimlingua_queue_depth gauge" in text
+    # Buckets are cumulative and end with +Inf == count
+    assert 'zimlingua_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'zimlingua_latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'zimlingua_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "zimlingua_latency_seconds_count 3" in text
+
+
+def test_histogram_timer_records_duration():
+    registry = MetricsRegistry()
+    with registry.histogram("stage_seconds").time():
+        pass
+    snapshot = registry.snapshot()["stage_seconds"]
+    assert snapshot["count"] == 1
+    assert snapshot["sum"] >= 0
+
+
+def test_translator_records_stage_metrics(translator):
+    translator.translate_batch(["a b c", "d"], "eng_Latn", "sna_Latn")
+    translator.translate_batch(["a b c", "e"], "eng_Latn", "sna_Latn")
+
+    snapshot = translator.metrics.snapshot()
+    for stage in ("tokenize_seconds", "infer_seconds", "detokenize_seconds"):
+        assert snapshot[stage]["count"] == 2
+    # Second call only translates "e"
+    assert snapshot["batch_sentences"]["sum"] == 3
+    # [lang] a b c </s> + [lang] d </s> + [lang] e </s>
+    assert snapshot["batch_source_tokens"]["sum"] == 11
+    assert snapshot["translation_memory_hits_total"] == 1
+    assert snapshot["translation_memory_misses_total"] == 3
+    assert snapshot["translation_memory_hit_rate"] == 0.25
+    assert "model_load_seconds" in snapshot
@@ -0,0 +1,44 @@
+import pytest
+
+def test_translate_mixed_tags_each_item(translator):
+    results = translator.translate_mixed(
+        ["a", "b c"], source_langs=["eng_Latn", "sna_Latn"], target_langs=["sna_Latn", "eng_Latn"]
+    )
+    assert results == ["A", "B C"]
+
+    call = translator.translator.translate_batch.call_args
+    assert translator.translator.translate_batch.call_count == 1
+    assert sorted(zip(map(tuple, call.args[0]), map(tuple, call.kwargs["target_prefix"]))) == [
+        (("eng_Latn", "a", "</s>"), ("sna_Latn",)),
+        (("sna_Latn", "b", "c", "</s>"), ("eng_Latn",)),
+    ]
+
+def test_tokenizer_state_not_mutated(translator):
+    translator.tokenizer.src_lang = "eng_Latn"
+    translator.translate_batch(["a"], source_lang="sna_Latn", target_lang="eng_Latn")
+    assert translator.tokenizer.src_lang == "eng_Latn"
+
+def test_multi_target_tokenizes_source_once(translator):
+    results = translator.translate_multi_target(["a b", "c"], "eng_Latn", ["sna_Latn", "nde_Latn"])
+    assert results == {"sna_Latn": ["A B", "C"], "nde_Latn": ["A B", "C"]}
+
+    assert translator.tokenizer.tokenize.call_count == 2
+    call = translator.translator.translate_batch.call_args
+    assert translator.translator.translate_batch.call_count == 1
+    assert len(call.args[0]) == 4
+
+def test_mixed_length_mismatch(translator):
+    with pytest.raises(ValueError):
+        translator.translate_mixed(["a"], ["eng_Latn"], [])
+
+def test_submit_from_thread_pool(translator):
+    futures = [translator.submit([f"w{i}"], "eng_Latn", "sna_Latn") for i in range(8)]
+    assert [f.result()[0] for f in futures] == [f"W{i}" for i in range(8)]
+    translator.close()
+
+def test_engine_threads_from_config(translator):
+    from src.translator import ctranslate2
+    ctranslate2.Translator.assert_called_with(
+        "dummy_path", device=translator.device, compute_type=translator.compute_type,
+        inter_threads=translator.inter_threads, intra_threads=translator.intra_threads
+    )
@@ -0,0 +1,103 @@
+import io
+import pytest
+from src.prefilter import LanguageIdentifier, Prefilter, SEED_TEXT
+from src.streaming import StreamingFileTranslator
+
+LANGUAGES = {"en": "eng_Latn", "sn": "sna_Latn", "nd": "nde_Latn"}
+
+
+@pytest.fixture
+def prefilter():
+    return Prefilter(LANGUAGES)
+
+
+@pytest.mark.parametrize("text, reason", [
+    ("   ", "empty"),
+    ("12,500.00", "number"),
+    ("2024-01-31 14:00", "number"),
+    ("https://example.com/a?b=c", "url"),
+    ("www.zimlingua.org", "url"),
+    ("info@example.co.zw", "email"),
+    ("`pip install zimlingua`", "code"),
+    ("src/translator.py", "code"),
+    ("getLanguageCode()", "code"),
+    ("def translate(text):", "code"),
+    ("snake_case_name", "code"),
+    ("std::vector", "code"),
+    ("Hello World", None),
+    ("muHarare", None),
+    ("kuZimbabwe", None),
+    ("ngoMvulo", None),
+    ("eBulawayo", None),
+    ("neChishanu", None),
+    ("and/or", None),
+    ("(Yes)", None),
+    ("iPhone", None),
+    ("McDonald", None),
+    ("Ndatenda", None),
+])
+def test_classify_rules(prefilter, text, reason):
+    assert prefilter.classify(text, "eng_Latn", "sna_Latn") == reason
+
+
+def test_language_identifier_separates_en_sn_nd():
+    identifier = LanguageIdentifier.train(SEED_TEXT)
+    assert identifier.detect("The meeting has been moved to next Tuesday morning.")[0] == "en"
+    assert identifier.detect("Ndinoda kuenda kumusha kunoona vabereki vangu.")[0] == "sn"
+    assert identifier.detect("Ngifuna ukuya ekhaya ukuyabona abazali bami.")[0] == "nd"
+
+
+def test_text_already_in_target_language(prefilter):
+    shona = "Ndinoda kuenda kumusha kunoona vabereki vangu."
+    # Off by default
+    assert prefilter.classify(shona, "eng_Latn", "sna_Latn") is None
+    language_skip = Prefilter(LANGUAGES, skip_target_language=True)
+    assert language_skip.classify(shona, "eng_Latn", "sna_Latn") == "target_language"
+    assert language_skip.classify("Ngifuna ukuya ekhaya ukuyabona abazali bami.", "eng_Latn", "nde_Latn") == "target_language"
+    assert language_skip.classify(shona, "sna_Latn", "eng_Latn") is None
+    # Too short to identify reliably
+    assert language_skip.classify("Mhoro", "eng_Latn", "sna_Latn") is None
+
+
+@pytest.mark.parametrize("text, target_lang", [
+    ("Mai Chipo and Baba Tendai went to Masvingo.", "sna_Latn"),
+    ("Chipo said that Tendai and Farai are going to Harare tomorrow.", "sna_Latn"),
+    ("Ngiyabonga means thank you in Ndebele.", "nde_Latn"),
+    ("Ubuntu, Umhlaba and Inkosi are Zulu words.", "nde_Latn"),
+    ("We visited Bulawayo, Gwanda and Nkayi last week.", "nde_Latn"),
+])
+def test_english_with_local_names_and_loanwords_is_translated(text, target_lang):
+    assert Prefilter(LANGUAGES, skip_target_language=True).classify(text, "eng_Latn", target_lang) is None
+
+
+def test_identifier_trains_from_files(tmp_path):
+    paths = {}
+    for lang, texts in SEED_TEXT.items():
+        paths[lang] = tmp_path / f"heldout.{lang}"
+        paths[lang].write_text("\n".join(texts) + "\n\n", encoding="utf-8")
+    identifier = LanguageIdentifier.from_files(paths)
+    assert identifier.log_probs == LanguageIdentifier.train(SEED_TEXT).log_probs
+    assert len(LanguageIdentifier.from_files(paths, max_lines=2).log_probs["en"]) < len(identifier.log_probs["en"])
+
+
+def test_passthrough_skips_the_model(translator):
+    translator.prefilter.skip_target_language = True
+    texts = ["a b", "https://example.com", "42", "Ndinoda kuenda kumusha kunoona vabereki vangu."]
+    assert translator.translate_batch(texts, "eng_Latn", "sna_Latn") == ["A B"] + texts[1:]
+
+    sent = [tokens for call in translator.translator.translate_batch.call_args_list for tokens in call.args[0]]
+    assert sent == [["eng_Latn", "a", "b", "</s>"]]
+    counters = translator.metrics.snapshot()
+    assert counters["prefilter_passthrough_total"] == 3
+    assert counters["prefilter_url_total"] == 1
+    assert counters["prefilter_target_language_total"] == 1
+
+
+def test_stream_reports_avoided_model_calls(translator):
+    source = io.BytesIO(b"a b\n\n12\nwww.example.com\nc\n")
+    out = io.BytesIO()
+    stats = StreamingFileTranslator(translator, "eng_Latn", "sna_Latn", chunk_lines=2).translate_stream(source, out)
+
+    assert out.getvalue() == b"A B\n\n12\nwww.example.com\nC\n"
+    assert stats.skipped == 3
+    assert "3 lines passed through" in stats.summary()
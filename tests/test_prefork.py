@@ -0,0 +1,117 @@
+import itertools
+import os
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+from multiprocessing import Pipe
+from unittest.mock import MagicMock
+from src.prefork import EngineHost, PreforkServer, RemoteEngine, memory_report, memory_usage
+
+
+def connect(engine):
+    host_end, worker_end = Pipe()
+    EngineHost(engine, [host_end], max_parallel=2).start()
+    return RemoteEngine(worker_end)
+
+
+def test_memory_usage_splits_unique_and_shared():
+    usage = memory_usage()
+    if not usage:
+        pytest.skip("needs /proc/<pid>/smaps_rollup")
+    assert usage["rss"] == pytest.approx(usage["unique"] + usage["shared"], rel=0.05)
+    assert usage["unique"] <= usage["pss"] <= usage["rss"]
+    assert f"pid {os.getpid()}" in memory_report({"engine": os.getpid()})
+
+
+def test_translator_runs_on_remote_engine(translator):
+    # The worker side of a pre-fork server: same Translator, engine in another process
+    engine = translator.translator
+    translator.translator = connect(engine)
+    assert translator.translate_batch(["a b", "c"], "eng_Latn", "sna_Latn", profile="fast") == ["A B", "C"]
+    assert engine.translate_batch.call_args.kwargs["beam_size"] == 1
+
+
+def test_engine_errors_reach_the_worker():
+    engine = MagicMock()
+    engine.translate_batch.side_effect = RuntimeError("out of memory")
+    remote = connect(engine)
+    results = remote.translate_batch([["a"]], target_prefix=[["sna_Latn"]], asynchronous=True)
+    with pytest.raises(RuntimeError, match="out of memory"):
+        results[0].result()
+
+
+def test_translator_streams_through_remote_engine(translator):
+    engine = translator.translator
+    translator.translator = connect(engine)
+    assert "".join(translator.translate_stream("a b c", "eng_Latn", "sna_Latn")) == "A B C"
+    assert engine.generate_tokens.call_args.kwargs["sampling_topk"] == 1
+
+
+def test_abandoned_remote_stream_is_cancelled():
+    produced = itertools.count()
+    engine = MagicMock()
+
+    def endless(source, target_prefix=None, **options):
+        for i in itertools.count():
+            next(produced)
+            time.sleep(0.001)
+            yield SimpleNamespace(step=i, token_id=i, token=str(i), is_last=False)
+
+    engine.generate_tokens.side_effect = endless
+    stream = connect(engine).generate_tokens(["a"], target_prefix=["sna_Latn"])
+    assert [next(stream).token_id for _ in range(3)] == [0, 1, 2]
+    stream.close()
+    time.sleep(0.2)
+    stopped_at = next(produced)
+    time.sleep(0.2)
+    assert next(produced) == stopped_at + 1
+
+
+def test_remote_stream_errors_reach_the_worker():
+    engine = MagicMock()
+    engine.generate_tokens.side_effect = RuntimeError("bad input")
+    with pytest.raises(RuntimeError, match="bad input"):
+        list(connect(engine).generate_tokens(["a"]))
+
+
+def test_engine_swap_waits_for_running_calls():
+    release = threading.Event()
+    old, new = MagicMock(name="old"), MagicMock(name="new")
+    old.translate_batch.side_effect = lambda source, **kwargs: release.wait() and [SimpleNamespace(hypotheses=[["x"]])]
+    new.translate_batch.return_value = [SimpleNamespace(hypotheses=[["y"]])]
+    host_end, worker_end = Pipe()
+    host = EngineHost(old, [host_end], max_parallel=2)
+    host.start()
+    remote = RemoteEngine(worker_end)
+
+    running = remote.translate_batch([["a"]], asynchronous=True)
+    time.sleep(0.1)
+    try:
+        host.swap(new)
+        assert remote.translate_batch([["b"]])[0].hypotheses == [["y"]]
+        old.unload_model.assert_not_called()
+    finally:
+        release.set()
+    assert running[0].result().hypotheses == [["x"]]
+    time.sleep(0.1)
+    old.unload_model.assert_called_once()
+
+
+def test_sighup_reload_swaps_the_engine_and_tells_the_workers(monkeypatch):
+    translator = MagicMock(load_engine=False)
+    server = PreforkServer(translator, workers=2)
+    server.engine_host = MagicMock()
+    server.pids = {"engine": os.getpid(), "worker-1": 101, "worker-2": 102}
+    signalled = []
+    monkeypatch.setattr("src.prefork.os.kill", lambda pid, sig: signalled.append((pid, sig)))
+
+    server.reload()
+    translator.reload.assert_called_once()
+    server.engine_host.swap.assert_called_once_with(translator.create_engine.return_value)
+    assert [pid for pid, _ in signalled] == [101, 102]
+
+    # A model that fails to load is not swapped in
+    translator.reload.side_effect = FileNotFoundError("missing")
+    server.reload()
+    assert server.engine_host.swap.call_count == 1
@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from src.profiles import DecodingProfile, load_profiles
+from src.server import MicroBatcher
+
+
+def test_decoding_length_follows_source_length():
+    profile = DecodingProfile("fast", beam_size=1, max_decoding_length=50, max_decoding_ratio=1.5, max_decoding_extra=10)
+    assert profile.decoding_length(4) == 16
+    assert profile.decoding_length(100) == 50
+    assert profile.with_beam_size(4).beam_size == 4
+    assert profile.with_beam_size(None) is profile
+
+
+def test_unknown_profile_option_rejected():
+    class Config:
+        def get(self, key, default=None):
+            return {"decoding.profiles": {"fast": {"beam": 1}}}.get(key, default)
+
+    with pytest.raises(ValueError, match="beam"):
+        load_profiles(Config())
+
+
+def test_profile_options_reach_the_engine(translator):
+    translator.translate_batch(["a b", "c d e f g h"], "eng_Latn", "sna_Latn", profile="fast")
+    calls = translator.translator.translate_batch.call_args_list
+    fast = translator.profiles["fast"]
+    for call in calls:
+        longest = max(len(tokens) for tokens in call.args[0])
+        assert call.kwargs["beam_size"] == 1
+        assert call.kwargs["max_decoding_length"] == fast.decoding_length(longest)
+        assert call.kwargs["repetition_penalty"] == fast.repetition_penalty
+        assert call.kwargs["no_repeat_ngram_size"] == fast.no_repeat_ngram_size
+        assert call.kwargs["max_input_length"] == fast.max_input_length
+
+
+def test_profiles_have_separate_translation_memory(translator):
+    translator.translate_batch(["a b"], "eng_Latn", "sna_Latn", profile="fast")
+    translator.translate_batch(["a b"], "eng_Latn", "sna_Latn", profile="quality")
+    translator.translate_batch(["a b"], "eng_Latn", "sna_Latn", profile="fast")
+    beams = [call.kwargs["beam_size"] for call in translator.translator.translate_batch.call_args_list]
+    assert beams == [1, translator.profiles["quality"].beam_size]
+
+
+def test_unknown_profile_raises(translator):
+    with pytest.raises(ValueError, match="Unknown decoding profile"):
+        translator.translate_batch(["a"], "eng_Latn", "sna_Latn", profile="turbo")
+
+
+def test_stream_uses_profile_bounds(translator):
+    "".join(translator.translate_stream("a b c", "eng_Latn", "sna_Latn", profile="fast"))
+    kwargs = translator.translator.generate_tokens.call_args.kwargs
+    assert kwargs["max_decoding_length"] == translator.profiles["fast"].decoding_length(5)
+    assert kwargs["repetition_penalty"] == translator.profiles["fast"].repetition_penalty
+
+
+def test_micro_batch_splits_engine_calls_by_profile(translator):
+    async def run():
+        batcher = MicroBatcher(translator, max_wait_ms=50)
+        await batcher.start()
+        try:
+            return await asyncio.gather(
+                batcher.translate(["a"], "eng_Latn", "sna_Latn", profile="fast"),
+                batcher.translate(["b"], "eng_Latn", "sna_Latn", profile="quality"),
+            )
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(run()) == [["A"], ["B"]]
+    beams = sorted(call.kwargs["beam_size"] for call in translator.translator.translate_batch.call_args_list)
+    assert beams == sorted([1, translator.profiles["quality"].beam_size])
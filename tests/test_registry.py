@@ -0,0 +1,83 @@
+import pytest
+from unittest.mock import MagicMock
+from src.registry import ModelRegistry, ModelSpec, domain_options
+
+LANGUAGES = {"en": "eng_Latn", "sn": "sna_Latn", "nd": "nde_Latn"}
+
+
+def make_registry(memory_budget_mb=None):
+    specs = [
+        ModelSpec.from_dict("base", {"path": "base", "memory_mb": 100}, LANGUAGES),
+        ModelSpec.from_dict("en-sn", {"path": "en_sn", "directions": ["en-sn"], "memory_mb": 100}, LANGUAGES),
+        ModelSpec.from_dict("health", {"path": "health", "domain": "health", "directions": ["en-sn", "en-nd"],
+                                       "memory_mb": 100}, LANGUAGES),
+    ]
+    loaded = []
+
+    def loader(spec, metrics):
+        model = MagicMock(name=spec.name)
+        model.translate_mixed.side_effect = lambda texts, srcs, tgts, **kwargs: [f"{spec.name}:{t}" for t in texts]
+        model.translate_batch.side_effect = lambda texts, src, tgt, **kwargs: [f"{spec.name}:{t}" for t in texts]
+        loaded.append(spec.name)
+        return model
+
+    return ModelRegistry(specs, memory_budget_mb=memory_budget_mb, loader=loader), loaded
+
+
+def test_route_prefers_most_specific_model():
+    registry, _ = make_registry()
+    assert registry.route("eng_Latn", "sna_Latn").name == "en-sn"
+    assert registry.route("eng_Latn", "nde_Latn").name == "base"
+    assert registry.route("eng_Latn", "nde_Latn", domain="health").name == "health"
+    # No health model for sn->en: the general models still serve it
+    assert registry.route("sna_Latn", "eng_Latn", domain="health").name == "base"
+
+
+def test_route_without_catch_all_raises():
+    registry = ModelRegistry([ModelSpec.from_dict("en-sn", {"path": "x", "directions": ["en-sn"]}, LANGUAGES)])
+    with pytest.raises(ValueError, match="No model"):
+        registry.route("eng_Latn", "nde_Latn")
+
+
+def test_models_load_once_on_first_use():
+    registry, loaded = make_registry()
+    assert loaded == []
+    registry.translate_batch(["a"], "eng_Latn", "sna_Latn")
+    registry.translate_batch(["b"], "eng_Latn", "sna_Latn")
+    assert loaded == ["en-sn"]
+    assert registry.metrics.snapshot()["model_loads_total"] == 1
+
+
+def test_least_recently_used_model_is_evicted():
+    registry, loaded = make_registry(memory_budget_mb=250)
+    registry.translate_batch(["a"], "eng_Latn", "sna_Latn")
+    registry.translate_batch(["a"], "eng_Latn", "nde_Latn")
+    registry.translate_batch(["a"], "eng_Latn", "sna_Latn")
+    registry.translate_batch(["a"], "eng_Latn", "nde_Latn", domain="health")
+
+    assert [model["name"] for model in registry.resident()] == ["en-sn", "health"]
+    assert registry.metrics.snapshot()["model_evictions_total"] == 1
+    assert registry.resident_bytes() <= registry.memory_budget
+
+
+def test_model_in_use_is_not_evicted():
+    registry, _ = make_registry(memory_budget_mb=150)
+    with registry.acquire("eng_Latn", "sna_Latn") as model:
+        # Over budget while both run; the idle one goes as soon as its request finishes
+        registry.translate_batch(["a"], "eng_Latn", "nde_Latn")
+        assert [entry["name"] for entry in registry.resident()] == ["en-sn"]
+    model.unload.assert_not_called()
+    registry.translate_batch(["a"], "eng_Latn", "nde_Latn")
+    model.unload.assert_called_once()
+
+
+def test_mixed_batch_is_split_by_model():
+    registry, _ = make_registry()
+    results = registry.translate_mixed(["a", "b", "c"], ["eng_Latn"] * 3, ["sna_Latn", "nde_Latn", "sna_Latn"])
+    assert results == ["en-sn:a", "base:b", "en-sn:c"]
+
+
+def test_domain_needs_registry(translator):
+    assert domain_options(translator, None) == {}
+    with pytest.raises(ValueError, match="models.registry"):
+        domain_options(translator, "health")
@@ -0,0 +1,102 @@
+import os
+import threading
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+import src.translator as translator_module
+from src.artifact import MANIFEST_NAME
+from src.reloader import ModelReloader
+
+
+def reload_with_new_engine(translator):
+    old = translator.translator
+    new = MagicMock(name="new engine")
+    new.translate_batch.side_effect = old.translate_batch.side_effect
+    translator_module.ctranslate2.Translator.return_value = new
+    with patch('src.translator.Path.exists', return_value=True):
+        translator.reload()
+    return old, new
+
+
+def test_reload_waits_for_in_flight_requests(translator):
+    with translator.pinned():
+        old, new = reload_with_new_engine(translator)
+        # The request that started on the old model finishes on it
+        assert translator.translator is old
+        assert translator.translate_batch(["a b"], "eng_Latn", "sna_Latn") == ["A B"]
+        old.unload_model.assert_not_called()
+
+    old.unload_model.assert_called_once()
+    assert translator.translator is new
+    assert translator.translate_batch(["c"], "eng_Latn", "sna_Latn") == ["C"]
+    new.translate_batch.assert_called_once()
+    assert translator.metrics.snapshot()["model_reloads_total"] == 1
+
+
+def test_failed_reload_keeps_current_model(translator):
+    engine = translator.translator
+    with pytest.raises(FileNotFoundError):
+        translator.reload("missing_model")
+    assert translator.translator is engine
+    assert translator.model_path == "dummy_path"
+    assert translator.translate_batch(["a"], "eng_Latn", "sna_Latn") == ["A"]
+
+
+def test_reload_can_keep_a_shared_engine(translator):
+    # A pre-fork worker reloads its tokenizer and model id but keeps its engine connection
+    engine = translator.translator
+    translator.load_engine = False
+    with patch('src.translator.Path.exists', return_value=True):
+        translator.reload(engine=engine)
+    assert translator.translator is engine
+    engine.unload_model.assert_not_called()
+    assert translator.translate_batch(["a"], "eng_Latn", "sna_Latn") == ["A"]
+
+
+def test_stream_finishes_on_the_model_it_started_on(translator):
+    stream = translator.translate_stream("a b c", "eng_Latn", "sna_Latn")
+    first = next(stream)
+    old, _ = reload_with_new_engine(translator)
+    assert first + "".join(stream) == "A B C"
+    old.unload_model.assert_called_once()
+
+
+def test_reloader_waits_for_artifact_to_settle(tmp_path):
+    manifest = tmp_path / MANIFEST_NAME
+    manifest.write_text("{}")
+    model = SimpleNamespace(model_path=str(tmp_path), reload=MagicMock())
+    reloader = ModelReloader(model, watch=True, interval=0.01)
+    assert reloader.check() == 0
+
+    manifest.write_text('{"model_sha256": "new"}')
+    os.utime(manifest, ns=(1, 1))
+    assert reloader.check() == 0
+    assert reloader.check() == 1
+    assert reloader.check() == 0
+    model.reload.assert_called_once()
+
+    assert reloader.check(force=True) == 1
+
+
+def test_reloader_ignores_artifacts_without_a_manifest(tmp_path):
+    # convert_model.py clears the directory and writes model.bin long before the manifest
+    (tmp_path / "model.bin").write_bytes(b"old")
+    model = SimpleNamespace(model_path=str(tmp_path), reload=MagicMock())
+    reloader = ModelReloader(model, watch=True, interval=0.01)
+    (tmp_path / "model.bin").write_bytes(b"half written")
+    os.utime(tmp_path / "model.bin", ns=(1, 1))
+    assert reloader.check() == 0 and reloader.check() == 0
+    model.reload.assert_not_called()
+
+    (tmp_path / MANIFEST_NAME).write_text('{"model_sha256": "new"}')
+    assert reloader.check() == 0
+    assert reloader.check() == 1
+
+
+def test_reloader_reacts_to_request(tmp_path):
+    reloaded = threading.Event()
+    model = SimpleNamespace(model_path=str(tmp_path), reload=reloaded.set)
+    reloader = ModelReloader(model).start()
+    reloader.request_reload()
+    assert reloaded.wait(5)
+    reloader.stop()
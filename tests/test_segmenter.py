@@ -0,0 +1,42 @@
+from src.segmenter import split_segments, split_long_segment
+
+def reassemble(leading, segments):
+    return leading + "".join(sentence + gap for sentence, gap in segments)
+
+def test_sentences_and_paragraphs_round_trip():
+    text = "  Mhoro. Makadini here? Ndiri kufara!\n\nSawubona. Unjani?\nKuhle.\n"
+    leading, segments = split_segments(text)
+    assert [sentence for sentence, _ in segments] == [
+        "Mhoro.", "Makadini here?", "Ndiri kufara!", "Sawubona.", "Unjani?", "Kuhle."
+    ]
+    assert segments[2][1] == "\n\n"
+    assert reassemble(leading, segments) == text
+
+def test_abbreviations_initials_and_decimals_do_not_split():
+    _, segments = split_segments("Dr. Ncube met J. Moyo at 3.5 km, e.g. near the river. Then he left.")
+    assert [sentence for sentence, _ in segments] == [
+        "Dr. Ncube met J. Moyo at 3.5 km, e.g. near the river.", "Then he left."
+    ]
+
+def test_lowercase_continuation_does_not_split():
+    _, segments = split_segments("Ndiri kuenda... ndichadzoka mangwana.")
+    assert len(segments) == 1
+
+def test_long_segment_prefers_clause_breaks():
+    text = "one two three, four five six seven eight"
+    count_words = lambda words: [1] * len(words)
+    assert split_long_segment(text, count_words, 5) == ["one two three,", "four five six seven eight"]
+    assert split_long_segment(text, count_words, 100) == [text]
+    assert all(len(piece.split()) <= 3 for piece in split_long_segment(text, count_words, 3))
+
+def test_translate_document_keeps_structure(translator):
+    text = "Hello world. Good morning!\n\nThank you."
+    assert translator.translate_document(text, "eng_Latn", "sna_Latn") == "HELLO WORLD. GOOD MORNING!\n\nTHANK YOU."
+    assert translator.translator.translate_batch.call_count == 1
+
+def test_translate_document_splits_overlong_sentences(translator):
+    translator.max_input_length = 6
+    translator.translate_document("a b c d e f g h i j", "eng_Latn", "sna_Latn")
+    sources = translator.translator.translate_batch.call_args.args[0]
+    assert all(len(tokens) <= 6 for tokens in sources)
+    assert sum(len(tokens) - 2 for tokens in sources) == 10
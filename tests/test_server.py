@@ -0,0 +1,116 @@
+import asyncio
+import json
+from src.server import MicroBatcher, TranslationServer
+
+def test_concurrent_requests_share_a_batch(translator):
+    async def run():
+        batcher = MicroBatcher(translator, max_wait_ms=50, max_batch_tokens=1000)
+        await batcher.start()
+        try:
+            return await asyncio.gather(*(
+                batcher.translate([f"w{i}"], "eng_Latn", "sna_Latn") for i in range(20)
+            ))
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+    assert [r[0] for r in results] == [f"W{i}" for i in range(20)]
+    assert translator.translator.translate_batch.call_count == 1
+
+def test_token_budget_splits_batches(translator):
+    async def run():
+        batcher = MicroBatcher(translator, max_wait_ms=50, max_batch_tokens=6)
+        await batcher.start()
+        try:
+            await batcher.translate(["a b", "c d", "e f"], "eng_Latn", "sna_Latn")
+            return batcher.metrics.snapshot()
+        finally:
+            await batcher.stop()
+
+    snapshot = asyncio.run(run())
+    # Each sentence is estimated at 4 tokens, so only one fits per batch
+    assert translator.translator.translate_batch.call_count == 3
+    assert snapshot["batch_size"]["count"] == 3
+    assert snapshot["request_latency_seconds"]["p99"] is not None
+
+def test_http_translate_and_metrics(translator):
+    async def request(port, method, path, payload=None, as_json=True):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps(payload).encode() if payload is not None else b""
+        writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        raw = await reader.read()
+        writer.close()
+        head, _, data = raw.partition(b"\r\n\r\n")
+        return head.split(b" ")[1].decode(), json.loads(data) if as_json else (head.decode(), data.decode())
+
+    async def run():
+        server = TranslationServer(translator, port=0, max_wait_ms=5)
+        await server.start()
+        try:
+            single = await request(server.port, "POST", "/translate", {"text": "a b", "src": "en", "tgt": "sn"})
+            many = await request(server.port, "POST", "/translate", {"texts": ["c", "d"]})
+            bad = await request(server.port, "POST", "/translate", {"texts": "c"})
+            metrics = await request(server.port, "GET", "/metrics")
+            prometheus = await request(server.port, "GET", "/metrics?format=prometheus", as_json=False)
+            return single, many, bad, metrics, prometheus
+        finally:
+            await server.stop()
+
+    single, many, bad, metrics, prometheus = asyncio.run(run())
+    assert single == ("200", {"translation": "A B"})
+    assert many == ("200", {"translations": ["C", "D"]})
+    assert bad[0] == "400"
+    assert metrics[1]["requests_total"] == 3
+    # Stage timings come from the translator's registry
+    assert metrics[1]["tokenize_seconds"]["count"] >= 1
+
+    head, text = prometheus[1]
+    assert "text/plain" in head
+    assert "zimlingua_requests_total 3" in text
+    assert 'zimlingua_infer_seconds_bucket{le="+Inf"}' in text
+
+def test_mixed_directions_share_one_engine_call(translator):
+    async def run():
+        batcher = MicroBatcher(translator, max_wait_ms=50)
+        await batcher.start()
+        try:
+            return await asyncio.gather(
+                batcher.translate(["a"], "eng_Latn", "sna_Latn"),
+                batcher.translate(["b"], "sna_Latn", "eng_Latn"),
+                batcher.translate(["c"], "eng_Latn", "nde_Latn"),
+            )
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(run()) == [["A"], ["B"], ["C"]]
+    call = translator.translator.translate_batch.call_args
+    assert translator.translator.translate_batch.call_count == 1
+    assert sorted(call.kwargs["target_prefix"]) == [["eng_Latn"], ["nde_Latn"], ["sna_Latn"]]
+
+def test_parallel_batches_with_inter_threads(translator):
+    translator.inter_threads = 2
+    engine = translator.translator.translate_batch
+    fake = engine.side_effect
+    active, peak = [0], [0]
+
+    def slow_translate(*args, **kwargs):
+        import time
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        active[0] -= 1
+        return fake(*args, **kwargs)
+
+    engine.side_effect = slow_translate
+
+    async def run():
+        batcher = MicroBatcher(translator, max_wait_ms=1, max_batch_tokens=3)
+        await batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.translate([f"w{i}"], "eng_Latn", "sna_Latn") for i in range(4)))
+        finally:
+            await batcher.stop()
+
+    assert [r[0] for r in asyncio.run(run())] == ["W0", "W1", "W2", "W3"]
+    assert peak[0] == 2
@@ -0,0 +1,36 @@
+def test_translate_stream_yields_incrementally(translator):
+    chunks = list(translator.translate_stream("a b c", "eng_Latn", "sna_Latn"))
+    assert "".join(chunks) == "A B C"
+    assert len(chunks) > 1
+
+    kwargs = translator.translator.generate_tokens.call_args.kwargs
+    assert kwargs["sampling_topk"] == 1
+    assert kwargs["target_prefix"] == ["sna_Latn"]
+
+def test_translate_stream_keeps_document_layout(translator):
+    text = "Mhoro. Makadini?\n\nSawubona."
+    streamed = "".join(translator.translate_stream(text, "eng_Latn", "sna_Latn"))
+    assert streamed == "MHORO. MAKADINI?\n\nSAWUBONA."
+
+def test_translate_stream_uses_translation_memory(translator):
+    "".join(translator.translate_stream("a b", "eng_Latn", "sna_Latn"))
+    chunks = list(translator.translate_stream("a b", "eng_Latn", "sna_Latn"))
+    assert chunks == ["A B"]
+    assert translator.translator.generate_tokens.call_count == 1
+
+def test_translate_stream_holds_back_partial_characters(translator):
+    # "<" and ">" stand for the two byte tokens of "é": alone, "<" decodes as U+FFFD
+    translator.tokenizer.decode.side_effect = lambda ids, skip_special_tokens=True: (
+        "".join(ids).replace("<>", "é").replace("<", "�")
+    )
+    chunks = list(translator.translate_stream("ca < > b", "eng_Latn", "sna_Latn"))
+    assert chunks == ["ca", "é", "b"]
+    # Translation memory holds the same final text
+    assert list(translator.translate_stream("ca < > b", "eng_Latn", "sna_Latn")) == ["caéb"]
+
+def test_translate_stream_sends_the_corrected_remainder(translator):
+    # "ab" decodes as "X" once "b" arrives, rewriting the "a" already sent
+    translator.tokenizer.decode.side_effect = lambda ids, skip_special_tokens=True: "".join(ids).replace("ab", "X")
+    chunks = list(translator.translate_stream("a b c", "eng_Latn", "sna_Latn"))
+    assert chunks == ["a", "Xc"]
+    assert list(translator.translate_stream("a b c", "eng_Latn", "sna_Latn")) == ["Xc"]
@@ -0,0 +1,101 @@
+import gzip
+import io
+import threading
+import pytest
+from pathlib import Path
+from src.streaming import StreamingFileTranslator, default_output_path, open_binary
+from src.journal import JobJournal
+
+def test_default_output_path_keeps_compression_suffix():
+    assert default_output_path("docs/a.txt") == Path("docs/a_translated.txt")
+    assert default_output_path("docs/a.txt.gz") == Path("docs/a_translated.txt.gz")
+
+def test_stream_keeps_line_alignment(translator):
+    source = io.BytesIO(b"a b\n\nc\n   \na b\nd")
+    out = io.BytesIO()
+    pipeline = StreamingFileTranslator(translator, "eng_Latn", "sna_Latn", chunk_lines=2, queue_size=1)
+    stats = pipeline.translate_stream(source, out)
+
+    assert out.getvalue() == b"A B\n\nC\n\nA B\nD\n"
+    assert stats.lines == 6
+
+def test_gzip_roundtrip(translator, tmp_path):
+    src = tmp_path / "in.txt.gz"
+    with gzip.open(src, "wt", encoding="utf-8") as f:
+        f.write("a\nb c\n")
+
+    dst = tmp_path / "out.txt.gz"
+    StreamingFileTranslator(translator, "eng_Latn", "sna_Latn").translate_file(src, dst)
+
+    with open_binary(dst) as f:
+        assert f.read() == b"A\nB C\n"
+
+def test_stage_failure_is_raised(translator):
+    translator.translator.translate_batch.side_effect = RuntimeError("engine failure")
+    pipeline = StreamingFileTranslator(translator, "eng_Latn", "sna_Latn", chunk_lines=1, queue_size=1)
+    with pytest.raises(RuntimeError, match="engine failure"):
+        pipeline.translate_stream(io.BytesIO(b"a\nb\nc\nd\n"), io.BytesIO())
+    # The model hold is released, so a later reload can retire the model
+    assert translator._state.users == 0
+
+def test_model_is_released_when_a_stage_cannot_start(translator, monkeypatch):
+    start = threading.Thread.start
+
+    def failing_start(thread):
+        if thread.name == "infer":
+            raise RuntimeError("can't start new thread")
+        start(thread)
+
+    monkeypatch.setattr(threading.Thread, "start", failing_start)
+    pipeline = StreamingFileTranslator(translator, "eng_Latn", "sna_Latn", chunk_lines=1, queue_size=1)
+    with pytest.raises(RuntimeError, match="can't start"):
+        pipeline.translate_stream(io.BytesIO(b"a\nb\nc\nd\n" * 10), io.BytesIO())
+    assert translator._state.users == 0
+
+def test_resume_skips_committed_work(translator, tmp_path):
+    src = tmp_path / "in.txt"
+    src.write_text("a\nb\nc\nd\n", encoding="utf-8")
+    dst = tmp_path / "out.txt"
+    journal_path = JobJournal.default_path(dst)
+    job = {"input": str(src)}
+
+    # Simulate a crash after the first two lines, with a torn write after the commit
+    dst.write_bytes(b"A\nB\nC-partial")
+    JobJournal(journal_path, job).commit(input_offset=4, output_offset=4, lines_done=2)
+
+    journal = JobJournal.open(journal_path, job)
+    pipeline = StreamingFileTranslator(translator, "eng_Latn", "sna_Latn", chunk_lines=1, journal=journal)
+    pipeline.translate_file(src, dst)
+
+    assert dst.read_bytes() == b"A\nB\nC\nD\n"
+    assert translator.translator.translate_batch.call_count == 2
+    assert not journal_path.exists()
+
+def test_resume_restarts_when_the_output_is_gone(translator, tmp_path):
+    src = tmp_path / "in.txt"
+    src.write_text("a\nb\nc\nd\n", encoding="utf-8")
+    dst = tmp_path / "out.txt"
+    journal_path = JobJournal.default_path(dst)
+    job = {"input": str(src)}
+    JobJournal(journal_path, job).commit(input_offset=4, output_offset=4, lines_done=2)
+
+    journal = JobJournal.open(journal_path, job)
+    pipeline = StreamingFileTranslator(translator, "eng_Latn", "sna_Latn", chunk_lines=1, journal=journal)
+    pipeline.translate_file(src, dst)
+
+    assert dst.read_bytes() == b"A\nB\nC\nD\n"
+    assert translator.translator.translate_batch.call_count == 4
+    assert not journal_path.exists()
+
+    # An output shorter than the committed offset cannot be resumed either
+    dst.write_bytes(b"A\n")
+    journal = JobJournal(journal_path, job)
+    journal.commit(input_offset=4, output_offset=4, lines_done=2)
+    journal.check_output(dst)
+    assert not journal.resuming and not journal_path.exists()
+
+def test_journal_rejects_other_job(tmp_path):
+    path = tmp_path / "job.journal.json"
+    JobJournal(path, {"input": "a"}).commit(1, 1, 1)
+    with pytest.raises(ValueError):
+        JobJournal.open(path, {"input": "b"})
@@ -0,0 +1,56 @@
+import io
+import random
+import pytest
+
+spm = pytest.importorskip("sentencepiece")
+transformers = pytest.importorskip("transformers")
+
+WORDS = "hello world mhoro nyika sawubona umhlaba good morning mangwanani ndinoda kuti uye abantu kakhulu".split()
+
+@pytest.fixture(scope="module")
+def nllb_tokenizer(tmp_path_factory):
+    """
+    Real NllbTokenizerFast over a tiny locally trained SentencePiece model.
+    """
+    rng = random.Random(0)
+    sentences = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))) for _ in range(500)]
+    model = io.BytesIO()
+    spm.SentencePieceTrainer.train(
+        sentence_iterator=iter(sentences), model_writer=model, vocab_size=64, model_type="bpe",
+        character_coverage=1.0, bos_id=0, pad_id=1, eos_id=2, unk_id=3, minloglevel=2
+    )
+    path = tmp_path_factory.mktemp("tokenizer") / "sentencepiece.bpe.model"
+    path.write_bytes(model.getvalue())
+    slow = transformers.NllbTokenizer(vocab_file=str(path))
+    fast = transformers.NllbTokenizerFast(__slow_tokenizer=slow)
+    return fast
+
+SAMPLES = [
+    "Hello world",
+    "  mhoro   nyika, ndinoda kuti!  ",
+    "Sawubona umhlaba 123 — ü café",
+    "",
+    "good morning abantu kakhulu " * 5,
+]
+
+def test_batched_tokenize_matches_per_sentence(translator, nllb_tokenizer):
+    translator.tokenizer = nllb_tokenizer
+    assert translator._is_fast_tokenizer()
+
+    batched = translator.tokenize(SAMPLES, "eng_Latn")
+    assert "▁mhoro" in batched[1]
+    expected = [["eng_Latn"] + nllb_tokenizer.tokenize(text) + ["</s>"] for text in SAMPLES]
+    assert batched == expected
+
+def test_batched_detokenize_matches_per_sentence(translator, nllb_tokenizer):
+    translator.tokenizer = nllb_tokenizer
+    rng = random.Random(1)
+    vocab = list(nllb_tokenizer.get_vocab())
+    hypotheses = [["sna_Latn"] + [rng.choice(vocab) for _ in range(rng.randint(0, 15))] for _ in range(50)]
+    hypotheses.append(["nde_Latn", "not-a-token", "▁hello"])
+
+    expected = [
+        nllb_tokenizer.decode(nllb_tokenizer.convert_tokens_to_ids(tokens), skip_special_tokens=True)
+        for tokens in hypotheses
+    ]
+    assert translator.detokenize(hypotheses) == expected
@@ -0,0 +1,83 @@
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from src.evaluation import corpus_bleu
+from src.vocab_map import VMAP_NAME, build_vocabulary_map, read_corpus, read_source_side, write_vocabulary_map
+
+
+def test_vocabulary_map_keeps_corpus_tokens_characters_and_tags(tmp_path):
+    tokenizer = MagicMock()
+    tokenizer.tokenize.side_effect = lambda text: ["▁" + word for word in text.split()]
+    tokenizer.get_vocab.return_value = {
+        "</s>": 2, "▁mhoro": 10, "▁nyika": 11, "▁hello": 12, "▁ab": 13, "a": 14, "▁b": 15,
+        "sna_Latn": 20, "zho_Hans": 21,
+    }
+    tokenizer.all_special_tokens = ["</s>"]
+
+    corpus = tmp_path / "corpus.csv"
+    corpus.write_text("source,target\nhello,mhoro nyika\n,mhoro\n", encoding="utf-8")
+    texts = list(read_corpus([corpus]))
+    assert texts == ["hello", "mhoro nyika", "mhoro"]
+
+    candidates = build_vocabulary_map(tokenizer, texts, ["sna_Latn"], min_count=1)
+    assert candidates == {"</s>", "▁mhoro", "▁nyika", "▁hello", "a", "▁b", "sna_Latn"}
+    assert build_vocabulary_map(tokenizer, texts, [], min_count=2) == {"</s>", "▁mhoro", "a", "▁b"}
+
+    path = write_vocabulary_map(tmp_path, {"▁b", "a"})
+    assert path.read_text(encoding="utf-8") == "\ta ▁b\n"
+
+
+def test_corpus_bleu():
+    assert corpus_bleu(["the cat sat on the mat"], ["the cat sat on the mat"]) == pytest.approx(100.0)
+    assert corpus_bleu(["a b c d"], ["w x y z"]) == 0.0
+    partial = corpus_bleu(["the cat sat on a mat ."], ["the cat sat on the mat ."])
+    assert 0 < partial < 100
+    # Segments shorter than four tokens still score
+    assert corpus_bleu(["Save", "Open file"], ["Save", "Open file"]) == pytest.approx(100.0)
+    assert corpus_bleu(["a b c"], ["a b d"]) == 0.0
+    assert 0 < corpus_bleu(["a b c"], ["a b d"], smooth=True) < 100
+    assert corpus_bleu(["a b c d"], ["w x y z"], smooth=True) < 10
+
+
+def test_read_source_side(tmp_path):
+    csv = tmp_path / "corpus.csv"
+    csv.write_text("target,source\nmhoro,hello\nnyika,\n", encoding="utf-8")
+    tsv = tmp_path / "corpus.tsv"
+    tsv.write_text("good night\turare zvakanaka\n\n", encoding="utf-8")
+    assert list(read_source_side([csv, tsv])) == ["hello", "good night"]
+
+
+def test_translator_decodes_with_vmap(tmp_path):
+    from src.translator import Translator
+
+    (tmp_path / VMAP_NAME).write_text("\tsna_Latn\n", encoding="utf-8")
+    with patch('src.translator.ctranslate2.Translator') as mock_ct2, \
+         patch('src.translator.transformers.AutoTokenizer.from_pretrained'):
+        translator = Translator(model_path=str(tmp_path))
+        translator.cache = None
+        result = MagicMock()
+        result.result.return_value.hypotheses = [["sna_Latn", "a"]]
+        mock_ct2.return_value.translate_batch.return_value = [result]
+        assert translator.infer([["eng_Latn", "a", "</s>"]], "sna_Latn", 1) == [["sna_Latn", "a"]]
+
+    assert mock_ct2.return_value.translate_batch.call_args.kwargs["use_vmap"] is True
+    assert "+vmap:" in translator.model_id
+
+
+def test_convert_with_vmap_reports_bleu(tmp_path):
+    pytest.importorskip("torch")
+    pytest.importorskip("sentencepiece")
+    from scripts.benchmark import build_tiny_model, synthetic_corpus
+    from scripts.convert_model import convert_model
+
+    build_tiny_model(tmp_path, d_model=16, layers=1)
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_text("\n".join(synthetic_corpus(50)), encoding="utf-8")
+
+    out = tmp_path / "vmap_model"
+    convert_model(str(tmp_path / "hf"), str(out), "float32", vmap_corpus=[str(corpus)], eval_sentences=10, bleu_tolerance=100)
+    report = json.loads((out / "zimlingua_manifest.json").read_text())["vmap"]
+    assert report["enabled"] and (out / VMAP_NAME).exists()
+    assert report["tokens"] <= report["vocab_size"]
+    assert 0 <= report["bleu_vs_full"] <= 100
+    assert report["eval_sentences"] == 10